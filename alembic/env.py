@@ -12,6 +12,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # access to the values within the .ini file in use.
 config = context.config
 
+# Let POS_DATABASE_URL point migrations at the same database as the app.
+if os.environ.get("POS_DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["POS_DATABASE_URL"])
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
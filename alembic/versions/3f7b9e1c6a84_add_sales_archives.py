@@ -0,0 +1,37 @@
+"""Add sales_archives catalogue of per-year archive databases
+
+Revision ID: 3f7b9e1c6a84
+Revises: 8e5a2c7d4f19
+Create Date: 2026-10-17 23:48:52.137760
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7b9e1c6a84'
+down_revision: Union[str, None] = '8e5a2c7d4f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sales_archives',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('first_sale_at', sa.DateTime(), nullable=False),
+        sa.Column('last_sale_at', sa.DateTime(), nullable=False),
+        sa.Column('sale_count', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('year'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_archives')
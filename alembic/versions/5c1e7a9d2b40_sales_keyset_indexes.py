@@ -0,0 +1,36 @@
+"""Composite sales indexes for keyset pagination
+
+Revision ID: 5c1e7a9d2b40
+Revises: f489295c0ee1
+Create Date: 2026-10-17 09:12:44.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9d2b40'
+down_revision: Union[str, None] = 'f489295c0ee1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The composites below start with the same columns, so the old
+    # single-column indexes are redundant.
+    op.drop_index('idx_sales_timestamp', table_name='sales')
+    op.drop_index('idx_sales_customer_id', table_name='sales')
+    op.create_index('idx_sales_timestamp_id', 'sales', ['timestamp', 'id'], unique=False)
+    op.create_index('idx_sales_customer_timestamp_id', 'sales', ['customer_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sales_customer_timestamp_id', table_name='sales')
+    op.drop_index('idx_sales_timestamp_id', table_name='sales')
+    op.create_index('idx_sales_customer_id', 'sales', ['customer_id'], unique=False)
+    op.create_index('idx_sales_timestamp', 'sales', ['timestamp'], unique=False)
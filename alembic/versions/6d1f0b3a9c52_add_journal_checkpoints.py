@@ -0,0 +1,34 @@
+"""Add journal_checkpoints for the checkout journal flusher
+
+Revision ID: 6d1f0b3a9c52
+Revises: a4c9e2f17b38
+Create Date: 2026-10-17 21:14:40.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d1f0b3a9c52'
+down_revision: Union[str, None] = 'a4c9e2f17b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'journal_checkpoints',
+        sa.Column('journal', sa.String(length=100), nullable=False),
+        sa.Column('last_seq', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('journal'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('journal_checkpoints')
@@ -0,0 +1,31 @@
+"""Add idempotency_key to sales
+
+Revision ID: 8e5a2c7d4f19
+Revises: 6d1f0b3a9c52
+Create Date: 2026-10-17 22:31:08.602417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e5a2c7d4f19'
+down_revision: Union[str, None] = '6d1f0b3a9c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sales', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_index('idx_sales_idempotency_key', 'sales', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sales_idempotency_key', table_name='sales')
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.drop_column('idempotency_key')
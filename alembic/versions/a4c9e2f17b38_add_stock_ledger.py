@@ -0,0 +1,65 @@
+"""Add stock_movements ledger and stock_snapshots
+
+Revision ID: a4c9e2f17b38
+Revises: d58c3e0a9b71
+Create Date: 2026-10-17 20:03:26.771904
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f17b38'
+down_revision: Union[str, None] = 'd58c3e0a9b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_movements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('movement_type', sa.String(length=20), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.Column('sale_id', sa.Integer(), nullable=True),
+        sa.Column('note', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_stock_movements_product_time', 'stock_movements',
+                    ['product_id', 'occurred_at', 'quantity'], unique=False)
+    op.create_index('idx_stock_movements_time', 'stock_movements', ['occurred_at'], unique=False)
+
+    snapshots = op.create_table(
+        'stock_snapshots',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('product_id', 'taken_at'),
+    )
+    op.create_index('idx_stock_snapshots_taken_at', 'stock_snapshots', ['taken_at'], unique=False)
+
+    # Existing stock has no history; capture it as the ledger baseline.
+    products = sa.table('products', sa.column('id', sa.Integer), sa.column('stock', sa.Integer))
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.execute(snapshots.insert().from_select(
+        ['product_id', 'taken_at', 'stock'],
+        sa.select(products.c.id, sa.literal(now, sa.DateTime()), sa.func.coalesce(products.c.stock, 0)),
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_stock_snapshots_taken_at', table_name='stock_snapshots')
+    op.drop_table('stock_snapshots')
+    op.drop_index('idx_stock_movements_time', table_name='stock_movements')
+    op.drop_index('idx_stock_movements_product_time', table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,33 @@
+"""Add data_generations change counters
+
+Revision ID: b7d24e9a1f63
+Revises: f3a8d1c05b92
+Create Date: 2026-10-17 16:58:03.914250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d24e9a1f63'
+down_revision: Union[str, None] = 'f3a8d1c05b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'data_generations',
+        sa.Column('scope', sa.String(length=50), nullable=False),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_generations')
@@ -0,0 +1,34 @@
+"""Add FTS5 product search index (SQLite only)
+
+Revision ID: c4f2b9e17d05
+Revises: a83d4f0c6e21
+Create Date: 2026-10-17 11:20:41.907113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.fts import DROP_PRODUCT_SEARCH_DDL, install_product_search
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f2b9e17d05'
+down_revision: Union[str, None] = 'a83d4f0c6e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        install_product_search(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in DROP_PRODUCT_SEARCH_DDL:
+            op.execute(statement)
@@ -0,0 +1,32 @@
+"""Covering sale_items(sale_id) index for product and category reports
+
+Revision ID: d58c3e0a9b71
+Revises: b7d24e9a1f63
+Create Date: 2026-10-17 18:21:47.033615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd58c3e0a9b71'
+down_revision: Union[str, None] = 'b7d24e9a1f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same leading column, so it replaces idx_sale_items_sale_id.
+    op.create_index('idx_sale_items_sale_product', 'sale_items',
+                    ['sale_id', 'product_id', 'quantity', 'price_at_sale'], unique=False)
+    op.drop_index('idx_sale_items_sale_id', table_name='sale_items')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_sale_items_sale_id', 'sale_items', ['sale_id'], unique=False)
+    op.drop_index('idx_sale_items_sale_product', table_name='sale_items')
@@ -0,0 +1,51 @@
+"""Add customers.search_name and customer search indexes
+
+Revision ID: e91a6c3f8b27
+Revises: c4f2b9e17d05
+Create Date: 2026-10-17 12:05:33.120448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.fts import DROP_CUSTOMER_SEARCH_DDL, install_customer_search
+from app.models.customer import normalize_customer_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91a6c3f8b27'
+down_revision: Union[str, None] = 'c4f2b9e17d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customers', sa.Column('search_name', sa.String(length=100), nullable=True))
+
+    # Backfill in Python so existing rows use exactly the same normalisation
+    # (casefold, collapsed whitespace) as the application.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, name FROM customers")).fetchall()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE customers SET search_name = :search_name WHERE id = :id"),
+            [{"id": row.id, "search_name": normalize_customer_name(row.name)} for row in rows],
+        )
+
+    op.create_index('idx_customer_search_name', 'customers', ['search_name'], unique=False)
+
+    if bind.dialect.name == 'sqlite':
+        install_customer_search(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in DROP_CUSTOMER_SEARCH_DDL:
+            op.execute(statement)
+    op.drop_index('idx_customer_search_name', table_name='customers')
+    with op.batch_alter_table('customers') as batch_op:
+        batch_op.drop_column('search_name')
@@ -0,0 +1,47 @@
+"""Foreign-key and covering indexes for sale_items, products and sales
+
+Revision ID: f3a8d1c05b92
+Revises: e91a6c3f8b27
+Create Date: 2026-10-17 15:40:12.508317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d1c05b92'
+down_revision: Union[str, None] = 'e91a6c3f8b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_sale_items_sale_id', 'sale_items', ['sale_id'], unique=False)
+    op.create_index('idx_sale_items_product_sale', 'sale_items',
+                    ['product_id', 'sale_id', 'quantity', 'price_at_sale'], unique=False)
+    op.create_index('idx_products_category_id', 'products', ['category_id'], unique=False)
+    op.create_index('idx_products_name', 'products', ['name'], unique=False)
+    # Same leading columns as the keyset indexes plus the report columns,
+    # so the old indexes are redundant.
+    op.create_index('idx_sales_timestamp_id_customer_amount', 'sales',
+                    ['timestamp', 'id', 'customer_id', 'total_amount'], unique=False)
+    op.create_index('idx_sales_customer_timestamp_id_amount', 'sales',
+                    ['customer_id', 'timestamp', 'id', 'total_amount'], unique=False)
+    op.drop_index('idx_sales_timestamp_id', table_name='sales')
+    op.drop_index('idx_sales_customer_timestamp_id', table_name='sales')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_sales_customer_timestamp_id', 'sales', ['customer_id', 'timestamp', 'id'], unique=False)
+    op.create_index('idx_sales_timestamp_id', 'sales', ['timestamp', 'id'], unique=False)
+    op.drop_index('idx_sales_customer_timestamp_id_amount', table_name='sales')
+    op.drop_index('idx_sales_timestamp_id_customer_amount', table_name='sales')
+    op.drop_index('idx_products_name', table_name='products')
+    op.drop_index('idx_products_category_id', table_name='products')
+    op.drop_index('idx_sale_items_product_sale', table_name='sale_items')
+    op.drop_index('idx_sale_items_sale_id', table_name='sale_items')
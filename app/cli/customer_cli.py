@@ -6,13 +6,14 @@ from app.services.customer_service import (
     create_customer,
     get_customer_by_id,
     get_customer_by_email,
-    get_all_customers,
+    get_customer_by_name,
     update_customer,
     soft_delete_customer,
     add_loyalty_points,
     apply_discount,
     get_purchases_by_customer,
 )
+from app.services.read_models import list_customer_rows
 from app.services.reporting_service import (
     total_sales_per_customer,
     top_customers_by_sales,
@@ -62,7 +63,7 @@ def handle_create(db):
 
 def handle_list(db):
     try:
-        customers = get_all_customers(db)
+        customers = list_customer_rows(db)
         if not customers:
             click.echo("No customers found.")
             return
@@ -92,7 +93,7 @@ def handle_view(db):
         click.secho("🔍 Customer Directory", fg="cyan", bold=True)
 
         # Step 1: Fetch and display all customers in a table
-        customers = get_all_customers(db)
+        customers = list_customer_rows(db)
         if not customers:
             click.echo("No customers found.")
             return
@@ -118,9 +119,7 @@ def handle_view(db):
                 return
         else:
             
-            matches = [
-                c for c in customers if selection.lower() in c.name.lower()
-            ]
+            matches = get_customer_by_name(db, selection)
 
             if not matches:
                 click.secho(f"❌ No customers found matching name '{selection}'", fg="red")
@@ -170,7 +169,7 @@ from tabulate import tabulate
 
 def handle_update(db):
     try:
-        customers = get_all_customers(db)
+        customers = list_customer_rows(db)
         if not customers:
             click.echo("No customers found.")
             return
@@ -242,7 +241,7 @@ from tabulate import tabulate
 
 def handle_delete(db):
     try:
-        customers = get_all_customers(db)
+        customers = list_customer_rows(db)
         if not customers:
             click.echo("No active customers found.")
             return
@@ -1,11 +1,11 @@
 import click
+import csv
 from app.models.category import Category
 from app.services.inventory_service import (
     create_product,
     update_product,
     purchase_product,
     get_product_by_id,
-    get_all_products,
     create_category,
     update_category,
     search_products_by_name,
@@ -13,8 +13,10 @@ from app.services.inventory_service import (
     get_products_in_stock,
     delete_product,
     get_or_create_category_by_name,  
-    purchase_product as purchase_stock  
+    purchase_product as purchase_stock,
+    receive_stock_bulk,
 )
+from app.services.read_models import list_product_rows
 from app.db.engine import SessionLocal
 from tabulate import tabulate
 
@@ -125,7 +127,7 @@ def list_products():
     """List all products in the inventory."""
     click.echo("\n--- All Products ---")
     db = next(get_db())
-    products = get_all_products(db)
+    products = list_product_rows(db)
 
     if products:
         table_data = []
@@ -175,6 +177,49 @@ def purchase_stock_cli():
         click.echo(f"❌ Error purchasing stock: {e}")
 
 
+def _delivery_line(row):
+    """Turns a CSV row into a receive_stock_bulk line; malformed numbers are left for it to reject."""
+    line = {}
+    if (row.get("product_id") or "").strip():
+        line["product_id"] = int(row["product_id"]) if row["product_id"].strip().isdigit() else row["product_id"]
+    if (row.get("barcode") or "").strip():
+        line["barcode"] = row["barcode"].strip()
+    try:
+        line["quantity"] = int(row.get("quantity") or "")
+    except ValueError:
+        line["quantity"] = row.get("quantity")
+    for key in ("purchase_price", "selling_price"):
+        if (row.get(key) or "").strip():
+            try:
+                line[key] = float(row[key])
+            except ValueError:
+                line[key] = row[key]
+    return line
+
+
+def receive_delivery_cli():
+    """Book a supplier delivery note from a CSV file in one transaction."""
+    click.echo("\n--- Receive Delivery ---")
+    click.echo("CSV columns: product_id or barcode, quantity, and optional purchase_price, selling_price")
+    path = click.prompt("Path to delivery CSV", type=click.Path(exists=True, dir_okay=False))
+    all_or_nothing = click.confirm("Reject the whole delivery if any line is bad?", default=False)
+    db = next(get_db())
+
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            lines = [_delivery_line(row) for row in csv.DictReader(f)]
+        result = receive_stock_bulk(db, lines, all_or_nothing=all_or_nothing, note=f"delivery {path}")
+        click.echo(f"✅ Booked {result['applied']} lines, {result['units']} units "
+                   f"across {len(result['product_ids'])} products.")
+        if result["errors"]:
+            click.echo(f"❌ {len(result['errors'])} lines rejected:")
+            # Line numbers as shown in a spreadsheet: header is row 1.
+            click.echo(tabulate([(e["line"] + 2, e["error"]) for e in result["errors"]],
+                                headers=["Row", "Error"], tablefmt="fancy_grid"))
+    except Exception as e:
+        click.echo(f"❌ Error receiving delivery: {e}")
+
+
 def create_category_cli():
     """Create a new product category."""
     click.echo("\n--- Create New Category ---")
@@ -268,8 +313,7 @@ def delete_product_cli():
         
         product = db.query(Product).filter(Product.id == product_id).first()  
         if product:
-            db.delete(product) 
-            db.commit()  
+            delete_product(db, product_id)
             click.echo(f"Product with ID {product_id} deleted successfully.")
         else:
             click.echo(f"Product with ID {product_id} not found.")
@@ -291,7 +335,8 @@ def inventory_menu():
     click.echo("8. View product stock levels")
     click.echo("9. Delete a product")
     click.echo("10. Purchase stock")
-    click.echo("11. Exit")
+    click.echo("11. Receive delivery (CSV)")
+    click.echo("12. Exit")
 
 
 @click.command()
@@ -331,6 +376,8 @@ def menu():
         elif choice == 10:
             purchase_stock_cli()
         elif choice == 11:
+            receive_delivery_cli()
+        elif choice == 12:
             click.echo("Exiting the menu...")
             break
         else:
@@ -59,6 +59,12 @@ def run_app_cli_sales_cli():
                 from app.cli.sales_cli import handle_summary_by_customer
                 handle_summary_by_customer(db)
             elif option == 7:
+                from app.cli.sales_cli import handle_top_products
+                handle_top_products(db)
+            elif option == 8:
+                from app.cli.sales_cli import handle_revenue_by_category
+                handle_revenue_by_category(db)
+            elif option == 9:
                 click.echo("🔙 Returning to Main Menu.")
                 break
             else:
@@ -0,0 +1,187 @@
+import contextlib
+import csv
+
+import click
+from app.db.engine import SessionLocal, engine
+from app.db.fts import install_customer_search, install_product_search
+from app.models.product import Product
+from app.services.archive_service import ARCHIVE_CHUNK_SIZE, ARCHIVE_DIR, archive_sales
+from app.services.checkout_journal import (
+    CheckoutJournal,
+    JournalError,
+    JournalFlusher,
+    redrive_rejected,
+    rejected_sales,
+)
+from app.services.export_service import export_sales
+from app.services.import_service import IMPORT_CHUNK_SIZE, import_products
+from app.services.sales_service import rebuild_daily_sales
+from app.services.stock_ledger_service import stock_as_of, stock_levels_as_of, take_stock_snapshot
+
+
+@click.group()
+def cli():
+    """Back-office maintenance commands."""
+
+
+@cli.command("rebuild-daily-sales")
+def rebuild_daily_sales_cmd():
+    """Recompute the daily_sales rollup from the sales tables."""
+    with SessionLocal() as db:
+        days = rebuild_daily_sales(db)
+    click.echo(f"✅ Rebuilt daily sales rollup for {days} days.")
+
+
+@cli.command("rebuild-search-index")
+def rebuild_search_index_cmd():
+    """Create (if needed) and refill the SQLite product and customer search indexes."""
+    with engine.begin() as conn:
+        install_product_search(conn)
+        install_customer_search(conn)
+    click.echo("✅ Search indexes rebuilt.")
+
+
+@cli.command("snapshot-stock")
+def snapshot_stock_cmd():
+    """Record every product's current stock (schedule nightly, after close)."""
+    with SessionLocal() as db:
+        count = take_stock_snapshot(db)
+    click.echo(f"✅ Stock snapshot taken for {count} products.")
+
+
+@cli.command("stock-as-of")
+@click.argument("at")
+@click.option("--product-id", type=int, help="Show one product instead of the whole catalogue.")
+def stock_as_of_cmd(at, product_id):
+    """Stock at AT (YYYY-MM-DD for end of day, or an ISO datetime in UTC)."""
+    with SessionLocal() as db:
+        try:
+            if product_id is not None:
+                stock = stock_as_of(db, product_id, at)
+            else:
+                levels = stock_levels_as_of(db, at)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        if product_id is not None:
+            if stock is None:
+                raise click.ClickException(f"Product {product_id} not found")
+            click.echo(f"Product {product_id}: {stock} in stock at {at}")
+            return
+
+        prices = dict(db.query(Product.id, Product.purchase_price))
+        units = sum(levels.values())
+        value = sum(stock * (prices.get(pid) or 0) for pid, stock in levels.items())
+        click.echo(f"{len(levels)} products, {units} units at {at}; "
+                   f"valued at current purchase prices: Ksh {value:,.2f}")
+
+
+@cli.command("import-products")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "file_format", type=click.Choice(["csv", "jsonl"]),
+              help="File format (default: from the file extension).")
+@click.option("--chunk-size", default=IMPORT_CHUNK_SIZE, show_default=True, help="Rows per transaction.")
+@click.option("--rejects", "rejects_path", type=click.Path(dir_okay=False),
+              help="Write every rejected line to this CSV file.")
+def import_products_cmd(path, file_format, chunk_size, rejects_path):
+    """Upsert products from a CSV or JSON Lines file, matching on barcode."""
+    with contextlib.ExitStack() as stack:
+        on_reject = None
+        if rejects_path:
+            writer = csv.writer(stack.enter_context(open(rejects_path, "w", newline="", encoding="utf-8")))
+            writer.writerow(["line", "error"])
+
+            def on_reject(line, error, row):
+                writer.writerow([line, error])
+        db = stack.enter_context(SessionLocal())
+        try:
+            result = import_products(db, path, file_format, chunk_size, on_reject)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    click.echo(f"✅ {result['inserted']} products added, {result['updated']} updated, "
+               f"{result['categories_created']} new categories.")
+    if result["rejected"]:
+        click.echo(f"⚠️ {result['rejected']} lines rejected:")
+        for reject in result["rejects"]:
+            click.echo(f"  line {reject['line']}: {reject['error']}")
+        if result["rejected"] > len(result["rejects"]):
+            click.echo("  ... (use --rejects to write them all)")
+
+
+@cli.command("export-sales")
+@click.argument("path", type=click.Path(dir_okay=False))
+@click.option("--start", "start_date", help="First day (YYYY-MM-DD) or ISO datetime in UTC.")
+@click.option("--end", "end_date", help="Last day (YYYY-MM-DD, inclusive) or ISO datetime in UTC.")
+@click.option("--format", "file_format", type=click.Choice(["csv", "jsonl"]),
+              help="File format (default: from the file extension).")
+@click.option("--gzip/--no-gzip", "compress", default=None, help="Compress the output (default: if PATH ends in .gz).")
+def export_sales_cmd(path, start_date, end_date, file_format, compress):
+    """Stream every sale line (one row per item) to a CSV or JSON Lines file."""
+    with SessionLocal() as db:
+        try:
+            count = export_sales(db, path, file_format, start_date, end_date, compress)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    click.echo(f"✅ Exported {count} sale lines to {path}.")
+
+
+@cli.command("flush-journal")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--name", help="Checkpoint name (default: the directory name).")
+def flush_journal_cmd(directory, name):
+    """Write every pending sale in a till's checkout journal to the database."""
+    journal = CheckoutJournal(directory, name)
+    flusher = JournalFlusher(journal)
+    try:
+        flusher.flush()
+    except JournalError as e:
+        raise click.ClickException(str(e))
+    finally:
+        journal.close()
+    click.echo(f"✅ Flushed {flusher.flushed} sales from journal {journal.name}.")
+    if flusher.rejected:
+        click.echo(f"⚠️ {flusher.rejected} sales rejected; see {journal.directory / 'rejected.jsonl'}")
+
+
+@cli.command("rejected-sales")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--redrive", is_flag=True, help="Retry them, e.g. after restoring a deleted customer or product.")
+def rejected_sales_cmd(directory, redrive):
+    """List the sales a till's journal flusher set aside, or retry them."""
+    if redrive:
+        written, failed = redrive_rejected(directory)
+        click.echo(f"✅ Wrote {written} rejected sales.")
+        if failed:
+            click.echo(f"⚠️ {failed} sales are still rejected.")
+        return
+    entries = rejected_sales(directory)
+    for entry in entries:
+        record = entry["record"]
+        click.echo(f"#{record['seq']}  customer {record['customer_id']}  {record['timestamp']}  {entry['error']}")
+    click.echo(f"{len(entries)} rejected sales.")
+
+
+@cli.command("archive-sales")
+@click.argument("before")
+@click.option("--dir", "archive_dir", default=ARCHIVE_DIR, show_default=True, type=click.Path(file_okay=False),
+              help="Where the per-year archive databases are kept.")
+@click.option("--chunk-size", default=ARCHIVE_CHUNK_SIZE, show_default=True, help="Sales per transaction.")
+@click.option("--vacuum/--no-vacuum", default=False, help="VACUUM the hot database afterwards to return the space.")
+def archive_sales_cmd(before, archive_dir, chunk_size, vacuum):
+    """Move sales before BEFORE (YYYY-MM-DD, e.g. 2025-01-01) into per-year archive databases."""
+    with SessionLocal() as db:
+        try:
+            moved = archive_sales(db, before, archive_dir, chunk_size)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    for year, count in sorted(moved.items()):
+        click.echo(f"  {year}: {count} sales")
+    if vacuum and moved:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+    click.echo(f"✅ Archived {sum(moved.values())} sales.")
+
+
+if __name__ == "__main__":
+    cli()
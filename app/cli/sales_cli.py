@@ -1,24 +1,39 @@
+import random
+import time
+import uuid
+
 import click
 from datetime import datetime
+from sqlalchemy.exc import OperationalError
 from tabulate import tabulate
 from app.db.engine import SessionLocal
 from app.services.sales_service import (
     create_sale,
     get_sale_by_id,
-    get_all_sales,
     delete_sale,
     get_sales_summary_by_day,
-    get_recent_sales
-
+    get_recent_sales,
+    list_sales_with_summary,
 )
 from app.services.customer_service import (
     get_customer_by_name,
     get_customer_by_id,
-    get_all_customers,
     get_purchases_by_customer
 )
 
-from app.services.inventory_service import get_all_products
+from app.services.read_models import list_customer_rows, list_product_rows
+from app.services.reporting_service import (
+    revenue_by_category,
+    top_products_by_revenue,
+    top_products_by_units,
+)
+from app.services.catalog_cache import (
+    get_product_snapshot,
+    get_product_snapshot_by_barcode,
+)
+
+CHECKOUT_ATTEMPTS = 3
+CHECKOUT_RETRY_DELAY = 0.2
 
 
 def parse_date(date_str):
@@ -38,7 +53,9 @@ def menu():
     click.echo("4. Delete a sale")
     click.echo("5. Sales summary by date")
     click.echo("6. Sales summary by customer")
-    click.echo("7. Exit")
+    click.echo("7. Top products")
+    click.echo("8. Revenue by category")
+    click.echo("9. Exit")
     try:
         return click.prompt("\nEnter a number", type=int)
     except click.exceptions.Abort:
@@ -48,7 +65,7 @@ def menu():
 
 def handle_create(db):
     try:
-        customers = get_all_customers(db)
+        customers = list_customer_rows(db)
         if not customers:
             click.echo("No customers available in the system.")
             return
@@ -100,7 +117,7 @@ def handle_create(db):
         click.echo(
             f"\nCreating sale for: {customer.name} (ID {customer.id})\n")
 
-        products = get_all_products(db)
+        products = list_product_rows(db)
         if not products:
             click.echo("No products available.")
             return
@@ -113,21 +130,27 @@ def handle_create(db):
         click.echo(
             tabulate(product_table, headers=headers, tablefmt="fancy_grid"))
 
+        # Stock shown here is only a hint; create_sale enforces it atomically.
+        stock_by_id = {p.id: p.stock or 0 for p in products}
+
         items = []
         while True:
-            product_id = click.prompt("Enter Product ID to add", type=int)
-            product = next((p for p in products if p.id == product_id), None)
+            reference = click.prompt("Enter Product ID or scan barcode").strip()
+            product = get_product_snapshot_by_barcode(db, reference)
+            if not product and reference.isdigit():
+                product = get_product_snapshot(db, int(reference))
             if not product:
                 click.echo("Product not found.")
                 continue
-            if product.stock <= 0:
+            available = stock_by_id.get(product.id, 0)
+            if available <= 0:
                 click.echo("⚠️ Product is out of stock.")
                 continue
 
             quantity = click.prompt(
-                f"Enter quantity (Available: {product.stock})", type=int)
-            if quantity > product.stock:
-                click.echo(f"⚠️ Only {product.stock} units available.")
+                f"Enter quantity (Available: {available})", type=int)
+            if quantity > available:
+                click.echo(f"⚠️ Only {available} units available.")
                 continue
 
             items.append({
@@ -144,7 +167,18 @@ def handle_create(db):
             click.echo("No products added to the sale.")
             return
 
-        sale = create_sale(db, customer.id, items)
+        # One key per checkout: if the database is busy the sale is retried
+        # with it, and a retry of a sale that did go through returns it.
+        idempotency_key = uuid.uuid4().hex
+        for attempt in range(CHECKOUT_ATTEMPTS):
+            try:
+                sale = create_sale(db, customer.id, items, idempotency_key=idempotency_key)
+                break
+            except OperationalError:
+                db.rollback()
+                if attempt == CHECKOUT_ATTEMPTS - 1:
+                    raise
+                time.sleep(CHECKOUT_RETRY_DELAY * 2 ** attempt * random.uniform(0.5, 1.5))
         db.commit()
 
         click.echo(
@@ -157,32 +191,31 @@ def handle_create(db):
 
 def handle_list(db):
     try:
-        sales = get_all_sales(db)
+        sales, cursor = list_sales_with_summary(db)
         if not sales:
             click.echo("No sales found.")
             return
 
-        table_data = []
-
-        for sale in sales:
-            customer = get_customer_by_id(db, sale.customer_id)
-            name_display = customer.name if customer else f"Unknown (ID {sale.customer_id})"
-
-            num_items = len(sale.sale_items) if hasattr(
-                sale, "sale_items") else "?"
+        headers = ["Sale ID", "Customer", "Total Amount", "Timestamp", "Items"]
 
-            table_data.append([
-                sale.id,
-                name_display,
-                f"Ksh {sale.total_amount}",
-                sale.timestamp.strftime("%Y-%m-%d %H:%M"),
-                num_items
-            ])
+        while True:
+            table_data = [
+                [
+                    sale.id,
+                    sale.customer_name or "Unknown",
+                    f"Ksh {sale.total_amount}",
+                    sale.timestamp.strftime("%Y-%m-%d %H:%M"),
+                    sale.item_count,
+                ]
+                for sale in sales
+            ]
 
-        headers = ["Sale ID", "Customer", "Total Amount", "Timestamp", "Items"]
+            click.echo("\nSales Summary:\n")
+            click.echo(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
 
-        click.echo("\nSales Summary:\n")
-        click.echo(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
+            if not cursor or not click.confirm("Show older sales?", default=False):
+                break
+            sales, cursor = list_sales_with_summary(db, cursor=cursor)
 
     except Exception as e:
         click.echo(f" Failed to list sales: {e}")
@@ -308,7 +341,7 @@ def handle_summary_by_date(db):
 
 def handle_summary_by_customer(db):
     try:
-        customers = get_all_customers(db)
+        customers = list_customer_rows(db)
         if not customers:
             click.echo("No customers found.")
             return
@@ -376,6 +409,46 @@ def handle_summary_by_customer(db):
         click.echo(f"Error fetching customer summary: {e}")
 
 
+def handle_top_products(db):
+    try:
+        by = click.prompt("Rank by", type=click.Choice(["revenue", "units"]), default="revenue")
+        limit = click.prompt("Limit", type=int, default=10)
+        start = parse_date(click.prompt("Start date (YYYY-MM-DD)", default="", show_default=False))
+        end = parse_date(click.prompt("End date (YYYY-MM-DD)", default="", show_default=False))
+        report = top_products_by_revenue if by == "revenue" else top_products_by_units
+        rows = report(db, limit, start, end)
+        if not rows:
+            click.echo("No product sales found for the given date range.")
+            return
+        table = [
+            (r["rank"], r["product_name"], r["brand"], r["category_name"] or "-",
+             r["units"], f"Ksh {r['revenue']:,.2f}")
+            for r in rows
+        ]
+        click.echo(tabulate(table, headers=["#", "Product", "Brand", "Category", "Units", "Revenue"],
+                            tablefmt="fancy_grid"))
+    except Exception as e:
+        click.echo(f"Failed to generate product report: {e}")
+
+
+def handle_revenue_by_category(db):
+    try:
+        start = parse_date(click.prompt("Start date (YYYY-MM-DD)", default="", show_default=False))
+        end = parse_date(click.prompt("End date (YYYY-MM-DD)", default="", show_default=False))
+        rows = revenue_by_category(db, start, end)
+        if not rows:
+            click.echo("No category sales found for the given date range.")
+            return
+        table = [
+            (r["rank"], r["category_name"], r["units"], f"Ksh {r['revenue']:,.2f}", f"{r['share']:.1%}")
+            for r in rows
+        ]
+        click.echo(tabulate(table, headers=["#", "Category", "Units", "Revenue", "Share"],
+                            tablefmt="fancy_grid"))
+    except Exception as e:
+        click.echo(f"Failed to generate category report: {e}")
+
+
 @click.command()
 def cli():
     with SessionLocal() as db:
@@ -395,6 +468,10 @@ def cli():
                 elif choice == 6:
                     handle_summary_by_customer(db)
                 elif choice == 7:
+                    handle_top_products(db)
+                elif choice == 8:
+                    handle_revenue_by_category(db)
+                elif choice == 9:
                     click.echo("Goodbye Friend!")
                     break
                 else:
@@ -0,0 +1,95 @@
+"""
+asyncio engine and session factory.
+
+Needs an async driver: aiosqlite for SQLite (in requirements.txt) or asyncpg
+for PostgreSQL. The engine is built on first use, so importing this module
+does not require the driver to be installed.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from app.db.engine import (
+    DATABASE_URL,
+    SERVER_POOL_DEFAULTS,
+    SQLITE_POOL_DEFAULTS,
+    _env_flag,
+    _install_sqlite_pragmas,
+    _pool_settings,
+    sqlite_pragmas,
+)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_url(url=None):
+    """Swaps a sync driver for its async counterpart, e.g. sqlite:// -> sqlite+aiosqlite://."""
+    url = make_url(url or DATABASE_URL)
+    if url.get_dialect().is_async:
+        return url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def build_async_engine(url=None, echo=None, **engine_kwargs):
+    """
+    Async counterpart of app.db.engine.build_engine: same pool sizes, SQLite
+    PRAGMAs and POS_DB_* overrides. Extra keyword arguments win.
+    """
+    url = async_url(url)
+    if echo is None:
+        echo = _env_flag("POS_DB_ECHO")
+
+    options = {"echo": echo}
+    pragmas = None
+    if url.get_backend_name() == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        if in_memory:
+            options["poolclass"] = StaticPool
+        else:
+            options["poolclass"] = AsyncAdaptedQueuePool
+            options.update(_pool_settings(SQLITE_POOL_DEFAULTS))
+        pragmas = sqlite_pragmas(in_memory=in_memory)
+    else:
+        options["poolclass"] = AsyncAdaptedQueuePool
+        options["pool_pre_ping"] = True
+        options.update(_pool_settings(SERVER_POOL_DEFAULTS))
+
+    options.update(engine_kwargs)
+    engine = create_async_engine(url, **options)
+
+    if pragmas:
+        _install_sqlite_pragmas(engine.sync_engine, pragmas)
+
+    return engine
+
+
+def async_session_factory(engine):
+    # expire_on_commit stays on, as in SessionLocal: the services rely on it to
+    # see stock written by Core UPDATEs.
+    return sessionmaker(bind=engine, class_=AsyncSession)
+
+
+_engine = None
+_session_factory = None
+
+
+def get_async_engine():
+    global _engine
+    if _engine is None:
+        _engine = build_async_engine()
+    return _engine
+
+
+def AsyncSessionLocal():
+    """New AsyncSession on the shared async engine (POS_DATABASE_URL)."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_session_factory(get_async_engine())
+    return _session_factory()
@@ -0,0 +1,46 @@
+from datetime import timezone
+
+from sqlalchemy import Date, cast, func
+
+from app.utils.time_utils import STORE_TIMEZONE, STORE_TIMEZONE_NAME
+
+
+def dialect_insert(session, table):
+    """
+    Returns an INSERT for `table` from the session's dialect, so callers can use
+    `on_conflict_do_update` / `on_conflict_do_nothing` on SQLite and PostgreSQL.
+    """
+    name = session.get_bind().dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {name}")
+    return insert(table)
+
+
+def supports_insert_returning(session):
+    """
+    True if INSERT ... RETURNING can be used: PostgreSQL, and SQLite 3.35+ on
+    SQLAlchemy 2.0 (1.4 never emits RETURNING for SQLite).
+    """
+    dialect = session.get_bind().dialect
+    if hasattr(dialect, "insert_returning"):
+        return dialect.insert_returning
+    return dialect.full_returning
+
+
+def store_day(session, column):
+    """
+    SQL expression for the store-local calendar day of a naive-UTC timestamp
+    column, or None when the backend cannot compute it (SQLite has no time zone
+    database, so only a UTC store can be bucketed in SQL there).
+    """
+    name = session.get_bind().dialect.name
+    if name == "postgresql":
+        local = func.timezone(STORE_TIMEZONE_NAME, func.timezone("UTC", column))
+        return cast(local, Date)
+    if name == "sqlite" and STORE_TIMEZONE is timezone.utc:
+        return func.date(column, type_=Date)
+    return None
@@ -1,17 +1,140 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from app.models import Base
 from app.models.customer import Customer
 #from app.models.sale import Sale
 from app.models.product import Product
 from app.models.sale_item import SaleItem
 from app.models.category import Category
+from app.models.daily_sales import DailySales
+from app.models.data_generation import DataGeneration
+from app.models.stock_movement import StockMovement
+from app.models.stock_snapshot import StockSnapshot
+from app.models.journal_checkpoint import JournalCheckpoint
+from app.models.sales_archive import SalesArchive
+import app.db.fts  # registers the products_fts DDL on table create
 
-DATABASE_URL = "sqlite:///pos.db"
+DATABASE_URL = os.environ.get("POS_DATABASE_URL", "sqlite:///pos.db")
 
-engine = create_engine(DATABASE_URL, echo=False)
+# PRAGMAs applied to every new SQLite connection. Each can be overridden with
+# an environment variable named POS_SQLITE_<PRAGMA>, e.g. POS_SQLITE_SYNCHRONOUS=FULL.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": "-64000",      # negative value = KiB, so ~64 MB of page cache
+    "mmap_size": "268435456",    # 256 MB
+    "temp_store": "MEMORY",
+    "busy_timeout": "5000",      # ms
+}
 
-SessionLocal = sessionmaker(bind=engine)
+# Pool settings for server backends (PostgreSQL, MySQL, ...).
+SERVER_POOL_DEFAULTS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+}
+
+# File-backed SQLite only has one writer, so a small pool is enough.
+SQLITE_POOL_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+}
+
+
+def _env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _pool_settings(defaults):
+    settings = {}
+    for key, value in defaults.items():
+        env_value = os.environ.get(f"POS_DB_{key.upper()}")
+        settings[key] = int(env_value) if env_value is not None else value
+    return settings
+
+
+def sqlite_pragmas(in_memory=False):
+    """Returns the PRAGMAs to apply to new SQLite connections, with env overrides."""
+    pragmas = {
+        name: os.environ.get(f"POS_SQLITE_{name.upper()}", value)
+        for name, value in SQLITE_PRAGMAS.items()
+    }
+    if in_memory:
+        # In-memory databases cannot use WAL or mmap.
+        pragmas.pop("journal_mode", None)
+        pragmas.pop("mmap_size", None)
+    return pragmas
+
+
+def _install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
 
 
-session = SessionLocal()
\ No newline at end of file
+def build_engine(url=None, echo=None, **engine_kwargs):
+    """
+    Creates an engine for `url` (defaults to POS_DATABASE_URL) with the pool and
+    connection settings suited to its backend. Extra keyword arguments are passed
+    straight to `create_engine` and win over the computed defaults.
+    """
+    url = make_url(url or DATABASE_URL)
+    if echo is None:
+        echo = _env_flag("POS_DB_ECHO")
+
+    options = {"echo": echo}
+
+    if url.get_backend_name() == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        options["connect_args"] = {"check_same_thread": False}
+        if in_memory:
+            # One shared connection, otherwise every checkout sees an empty database.
+            options["poolclass"] = StaticPool
+        else:
+            options["poolclass"] = QueuePool
+            options.update(_pool_settings(SQLITE_POOL_DEFAULTS))
+        pragmas = sqlite_pragmas(in_memory=in_memory)
+    else:
+        options["poolclass"] = QueuePool
+        options["pool_pre_ping"] = True
+        # Reuse the most recently returned connection, so connections beyond what
+        # the load needs stay idle and are recycled instead of kept warm.
+        options["pool_use_lifo"] = True
+        options.update(_pool_settings(SERVER_POOL_DEFAULTS))
+        if url.get_driver_name() == "psycopg2":
+            # Batches executemany UPDATEs (bulk receiving, rollup upserts) as
+            # well as INSERTs into a few round trips.
+            options["executemany_mode"] = "values_plus_batch"
+            options["connect_args"] = {"application_name": "pos"}
+        pragmas = None
+
+    options.update(engine_kwargs)
+    engine = create_engine(url, **options)
+
+    if pragmas:
+        _install_sqlite_pragmas(engine, pragmas)
+
+    if _env_flag("POS_SQL_INSTRUMENT"):
+        from app.db import instrumentation
+        instrumentation.instrument(engine)
+        instrumentation.dump_at_exit()
+
+    return engine
+
+
+engine = build_engine()
+
+SessionLocal = sessionmaker(bind=engine)
@@ -0,0 +1,193 @@
+"""
+SQLite FTS5 indexes for product and customer search.
+
+`products_fts` mirrors name, brand, barcode and category name for every
+product, keyed by rowid = products.id. Triggers keep it in sync with the
+products and categories tables, so every write path (ORM, Core, imports) is
+covered. Stock-only updates do not touch the index.
+
+`customers_fts` indexes customer names by word (rowid = customers.id) for
+matches inside a name, e.g. a surname; plain prefix lookups use the
+customers.search_name B-tree index instead.
+"""
+import re
+import weakref
+
+from sqlalchemy import DDL, event, text
+
+from app.models.customer import Customer
+from app.models.product import Product
+
+PRODUCT_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, brand, barcode, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, brand, barcode, category)
+        VALUES (new.id, new.name, new.brand, new.barcode,
+                (SELECT name FROM categories WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au
+    AFTER UPDATE OF name, brand, barcode, category_id ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.id;
+        INSERT INTO products_fts (rowid, name, brand, barcode, category)
+        VALUES (new.id, new.name, new.brand, new.barcode,
+                (SELECT name FROM categories WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS categories_fts_au AFTER UPDATE OF name ON categories BEGIN
+        UPDATE products_fts SET category = new.name
+        WHERE rowid IN (SELECT id FROM products WHERE category_id = new.id);
+    END
+    """,
+]
+
+DROP_PRODUCT_SEARCH_DDL = [
+    "DROP TRIGGER IF EXISTS categories_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    "DROP TABLE IF EXISTS products_fts",
+]
+
+CUSTOMER_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+        name,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN
+        INSERT INTO customers_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN
+        DELETE FROM customers_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF name ON customers BEGIN
+        DELETE FROM customers_fts WHERE rowid = old.id;
+        INSERT INTO customers_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+DROP_CUSTOMER_SEARCH_DDL = [
+    "DROP TRIGGER IF EXISTS customers_fts_au",
+    "DROP TRIGGER IF EXISTS customers_fts_ad",
+    "DROP TRIGGER IF EXISTS customers_fts_ai",
+    "DROP TABLE IF EXISTS customers_fts",
+]
+
+# Column weights for bm25(): name, brand, barcode, category.
+PRODUCT_SEARCH_WEIGHTS = (10.0, 3.0, 5.0, 1.0)
+
+def _forget_on_drop(fts_table):
+    def listener(target, connection, **kw):
+        _forget_fts_tables(connection.engine, fts_table)
+    return listener
+
+
+for _table, _fts_table, _create, _drop in (
+    (Product.__table__, "products_fts", PRODUCT_SEARCH_DDL, DROP_PRODUCT_SEARCH_DDL),
+    (Customer.__table__, "customers_fts", CUSTOMER_SEARCH_DDL, DROP_CUSTOMER_SEARCH_DDL),
+):
+    for _statement in _create:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    for _statement in _drop:
+        event.listen(_table, "before_drop", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(_table, "before_drop", _forget_on_drop(_fts_table))
+
+
+def install_product_search(connection):
+    """Creates the product FTS table and triggers on an existing database and fills it."""
+    for statement in PRODUCT_SEARCH_DDL:
+        connection.execute(text(statement))
+    rebuild_product_search(connection)
+
+
+def rebuild_product_search(connection):
+    connection.execute(text("DELETE FROM products_fts"))
+    connection.execute(text("""
+        INSERT INTO products_fts (rowid, name, brand, barcode, category)
+        SELECT p.id, p.name, p.brand, p.barcode, c.name
+        FROM products p LEFT JOIN categories c ON c.id = p.category_id
+    """))
+
+
+def install_customer_search(connection):
+    """Creates the customer FTS table and triggers on an existing database and fills it."""
+    for statement in CUSTOMER_SEARCH_DDL:
+        connection.execute(text(statement))
+    rebuild_customer_search(connection)
+
+
+def rebuild_customer_search(connection):
+    connection.execute(text("DELETE FROM customers_fts"))
+    connection.execute(text("INSERT INTO customers_fts (rowid, name) SELECT id, name FROM customers"))
+
+
+_fts_tables = weakref.WeakKeyDictionary()
+
+
+def _has_fts_table(engine, name):
+    """
+    True if `engine` is SQLite and the FTS table exists. Only a table that
+    exists is remembered (per engine): a database without it is checked again
+    on every call, so installing the index, e.g. with rebuild-search-index from
+    another process, takes effect without a restart.
+    """
+    tables = _fts_tables.setdefault(engine, set())
+    if name in tables:
+        return True
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        available = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": name},
+        ).first() is not None
+    if available:
+        tables.add(name)
+    return available
+
+
+def _forget_fts_tables(engine, *names):
+    _fts_tables.get(engine, set()).difference_update(names)
+
+
+def has_product_search(engine):
+    return _has_fts_table(engine, "products_fts")
+
+
+def has_customer_search(engine):
+    return _has_fts_table(engine, "customers_fts")
+
+
+def match_expression(query):
+    """
+    Turns free text typed at the till into an FTS5 prefix query: every word
+    must match the start of some token, e.g. 'coca 50' -> '"coca"* "50"*'.
+    Returns None when there is nothing searchable.
+    """
+    tokens = re.findall(r"\w+", query.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
@@ -0,0 +1,387 @@
+"""
+Synthetic dataset generator for performance work.
+
+Builds a database of realistic shape and size from a seed, e.g.
+
+    python -m app.db.generate --db sqlite:///bench.db --customers 1000000 \
+        --products 80000 --sales 5000000 --seed 42
+
+Same arguments, same data. Rows are written with Core executemany inserts in
+chunked transactions. Shapes that matter for query plans are modelled:
+- Zipfian product popularity, so a few SKUs dominate sale_items
+- Zipfian repeat customers plus a walk-in share on customer 1
+- weekday/weekend volume and a lunchtime/evening diurnal curve, in store time
+- 1-8 lines per basket
+"""
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import click
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.engine import build_engine
+from app.db.fts import (
+    DROP_CUSTOMER_SEARCH_DDL,
+    DROP_PRODUCT_SEARCH_DDL,
+    install_customer_search,
+    install_product_search,
+)
+from app.models import Base
+from app.models.category import Category
+from app.models.customer import Customer, normalize_customer_name
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.models.stock_snapshot import StockSnapshot
+from app.services.sales_service import rebuild_daily_sales
+from app.utils.time_utils import STORE_TIMEZONE
+
+FIRST_NAMES = [
+    "Amina", "Brian", "Cynthia", "David", "Esther", "Felix", "Grace", "Hassan", "Irene", "James",
+    "Kevin", "Lucy", "Moses", "Njeri", "Otieno", "Purity", "Queen", "Robert", "Sharon", "Tom",
+    "Umi", "Victor", "Wanjiku", "Xavier", "Yusuf", "Zawadi",
+]
+LAST_NAMES = [
+    "Achieng", "Barasa", "Cheruiyot", "Diallo", "Kamau", "Kariuki", "Kiptoo", "Mwangi", "Njoroge",
+    "Ochieng", "Odhiambo", "Omondi", "Onyango", "Wafula", "Wambui", "Wanjiru", "Were", "Zuma",
+]
+CATEGORY_NAMES = [
+    "Beverages", "Grocery", "Snacks", "Frozen Foods", "Dairy", "Bakery", "Household", "Personal Care",
+    "Baby", "Pet Care", "Produce", "Butchery", "Stationery", "Electronics", "Alcohol", "Cereals",
+]
+PRODUCT_NOUNS = [
+    "Soda", "Juice", "Water", "Flour", "Rice", "Sugar", "Crisps", "Biscuits", "Chicken", "Fish",
+    "Milk", "Yoghurt", "Bread", "Soap", "Detergent", "Toothpaste", "Diapers", "Cat Food", "Tomatoes",
+    "Beef", "Pens", "Batteries", "Beer", "Cornflakes", "Tea", "Coffee", "Cooking Oil", "Salt",
+]
+BRANDS = [
+    "Brookside", "Bidco", "Unga", "Mumias", "Kabras", "Kensalt", "Ketepa", "Dormans", "Festive",
+    "Supaloaf", "Menengai", "Colgate", "Omo", "Ariel", "Pampers", "Huggies", "Kenylon", "Tusker",
+    "Coca-Cola", "Pepsi", "Highlands", "Daima", "Ilara", "Fresha", "Jogoo", "Pembe", "Ajab",
+]
+SIZES = ["100g", "250g", "500g", "1kg", "2kg", "300ml", "500ml", "1L", "2L", "5L", "pack of 6", "single"]
+UNITS = ["g", "kg", "ml", "L", "pcs"]
+
+# Relative sale volume by store-local hour (trading 07:00-23:00).
+HOURLY_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 0, 2, 5, 6, 6, 7, 10, 11, 8, 6, 7, 10, 13, 12, 8, 5, 2, 0,
+]
+# Monday .. Sunday.
+WEEKDAY_WEIGHTS = [1.0, 0.95, 0.95, 1.0, 1.15, 1.35, 1.2]
+# Items per basket, 1..8.
+BASKET_SIZE_WEIGHTS = [30, 25, 17, 11, 7, 5, 3, 2]
+QUANTITY_WEIGHTS = [70, 20, 6, 4]
+
+DEFAULT_STOCK = 1_000_000
+
+
+def zipf_cum_weights(n, s):
+    """Cumulative weights for ranks 1..n with P(k) proportional to 1/k**s."""
+    total = 0.0
+    weights = []
+    for k in range(1, n + 1):
+        total += 1.0 / (k ** s)
+        weights.append(total)
+    return weights
+
+
+def _chunks_insert(engine, table, rows, chunk_size):
+    written = 0
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            with engine.begin() as conn:
+                conn.execute(insert(table), buffer)
+            written += len(buffer)
+            buffer = []
+    if buffer:
+        with engine.begin() as conn:
+            conn.execute(insert(table), buffer)
+        written += len(buffer)
+    return written
+
+
+def _category_rows(count):
+    for i in range(1, count + 1):
+        base = CATEGORY_NAMES[(i - 1) % len(CATEGORY_NAMES)]
+        name = base if i <= len(CATEGORY_NAMES) else f"{base} {i}"
+        yield {"id": i, "name": name, "description": f"{name} section"}
+
+
+def _product_rows(rng, count, category_count, catalog):
+    for i in range(1, count + 1):
+        brand = rng.choice(BRANDS)
+        name = f"{brand} {rng.choice(PRODUCT_NOUNS)} {rng.choice(SIZES)} #{i}"
+        selling_price = round(min(rng.lognormvariate(5.0, 0.9), 25000), 2)
+        catalog.append((name, selling_price))
+        yield {
+            "id": i,
+            "name": name,
+            "brand": brand,
+            "purchase_price": round(selling_price * rng.uniform(0.7, 0.9), 2),
+            "selling_price": selling_price,
+            "stock": DEFAULT_STOCK,
+            "image": None,
+            "barcode": str(6000000000000 + i),
+            "category_id": rng.randint(1, category_count),
+            "unit": rng.choice(UNITS),
+        }
+
+
+def _customer_rows(rng, count):
+    yield {
+        "id": 1, "name": "Walk-In", "search_name": "walk-in", "email": "walkin@example.com",
+        "phone": None, "customer_type": "individual", "company_name": None,
+        "loyalty_points": 0, "discount_rate": 0, "is_deleted": False,
+    }
+    for i in range(2, count + 1):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        business = rng.random() < 0.05
+        yield {
+            "id": i,
+            "name": name,
+            "search_name": normalize_customer_name(name),
+            "email": f"customer{i}@example.com",
+            "phone": f"07{rng.randint(10000000, 99999999)}",
+            "customer_type": "business" if business else "individual",
+            "company_name": f"{rng.choice(LAST_NAMES)} Enterprises" if business else None,
+            "loyalty_points": rng.randint(0, 5000),
+            "discount_rate": rng.choice([0, 0, 0, 5, 10]) if business else 0,
+            "is_deleted": False,
+        }
+
+
+def _sales_per_day(rng, total_sales, first_day, days):
+    """Splits total_sales across days by weekday weight with +/-10% noise."""
+    weights = [
+        WEEKDAY_WEIGHTS[(first_day + timedelta(days=d)).weekday()] * rng.uniform(0.9, 1.1)
+        for d in range(days)
+    ]
+    scale = total_sales / sum(weights)
+    raw = [w * scale for w in weights]
+    counts = [int(r) for r in raw]
+    by_remainder = sorted(range(days), key=lambda d: raw[d] - counts[d], reverse=True)
+    for d in by_remainder[:total_sales - sum(counts)]:
+        counts[d] += 1
+    return counts
+
+
+def _local_to_utc(day, seconds_into_day):
+    local = datetime(day.year, day.month, day.day, tzinfo=STORE_TIMEZONE) + timedelta(seconds=seconds_into_day)
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _write_sales(engine, rng, options, catalog, chunk_size):
+    customer_count = options["customers"]
+    product_count = len(catalog)
+
+    product_by_rank = list(range(1, product_count + 1))
+    rng.shuffle(product_by_rank)
+    product_weights = zipf_cum_weights(product_count, options["product_zipf"])
+
+    regulars = customer_count - 1
+    customer_by_rank = list(range(2, customer_count + 1))
+    rng.shuffle(customer_by_rank)
+    customer_weights = zipf_cum_weights(regulars, options["customer_zipf"]) if regulars else None
+
+    hours = range(24)
+    first_day = options["end_date"] - timedelta(days=options["days"] - 1)
+    per_day = _sales_per_day(rng, options["sales"], first_day, options["days"])
+
+    sale_id = 0
+    item_id = 0
+    sale_rows = []
+    item_rows = []
+
+    def flush():
+        with engine.begin() as conn:
+            conn.execute(insert(Sale.__table__), sale_rows)
+            conn.execute(insert(SaleItem.__table__), item_rows)
+        sale_rows.clear()
+        item_rows.clear()
+
+    for day_index, count in enumerate(per_day):
+        if not count:
+            continue
+        day = first_day + timedelta(days=day_index)
+        seconds = sorted(
+            hour * 3600 + rng.randrange(3600)
+            for hour in rng.choices(hours, weights=HOURLY_WEIGHTS, k=count)
+        )
+        for second in seconds:
+            sale_id += 1
+            if not regulars or rng.random() < options["walk_in_share"]:
+                customer_id = 1
+            else:
+                customer_id = customer_by_rank[
+                    rng.choices(range(regulars), cum_weights=customer_weights)[0]
+                ]
+
+            basket = rng.choices(range(1, 9), weights=BASKET_SIZE_WEIGHTS)[0]
+            ranks = rng.choices(range(product_count), cum_weights=product_weights, k=basket)
+            total = 0.0
+            for product_id in dict.fromkeys(product_by_rank[r] for r in ranks):
+                name, price = catalog[product_id - 1]
+                quantity = rng.choices((1, 2, 3, 4), weights=QUANTITY_WEIGHTS)[0]
+                item_id += 1
+                item_rows.append({
+                    "id": item_id, "sale_id": sale_id, "product_id": product_id,
+                    "name": name, "quantity": quantity, "price_at_sale": price,
+                })
+                total += price * quantity
+
+            sale_rows.append({
+                "id": sale_id,
+                "customer_id": customer_id,
+                "timestamp": _local_to_utc(day, second),
+                "total_amount": round(total, 2),
+            })
+            if len(sale_rows) >= chunk_size:
+                flush()
+
+    if sale_rows:
+        flush()
+    return sale_id, item_id
+
+
+def _reset_id_sequences(engine, tables):
+    """
+    Rows are written with explicit ids, which leaves PostgreSQL sequences at 1;
+    move each one past the largest id so the services can insert afterwards.
+    """
+    with engine.begin() as conn:
+        for table in tables:
+            max_id = conn.execute(select(func.max(table.c.id))).scalar()
+            if max_id is not None:
+                conn.execute(select(func.setval(func.pg_get_serial_sequence(table.name, "id"), max_id)))
+
+
+def generate_dataset(
+    url,
+    customers=10_000,
+    products=2_000,
+    categories=16,
+    sales=50_000,
+    days=365,
+    end_date=date(2025, 12, 31),
+    seed=42,
+    chunk_size=50_000,
+    product_zipf=1.1,
+    customer_zipf=0.8,
+    walk_in_share=0.35,
+    log=None,
+):
+    """
+    Creates the schema at `url` and fills it with a deterministic synthetic
+    dataset. The target tables must be empty. Returns row counts and timing.
+    """
+    if customers < 1 or products < 1 or categories < 1 or sales < 0 or days < 1:
+        raise ValueError("customers, products, categories and days must be positive")
+
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    engine = build_engine(url)
+
+    try:
+        Base.metadata.create_all(engine)
+        with engine.connect() as conn:
+            for table in (Category, Customer, Product, Sale):
+                if conn.execute(select(func.count()).select_from(table)).scalar():
+                    raise ValueError(f"{table.__tablename__} is not empty; generate into a fresh database")
+
+        sqlite = engine.dialect.name == "sqlite"
+        if sqlite:
+            # Building FTS in one pass afterwards is much faster than per-row triggers.
+            with engine.begin() as conn:
+                for statement in DROP_PRODUCT_SEARCH_DDL + DROP_CUSTOMER_SEARCH_DDL:
+                    conn.exec_driver_sql(statement)
+
+        counts = {}
+        log("Writing categories...")
+        counts["categories"] = _chunks_insert(engine, Category.__table__, _category_rows(categories), chunk_size)
+        log("Writing products...")
+        catalog = []
+        counts["products"] = _chunks_insert(
+            engine, Product.__table__, _product_rows(rng, products, categories, catalog), chunk_size
+        )
+        log("Writing customers...")
+        counts["customers"] = _chunks_insert(engine, Customer.__table__, _customer_rows(rng, customers), chunk_size)
+
+        log("Writing sales and sale items...")
+        counts["sales"], counts["sale_items"] = _write_sales(engine, rng, {
+            "customers": customers,
+            "sales": sales,
+            "days": days,
+            "end_date": end_date,
+            "product_zipf": product_zipf,
+            "customer_zipf": customer_zipf,
+            "walk_in_share": walk_in_share,
+        }, catalog, chunk_size)
+
+        log("Building rollups and indexes...")
+        with sessionmaker(bind=engine)() as session:
+            rebuild_daily_sales(session)
+        # Generated sales do not move stock and there are no movements, so
+        # today's stock stamped at the start of the history is the whole ledger
+        # baseline. take_stock_snapshot would replay the (empty) ledger instead.
+        history_start = datetime.combine(end_date - timedelta(days=days - 1), datetime.min.time())
+        with engine.begin() as conn:
+            conn.execute(insert(StockSnapshot).from_select(
+                ["product_id", "taken_at", "stock"],
+                select(Product.id, literal(history_start, StockSnapshot.taken_at.type),
+                       func.coalesce(Product.stock, 0)),
+            ))
+        if not sqlite:
+            _reset_id_sequences(engine, [
+                model.__table__ for model in (Category, Product, Customer, Sale, SaleItem)
+            ])
+        if sqlite:
+            with engine.begin() as conn:
+                install_product_search(conn)
+                install_customer_search(conn)
+            with engine.connect() as conn:
+                conn.exec_driver_sql("ANALYZE")
+    finally:
+        engine.dispose()
+
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    return counts
+
+
+@click.command()
+@click.option("--db", "url", default="sqlite:///bench.db", show_default=True, help="Target database URL.")
+@click.option("--customers", default=10_000, show_default=True)
+@click.option("--products", default=2_000, show_default=True)
+@click.option("--categories", default=16, show_default=True)
+@click.option("--sales", default=50_000, show_default=True)
+@click.option("--days", default=365, show_default=True, help="Days of history ending at --end-date.")
+@click.option("--end-date", default="2025-12-31", show_default=True)
+@click.option("--seed", default=42, show_default=True)
+@click.option("--chunk-size", default=50_000, show_default=True, help="Rows per insert transaction.")
+def main(url, customers, products, categories, sales, days, end_date, seed, chunk_size):
+    """Generate a deterministic synthetic POS dataset."""
+    try:
+        counts = generate_dataset(
+            url,
+            customers=customers,
+            products=products,
+            categories=categories,
+            sales=sales,
+            days=days,
+            end_date=date.fromisoformat(end_date),
+            seed=seed,
+            chunk_size=chunk_size,
+            log=click.echo,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo("✅ Generated " + ", ".join(f"{v} {k}" for k, v in counts.items() if k != "seconds")
+               + f" in {counts['seconds']}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Opt-in SQL instrumentation.
+
+Hooks an engine's cursor events and attributes every statement to the service
+call that issued it: the innermost `operation(...)` block if one is active,
+otherwise the nearest public function in an `app.services.*` module found on
+the call stack (e.g. "sales_service.create_sale").
+
+Within one unit of work (an `operation` block, or else one database
+transaction) an identical statement executed `n_plus_one_threshold` times or
+more is flagged as a likely N+1.
+
+Enable for the app's engine with POS_SQL_INSTRUMENT=1; a summary is written to
+stderr at exit. Or attach to any engine with `instrument(engine)` and read
+`report()` / `format_report()` on demand.
+"""
+import atexit
+import contextlib
+import contextvars
+import logging
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = 5
+
+_current_scope = contextvars.ContextVar("pos_sql_scope", default=None)
+
+
+class OperationStats:
+    __slots__ = ("name", "statements", "total_time", "rows", "suspected_n_plus_one")
+
+    def __init__(self, name):
+        self.name = name
+        self.statements = 0
+        self.total_time = 0.0
+        self.rows = 0
+        self.suspected_n_plus_one = {}
+
+    def as_dict(self):
+        return {
+            "operation": self.name,
+            "statements": self.statements,
+            "total_ms": round(self.total_time * 1000, 3),
+            "rows": self.rows,
+            "suspected_n_plus_one": dict(self.suspected_n_plus_one),
+        }
+
+
+class _Scope:
+    __slots__ = ("name", "parent", "statement_counts")
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.statement_counts = {}
+
+
+def _caller_operation():
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        function = frame.f_code.co_name
+        if module.startswith("app.services.") and not function.startswith("_"):
+            return f"{module[len('app.services.'):]}.{function}"
+        frame = frame.f_back
+    return "other"
+
+
+class QueryInstrumentation:
+    def __init__(self, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._engines = []
+
+    # -- wiring ------------------------------------------------------------
+
+    def attach(self, engine):
+        if engine in self._engines:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        for name in ("begin", "commit", "rollback"):
+            event.listen(engine, name, self._reset_transaction_counts)
+        self._engines.append(engine)
+
+    def detach(self, engine):
+        if engine not in self._engines:
+            return
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        for name in ("begin", "commit", "rollback"):
+            event.remove(engine, name, self._reset_transaction_counts)
+        self._engines.remove(engine)
+
+    @contextlib.contextmanager
+    def operation(self, name):
+        """Attributes statements inside the block to `name` and makes it one unit of work."""
+        scope = _Scope(name, _current_scope.get())
+        token = _current_scope.set(scope)
+        try:
+            yield
+        finally:
+            _current_scope.reset(token)
+
+    # -- results -----------------------------------------------------------
+
+    def report(self):
+        with self._lock:
+            stats = sorted(self._stats.values(), key=lambda s: s.total_time, reverse=True)
+            return [s.as_dict() for s in stats]
+
+    def format_report(self):
+        lines = [f"{'operation':<48} {'stmts':>7} {'total ms':>10} {'rows':>8}"]
+        flagged = []
+        for entry in self.report():
+            lines.append(
+                f"{entry['operation']:<48} {entry['statements']:>7} "
+                f"{entry['total_ms']:>10.2f} {entry['rows']:>8}"
+            )
+            for statement, count in entry["suspected_n_plus_one"].items():
+                flagged.append(f"  {entry['operation']}: x{count} {' '.join(statement.split())[:120]}")
+        if flagged:
+            lines.append("Suspected N+1 statements:")
+            lines.extend(flagged)
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    # -- event handlers ----------------------------------------------------
+
+    # The start time lives on the statement's execution context, which dies
+    # with it, so a statement that fails (and gets no after_cursor_execute)
+    # leaves nothing behind on the connection.
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._pos_sql_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_pos_sql_started", None)
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+
+        scope = _current_scope.get()
+        if scope is not None:
+            name = scope.name
+            counts = scope.statement_counts
+        else:
+            name = _caller_operation()
+            counts = conn.info.setdefault("pos_sql_counts", {})
+
+        seen = counts.get(statement, 0) + 1
+        counts[statement] = seen
+        # DBAPIs report -1 when the row count is unknown (e.g. SQLite SELECTs).
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats(name)
+            stats.statements += 1
+            stats.total_time += elapsed
+            stats.rows += rows
+            if seen >= self.n_plus_one_threshold:
+                first_flag = statement not in stats.suspected_n_plus_one
+                stats.suspected_n_plus_one[statement] = max(
+                    seen, stats.suspected_n_plus_one.get(statement, 0)
+                )
+            else:
+                first_flag = False
+
+        if first_flag:
+            logger.warning("Possible N+1 in %s: statement repeated %d times: %s",
+                           name, seen, " ".join(statement.split())[:200])
+
+    def _reset_transaction_counts(self, conn):
+        conn.info.pop("pos_sql_counts", None)
+
+
+query_stats = QueryInstrumentation()
+
+
+def instrument(engine):
+    query_stats.attach(engine)
+
+
+def operation(name):
+    return query_stats.operation(name)
+
+
+def report():
+    return query_stats.report()
+
+
+def format_report():
+    return query_stats.format_report()
+
+
+def reset():
+    query_stats.reset()
+
+
+_exit_dump_registered = False
+
+
+def dump_at_exit():
+    global _exit_dump_registered
+    if not _exit_dump_registered:
+        atexit.register(lambda: print(format_report(), file=sys.stderr))
+        _exit_dump_registered = True
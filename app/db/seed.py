@@ -1,6 +1,6 @@
 from datetime import datetime
 import random
-from sqlalchemy import text
+from sqlalchemy import inspect
 from app.db.engine import engine, SessionLocal
 from app.models import Base
 from app.models.customer import Customer
@@ -8,6 +8,8 @@ from app.models.product import Product
 from app.models.category import Category
 from app.models.sale import Sale
 from app.models.sale_item import SaleItem
+from app.services.sales_service import rebuild_daily_sales
+from app.services.stock_ledger_service import take_stock_snapshot
 
 # Categories
 CATEGORY_NAMES = ["Beverages", "Grocery", "Snacks", "Frozen Foods", "Dairy"]
@@ -126,11 +128,8 @@ def seed_sales_and_items(session, num_sales=10):
 
 def show_tables():
     print("Current tables:")
-    session = SessionLocal()
-    tables = session.execute(text("SELECT name FROM sqlite_master WHERE type='table';")).fetchall()
-    for table in tables:
-        print("-", table[0])
-    session.close()
+    for table in inspect(engine).get_table_names():
+        print("-", table)
 
 def run_seed():
     print("Creating all tables...")
@@ -141,6 +140,9 @@ def run_seed():
     seed_customers(session)
     seed_products(session)
     seed_sales_and_items(session, num_sales=15)
+    rebuild_daily_sales(session)
+    # Seeded stock is set directly, so record it as the ledger baseline.
+    take_stock_snapshot(session)
     show_tables()
     session.close()
     print("Seeding complete.")
@@ -2,9 +2,17 @@ from sqlalchemy import (
     Column, String, Integer, Boolean,
     CheckConstraint, PrimaryKeyConstraint, UniqueConstraint, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from . import Base
 
+
+def normalize_customer_name(name):
+    """Case-folded, whitespace-collapsed form of a name, used for indexed lookups."""
+    if name is None:
+        return None
+    return " ".join(name.split()).casefold()
+
+
 class Customer(Base):
     __tablename__ = 'customers'
 
@@ -13,10 +21,12 @@ class Customer(Base):
         PrimaryKeyConstraint('id', name='pk_customer_id'),
         UniqueConstraint('email', name='uq_customer_email'),
         Index('idx_customer_name', 'name'),
-        Index('idx_customer_email', 'email')
+        Index('idx_customer_email', 'email'),
+        Index('idx_customer_search_name', 'search_name'),
     )
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
+    search_name = Column(String(100), nullable=True)  # normalize_customer_name(name)
     email = Column(String(100), nullable=False, unique=True)
     phone = Column(String(15), nullable=True)
 
@@ -28,6 +38,11 @@ class Customer(Base):
 
     sales = relationship("Sale", back_populates="customer", cascade="all, delete-orphan")
 
+    @validates("name")
+    def _sync_search_name(self, key, value):
+        self.search_name = normalize_customer_name(value)
+        return value
+
     def __repr__(self):
         return f"<Customer id={self.id}, name='{self.name}', email='{self.email}'>"
     
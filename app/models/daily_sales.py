@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Float, Integer
+from . import Base
+
+class DailySales(Base):
+    """
+    Per-day sales rollup, maintained in the same transaction as every sale write
+    so day-level reports read one row per day instead of scanning `sales`.
+    `day` is the store-local business day (see app.utils.time_utils).
+    """
+    __tablename__ = 'daily_sales'
+
+    day = Column(Date, primary_key=True)
+    sale_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    item_units = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailySales day={self.day} sale_count={self.sale_count} revenue={self.revenue}>"
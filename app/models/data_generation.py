@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String
+from . import Base
+
+class DataGeneration(Base):
+    """
+    Monotonic change counter per data scope (e.g. 'sales'). Writers bump it in
+    the same transaction as their change; caches compare it to decide whether a
+    stored result is still current, across every process sharing the database.
+    """
+    __tablename__ = 'data_generations'
+
+    scope = Column(String(50), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataGeneration scope={self.scope} generation={self.generation}>"
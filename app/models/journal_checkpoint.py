@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from . import Base
+
+class JournalCheckpoint(Base):
+    """
+    Highest checkout-journal sequence number already written to the sales
+    tables, per journal. It is advanced in the same transaction as the sales it
+    covers, so replaying a journal never records a sale twice.
+    """
+    __tablename__ = 'journal_checkpoints'
+
+    journal = Column(String(100), primary_key=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<JournalCheckpoint journal={self.journal} last_seq={self.last_seq}>"
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from . import Base
 from app.models.category import Category
 from sqlalchemy.orm import relationship
 
 class Product(Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        Index('idx_products_category_id', 'category_id'),
+        Index('idx_products_name', 'name'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
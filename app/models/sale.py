@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from sqlalchemy import (
-    Column, Integer, Float, DateTime, ForeignKey,
+    Column, Integer, Float, DateTime, ForeignKey, String,
     CheckConstraint, Index
 )
 from sqlalchemy.orm import relationship
@@ -10,14 +10,19 @@ class Sale(Base):
     __tablename__ = 'sales'
     __table_args__ = (
         CheckConstraint('total_amount >= 0', name='check_total_amount_positive'),
-        Index('idx_sales_customer_id', 'customer_id'),
-        Index('idx_sales_timestamp', 'timestamp'),
+        # Composite keys match the (timestamp, id) ordering used by keyset pagination;
+        # the trailing columns let date-range totals be read from the index alone.
+        Index('idx_sales_timestamp_id_customer_amount', 'timestamp', 'id', 'customer_id', 'total_amount'),
+        Index('idx_sales_customer_timestamp_id_amount', 'customer_id', 'timestamp', 'id', 'total_amount'),
+        # Client-generated key that makes retried checkouts safe; NULLs do not collide.
+        Index('idx_sales_idempotency_key', 'idempotency_key', unique=True),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey('customers.id'), nullable=False)
     timestamp = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     total_amount = Column(Float, nullable=False)
+    idempotency_key = Column(String(64), nullable=True)
 
     customer = relationship("Customer", back_populates="sales")
 
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from app.db.engine import Base
 
 class SaleItem(Base):
     __tablename__ = "sale_items"
+    __table_args__ = (
+        # Sale.items selectin loads and cascade deletes; covers date-range product reports.
+        Index('idx_sale_items_sale_product', 'sale_id', 'product_id', 'quantity', 'price_at_sale'),
+        # Product FK lookups, plus per-product quantity/revenue reads straight from the index.
+        Index('idx_sale_items_product_sale', 'product_id', 'sale_id', 'quantity', 'price_at_sale'),
+    )
 
     id = Column(Integer, primary_key=True)
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from . import Base
+
+class SalesArchive(Base):
+    """
+    A per-year SQLite database that sales and their items were moved to (see
+    app.services.archive_service). first_sale_at / last_sale_at bound the
+    timestamps it holds, so reports attach it only when their range reaches it.
+    """
+    __tablename__ = 'sales_archives'
+
+    year = Column(Integer, primary_key=True)
+    path = Column(String, nullable=False)
+    first_sale_at = Column(DateTime, nullable=False)
+    last_sale_at = Column(DateTime, nullable=False)
+    sale_count = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SalesArchive year={self.year} sale_count={self.sale_count} path={self.path}>"
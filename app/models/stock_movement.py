@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from . import Base
+
+MOVEMENT_TYPES = ("receipt", "sale", "adjustment", "return")
+
+class StockMovement(Base):
+    """
+    Append-only ledger of stock changes. `quantity` is signed: receipts and
+    returns add, sales take away, adjustments go either way. Written in the
+    same transaction as the Product.stock change it records.
+    """
+    __tablename__ = 'stock_movements'
+    __table_args__ = (
+        # Per-product deltas after a snapshot, and ledger scans for a period.
+        Index('idx_stock_movements_product_time', 'product_id', 'occurred_at', 'quantity'),
+        Index('idx_stock_movements_time', 'occurred_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    movement_type = Column(String(20), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    occurred_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    # No FK: the ledger outlives deleted or archived sales.
+    sale_id = Column(Integer, nullable=True)
+    note = Column(String, nullable=True)
+
+    def __repr__(self):
+        return (f"<StockMovement id={self.id} product_id={self.product_id} "
+                f"type={self.movement_type} quantity={self.quantity}>")
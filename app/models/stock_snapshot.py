@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+from . import Base
+
+class StockSnapshot(Base):
+    """
+    Product.stock captured at `taken_at`, for every product at once. Stock at
+    any later moment is the latest snapshot plus the stock_movements after it.
+    """
+    __tablename__ = 'stock_snapshots'
+    __table_args__ = (
+        Index('idx_stock_snapshots_taken_at', 'taken_at'),
+    )
+
+    product_id = Column(Integer, ForeignKey('products.id'), primary_key=True)
+    taken_at = Column(DateTime, primary_key=True)
+    stock = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<StockSnapshot product_id={self.product_id} taken_at={self.taken_at} stock={self.stock}>"
@@ -0,0 +1,262 @@
+"""
+Archiving of closed sales periods into per-year SQLite databases.
+
+archive_sales() moves sales older than a cutoff, with their items, out of the
+hot `sales` / `sale_items` tables into one database file per store-local year
+(sales-2023.db, ...), in chunked transactions. Each archive is ATTACHed to the
+hot database as `archive_<year>` while rows are copied and deleted, and is
+catalogued in sales_archives with the range of timestamps it holds. The hot
+database keeps only recent sales, so its indexes stay small and VACUUM and
+backups stop paying for cold history.
+
+What archiving leaves in place:
+
+- daily_sales: the rollup keeps archived days, so get_sales_summary_by_day
+  never needs the archives.
+- stock_movements: the ledger keeps its rows (sale_id then points into an
+  archive).
+
+Reports and exports that read sales directly use sales_source() /
+sale_lines_source().
+They attach only the archives whose range overlaps the report's dates and
+UNION ALL them with the hot tables; a range inside the hot period reads the
+hot tables alone. SQLite attaches at most 10 databases per connection by
+default, which bounds how many archived years one report can span.
+
+Archiving is SQLite-only. In WAL mode a transaction spanning attached
+databases is atomic per file, not across files. Rows are copied with
+INSERT OR IGNORE, so re-running after a crash completes the move without
+duplicating the copies.
+"""
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, select, union_all
+
+from app.db.dialect import dialect_insert
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.models.sales_archive import SalesArchive
+from app.services.report_cache import bump_generation
+from app.utils.time_utils import parse_bound, store_day_start, store_local_date, to_utc
+
+ARCHIVE_DIR = os.environ.get("POS_ARCHIVE_DIR", "archive")
+ARCHIVE_CHUNK_SIZE = 500
+
+_archive_metadata = {}
+
+
+def archive_schema(year):
+    return f"archive_{int(year)}"
+
+
+def _archive_tables(schema):
+    """
+    sales and sale_items as they are laid out in an archive. Foreign keys are
+    left out: customers and products stay in the hot database.
+    """
+    if schema not in _archive_metadata:
+        metadata = MetaData()
+        tables = []
+        for source in (Sale.__table__, SaleItem.__table__):
+            columns = [
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable, autoincrement=False)
+                for c in source.columns
+            ]
+            tables.append(Table(source.name, metadata, *columns, schema=schema))
+        sales, items = tables
+        Index("idx_archive_sales_timestamp", sales.c.timestamp, sales.c.id)
+        Index("idx_archive_sale_items_sale", items.c.sale_id)
+        _archive_metadata[schema] = (sales, items)
+    return _archive_metadata[schema]
+
+
+def _attach(connection, schema, path):
+    attached = {row[1] for row in connection.exec_driver_sql("PRAGMA database_list")}
+    if schema not in attached:
+        connection.exec_driver_sql(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+
+
+def _cutoff(before):
+    """A date means the start of that store-local day; datetimes are UTC unless aware."""
+    value = parse_bound(before)
+    if isinstance(value, datetime):
+        return to_utc(value).replace(tzinfo=None)
+    return store_day_start(value)
+
+
+def _move_chunk(db, year, rows, archive_dir):
+    schema = archive_schema(year)
+    path = (archive_dir / f"sales-{year}.db").resolve()
+    ids = [row.id for row in rows]
+    hot_sales, hot_items = Sale.__table__, SaleItem.__table__
+    sales, items = _archive_tables(schema)
+
+    connection = db.connection()
+    # ATTACH and CREATE run before this chunk's first write, so they are not
+    # inside an open SQLite transaction.
+    _attach(connection, schema, path)
+    sales.metadata.create_all(connection)
+
+    try:
+        connection.execute(sales.insert().prefix_with("OR IGNORE").from_select(
+            [c.name for c in hot_sales.columns],
+            select(*hot_sales.columns).where(hot_sales.c.id.in_(ids)),
+        ))
+        connection.execute(items.insert().prefix_with("OR IGNORE").from_select(
+            [c.name for c in hot_items.columns],
+            select(*hot_items.columns).where(hot_items.c.sale_id.in_(ids)),
+        ))
+        connection.execute(delete(hot_items).where(hot_items.c.sale_id.in_(ids)))
+        connection.execute(delete(hot_sales).where(hot_sales.c.id.in_(ids)))
+
+        table = SalesArchive.__table__
+        stmt = dialect_insert(db, table).values(
+            year=year,
+            path=str(path),
+            first_sale_at=rows[0].timestamp,
+            last_sale_at=rows[-1].timestamp,
+            sale_count=len(ids),
+            archived_at=datetime.now(timezone.utc),
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.year],
+            set_={
+                "path": stmt.excluded.path,
+                "first_sale_at": func.min(table.c.first_sale_at, stmt.excluded.first_sale_at),
+                "last_sale_at": func.max(table.c.last_sale_at, stmt.excluded.last_sale_at),
+                "sale_count": table.c.sale_count + stmt.excluded.sale_count,
+                "archived_at": stmt.excluded.archived_at,
+            },
+        ))
+        bump_generation(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def archive_sales(db, before, archive_dir=None, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Moves every sale older than `before` (a date: the start of that store-local
+    day; or a datetime) and its items into per-year archives under
+    `archive_dir` (POS_ARCHIVE_DIR, default ./archive), committing every
+    `chunk_size` sales. Returns {year: sales moved}.
+
+    The sale with the highest id always stays hot: SQLite reuses the largest
+    rowid once it is deleted, and archived ids must stay unique.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        raise ValueError("Sales archiving needs a SQLite database")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    cutoff = _cutoff(before)
+    archive_dir = Path(archive_dir or ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    newest_id = db.execute(select(func.max(Sale.id))).scalar()
+    db.commit()
+
+    moved = {}
+    while True:
+        rows = db.execute(
+            select(Sale.id, Sale.timestamp)
+            .where(Sale.timestamp < cutoff, Sale.id != newest_id)
+            .order_by(Sale.timestamp, Sale.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return moved
+        # One archive file per chunk: stop the chunk where the year changes.
+        year = store_local_date(rows[0].timestamp).year
+        rows = [row for row in rows if store_local_date(row.timestamp).year == year]
+        _move_chunk(db, year, rows, archive_dir)
+        moved[year] = moved.get(year, 0) + len(rows)
+
+
+def _naive_utc(value):
+    return to_utc(value).replace(tzinfo=None) if isinstance(value, datetime) else value
+
+
+def attach_archives(db, start_date=None, end_date=None):
+    """
+    Attaches the archives holding sales in [start_date, end_date] (UTC
+    datetimes, None for open-ended) to the session's connection and returns
+    their schema names, oldest first.
+    """
+    start, end = _naive_utc(start_date), _naive_utc(end_date)
+    stmt = select(SalesArchive.year, SalesArchive.path).order_by(SalesArchive.year)
+    if start:
+        stmt = stmt.where(SalesArchive.last_sale_at >= start)
+    if end:
+        stmt = stmt.where(SalesArchive.first_sale_at <= end)
+    archives = db.execute(stmt).all()
+    if not archives:
+        return []
+
+    connection = db.connection()
+    schemas = []
+    for year, path in archives:
+        if not os.path.exists(path):
+            raise ValueError(f"Sales archive for {year} is missing: {path}")
+        schema = archive_schema(year)
+        _attach(connection, schema, path)
+        schemas.append(schema)
+    return schemas
+
+
+def _in_range(stmt, timestamp, start, end):
+    if start:
+        stmt = stmt.where(timestamp >= start)
+    if end:
+        stmt = stmt.where(timestamp <= end)
+    return stmt
+
+
+def sales_source(db, start_date=None, end_date=None):
+    """
+    The sales to report on for a date range: the `sales` table itself, or a
+    UNION ALL of it and the archives the range reaches. Either way it has the
+    columns id, customer_id, total_amount and timestamp; callers still apply
+    their own date filter.
+    """
+    schemas = attach_archives(db, start_date, end_date)
+    if not schemas:
+        return Sale.__table__
+
+    start, end = _naive_utc(start_date), _naive_utc(end_date)
+    parts = []
+    for sales in [Sale.__table__] + [_archive_tables(schema)[0] for schema in schemas]:
+        stmt = select(sales.c.id, sales.c.customer_id, sales.c.total_amount, sales.c.timestamp)
+        parts.append(_in_range(stmt, sales.c.timestamp, start, end))
+    return union_all(*parts).subquery("sales")
+
+
+def sale_lines_source(db, start_date=None, end_date=None):
+    """
+    Sale items joined to their sale (sale_id, customer_id, total_amount,
+    timestamp, item_id, product_id, name, quantity, price_at_sale) across the
+    archives the range reaches, or None when the hot tables cover it and
+    callers should join them directly. Items are joined to sales inside each
+    database, so sale ids only need to be unique per database.
+    """
+    schemas = attach_archives(db, start_date, end_date)
+    if not schemas:
+        return None
+
+    start, end = _naive_utc(start_date), _naive_utc(end_date)
+    parts = []
+    tables = [(Sale.__table__, SaleItem.__table__)] + [_archive_tables(schema) for schema in schemas]
+    for sales, items in tables:
+        stmt = (
+            select(
+                sales.c.id.label("sale_id"), sales.c.customer_id, sales.c.total_amount, sales.c.timestamp,
+                items.c.id.label("item_id"), items.c.product_id, items.c.name, items.c.quantity,
+                items.c.price_at_sale,
+            )
+            .select_from(items)
+            .join(sales, sales.c.id == items.c.sale_id)
+        )
+        parts.append(_in_range(stmt, sales.c.timestamp, start, end))
+    return union_all(*parts).subquery("sale_lines")
@@ -0,0 +1,128 @@
+"""
+asyncio counterparts of the sales, inventory, customer and reporting services.
+
+Each function takes an AsyncSession and runs the sync service of the same name
+through AsyncSession.run_sync, so validation, stock checks, the stock ledger,
+the daily rollup and cache invalidation are shared, not re-implemented. While
+one call waits on the database the event loop serves other terminals. Use one
+AsyncSession per task; sessions are not safe to share between tasks.
+
+Returned ORM objects are fully loaded before the call returns, but they can
+only be read without I/O. Unloaded relationships, and columns expired by a
+later commit or rollback, would need a lazy load outside an await and raise
+MissingGreenlet. So read what you need straight away. The read models and the
+stream_* functions return plain rows.
+
+    async with AsyncSessionLocal() as db:
+        sale = await create_sale(db, customer_id, items)
+        async for line in stream_sale_lines(db, "2025-01-01", "2025-12-31"):
+            ...
+"""
+import functools
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.state import InstanceState
+
+from app.services import (
+    catalog_cache,
+    customer_service,
+    inventory_service,
+    read_models,
+    reporting_service,
+    sales_service,
+    stock_ledger_service,
+)
+from app.services.export_service import EXPORT_BATCH_SIZE, archived_sale_lines_query, sale_line
+
+
+def _load_expired(session, value):
+    """Reloads ORM objects in `value` that the service's commit expired, while I/O is still possible."""
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            _load_expired(session, item)
+        return
+    state = inspect(value, raiseerr=False)
+    if isinstance(state, InstanceState) and state.key is not None and state.expired_attributes:
+        session.refresh(value)
+
+
+def _run_sync(fn):
+    def call(session, *args, **kwargs):
+        result = fn(session, *args, **kwargs)
+        _load_expired(session, result)
+        return result
+
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        return await db.run_sync(call, *args, **kwargs)
+    return wrapper
+
+
+# Sales
+create_sale = _run_sync(sales_service.create_sale)
+create_sales_bulk = _run_sync(sales_service.create_sales_bulk)
+get_sale_by_id = _run_sync(sales_service.get_sale_by_id)
+get_all_sales_keyset = _run_sync(sales_service.get_all_sales_keyset)
+get_sales_by_customer_keyset = _run_sync(sales_service.get_sales_by_customer_keyset)
+list_sales_with_summary = _run_sync(sales_service.list_sales_with_summary)
+delete_sale = _run_sync(sales_service.delete_sale)
+get_sales_summary_by_day = _run_sync(sales_service.get_sales_summary_by_day)
+get_sales_summary_by_customer = _run_sync(sales_service.get_sales_summary_by_customer)
+
+# Inventory
+create_product = _run_sync(inventory_service.create_product)
+update_product = _run_sync(inventory_service.update_product)
+delete_product = _run_sync(inventory_service.delete_product)
+get_product_by_id = _run_sync(inventory_service.get_product_by_id)
+search_products = _run_sync(inventory_service.search_products)
+create_category = _run_sync(inventory_service.create_category)
+update_category = _run_sync(inventory_service.update_category)
+purchase_product = _run_sync(inventory_service.purchase_product)
+receive_stock_bulk = _run_sync(inventory_service.receive_stock_bulk)
+adjust_stock = _run_sync(stock_ledger_service.adjust_stock)
+get_product_snapshot = _run_sync(catalog_cache.get_product_snapshot)
+get_product_snapshot_by_barcode = _run_sync(catalog_cache.get_product_snapshot_by_barcode)
+
+# Customers
+create_customer = _run_sync(customer_service.create_customer)
+get_customer_by_id = _run_sync(customer_service.get_customer_by_id)
+get_customer_by_email = _run_sync(customer_service.get_customer_by_email)
+search_customers = _run_sync(customer_service.search_customers)
+update_customer = _run_sync(customer_service.update_customer)
+soft_delete_customer = _run_sync(customer_service.soft_delete_customer)
+add_loyalty_points = _run_sync(customer_service.add_loyalty_points)
+apply_discount = _run_sync(customer_service.apply_discount)
+
+# Read models and reports
+list_product_rows = _run_sync(read_models.list_product_rows)
+list_customer_rows = _run_sync(read_models.list_customer_rows)
+list_sale_headers = _run_sync(read_models.list_sale_headers)
+total_sales_per_customer = _run_sync(reporting_service.total_sales_per_customer)
+top_customers_by_sales = _run_sync(reporting_service.top_customers_by_sales)
+customer_purchase_frequency = _run_sync(reporting_service.customer_purchase_frequency)
+top_products_by_revenue = _run_sync(reporting_service.top_products_by_revenue)
+top_products_by_units = _run_sync(reporting_service.top_products_by_units)
+revenue_by_category = _run_sync(reporting_service.revenue_by_category)
+
+
+async def _stream(db, stmt, make_row, batch_size):
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    try:
+        async for partition in result.partitions(batch_size):
+            for row in partition:
+                yield make_row(row)
+    finally:
+        await result.close()
+
+
+async def stream_sale_lines(db, start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE):
+    """Async iterator over export_service sale lines, fetched batch by batch from a server-side cursor."""
+    # Attaching archived years needs the session's connection, so it runs in run_sync.
+    stmt = await db.run_sync(archived_sale_lines_query, start_date, end_date)
+    async for line in _stream(db, stmt, sale_line, batch_size):
+        yield line
+
+
+def stream_product_rows(db, category_id=None, batch_size=EXPORT_BATCH_SIZE):
+    """Async iterator of ProductRow for the whole catalogue without holding it in memory."""
+    return _stream(db, read_models.product_rows_query(category_id), read_models.ProductRow._make, batch_size)
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+
+from app.models.product import Product
+from app.services.report_cache import current_generation
+
+CATALOG_CACHE_SIZE = int(os.environ.get("POS_CATALOG_CACHE_SIZE", "20000"))
+CATALOG_CACHE_CHECK_INTERVAL = float(os.environ.get("POS_CATALOG_CACHE_CHECK_INTERVAL", "5"))
+
+# DataGeneration scope bumped by every product write made through the services.
+CATALOG_SCOPE = "catalog"
+
+
+class ProductSnapshot(NamedTuple):
+    """
+    Immutable view of a product for scanning and pricing. Stock is left out on
+    purpose: it changes on every sale and is enforced by create_sale itself.
+    """
+    id: int
+    name: str
+    brand: str
+    purchase_price: float
+    selling_price: float
+    barcode: Optional[str]
+    category_id: Optional[int]
+    unit: Optional[str]
+
+
+_SNAPSHOT_COLUMNS = [getattr(Product, field) for field in ProductSnapshot._fields]
+
+
+class ProductCatalogCache:
+    """
+    Process-local LRU of ProductSnapshot keyed by product id, with a secondary
+    barcode -> id index. Writers must call `invalidate` after committing.
+
+    A generation counter guards the read path: a snapshot loaded while an
+    invalidation happened is returned but not stored, so a slow reader can never
+    put a pre-update price back into the cache.
+
+    Writes in other processes are picked up through the database's 'catalog'
+    generation (see DataGeneration), which every product write bumps. It is
+    read at most every `check_interval` seconds, and the whole cache is dropped
+    when it has moved. So a price changed by another process is served stale
+    for at most `check_interval` seconds; one changed in this process is seen
+    at once. Changes made with plain SQL bump nothing and last until the entry
+    is evicted or clear() is called.
+    """
+
+    def __init__(self, max_size=CATALOG_CACHE_SIZE, check_interval=CATALOG_CACHE_CHECK_INTERVAL,
+                 clock=time.monotonic):
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self._clock = clock
+        self._by_id = OrderedDict()
+        self._id_by_barcode = {}
+        self._generation = 0
+        self._db_generation = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_database(self, db):
+        now = self._clock()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+        db_generation = current_generation(db, CATALOG_SCOPE)
+        with self._lock:
+            if db_generation != self._db_generation:
+                self._generation += 1
+                self._by_id.clear()
+                self._id_by_barcode.clear()
+                self._db_generation = db_generation
+
+    def get(self, db, product_id):
+        self._check_database(db)
+        with self._lock:
+            snapshot = self._by_id.get(product_id)
+            if snapshot is not None:
+                self._by_id.move_to_end(product_id)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            generation = self._generation
+        return self._load(db, Product.id == product_id, generation)
+
+    def get_by_barcode(self, db, barcode):
+        self._check_database(db)
+        with self._lock:
+            product_id = self._id_by_barcode.get(barcode)
+            if product_id is not None:
+                self._by_id.move_to_end(product_id)
+                self.hits += 1
+                return self._by_id[product_id]
+            self.misses += 1
+            generation = self._generation
+        return self._load(db, Product.barcode == barcode, generation)
+
+    def invalidate(self, product_id=None, barcode=None):
+        with self._lock:
+            self._generation += 1
+            if barcode is not None and product_id is None:
+                product_id = self._id_by_barcode.get(barcode)
+            if product_id is not None:
+                self._discard(product_id)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._by_id.clear()
+            self._id_by_barcode.clear()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _load(self, db, criterion, generation):
+        row = db.execute(select(*_SNAPSHOT_COLUMNS).where(criterion)).first()
+        if row is None:
+            return None
+        snapshot = ProductSnapshot(*row)
+        with self._lock:
+            if generation == self._generation:
+                self._store(snapshot)
+        return snapshot
+
+    def _store(self, snapshot):
+        self._discard(snapshot.id)
+        self._by_id[snapshot.id] = snapshot
+        if snapshot.barcode:
+            self._id_by_barcode[snapshot.barcode] = snapshot.id
+        while len(self._by_id) > self.max_size:
+            _, evicted = self._by_id.popitem(last=False)
+            self._forget_barcode(evicted)
+
+    def _discard(self, product_id):
+        snapshot = self._by_id.pop(product_id, None)
+        if snapshot is not None:
+            self._forget_barcode(snapshot)
+
+    def _forget_barcode(self, snapshot):
+        if snapshot.barcode and self._id_by_barcode.get(snapshot.barcode) == snapshot.id:
+            del self._id_by_barcode[snapshot.barcode]
+
+
+catalog_cache = ProductCatalogCache()
+
+
+def get_product_snapshot(db, product_id):
+    return catalog_cache.get(db, product_id)
+
+
+def get_product_snapshot_by_barcode(db, barcode):
+    return catalog_cache.get_by_barcode(db, barcode)
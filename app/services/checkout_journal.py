@@ -0,0 +1,448 @@
+"""
+Offline-first checkout: a local append-only journal and a background flusher.
+
+record_sale() validates a sale, appends it to the journal as one JSON line and
+returns as soon as the line is on disk. It never touches the shared database,
+so checkout latency is bounded by local disk and tills keep selling while the
+database is locked or down. Concurrent appends share fsyncs (group commit):
+one caller syncs everything written so far and the callers waiting behind it
+return together.
+
+JournalFlusher drains the journal into the sales tables in batches through the
+bulk insert path of sales_service (stock, ledger, rollup and report cache
+included). Each batch commits together with the journal's row in
+journal_checkpoints, so after a crash or restart the flusher replays from the
+checkpoint and no sale is recorded twice. Journaled sales have already
+happened, so a stock shortfall does not refuse them: stock goes below zero and
+the ledger rows are noted "oversold" for the next stock-take. A sale that
+cannot be written at all (e.g. its customer or product no longer exists) is
+appended to rejected.jsonl in the journal directory and skipped, so it cannot
+hold up the sales behind it; rejected_sales() lists those and
+redrive_rejected() retries them once the cause is fixed.
+
+The journal is a directory of segment files named after their first sequence
+number. Segments the checkpoint has passed are deleted as the flusher goes;
+the newest one is always kept, so sequence numbers carry on across restarts.
+A journal directory must not be emptied while its checkpoint row exists.
+
+    journal = CheckoutJournal("/var/lib/pos/journal/till-1")
+    flusher = JournalFlusher(journal)
+    flusher.start()        # replays anything left from the last run
+    record_sale(journal, customer_id, items)
+    ...
+    flusher.stop()         # final flush
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.db.dialect import dialect_insert
+from app.db.engine import SessionLocal
+from app.models.journal_checkpoint import JournalCheckpoint
+from app.services.sales_service import (
+    BULK_BATCH_SIZE,
+    SaleServiceError,
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    insert_sales_batch,
+    validate_sale_data,
+)
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SEGMENT_SIZE = 4 * 1024 * 1024
+JOURNAL_FLUSH_INTERVAL = float(os.environ.get("POS_JOURNAL_FLUSH_INTERVAL", "1.0"))
+
+REJECTED_FILE = "rejected.jsonl"
+# rejected.jsonl is moved here while it is being re-driven.
+_REDRIVE_FILE = "rejected.redrive.jsonl"
+_SEGMENT_SUFFIX = ".jsonl"
+
+
+class JournalError(Exception):
+    """The journal and its checkpoint disagree, e.g. a second flusher is draining the same journal."""
+
+
+def _fsync_directory(path):
+    # Makes a new segment file's directory entry durable (not possible on Windows).
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CheckoutJournal:
+    """
+    Append-only, fsync'd log of checkout records in `directory`. `name` keys the
+    journal's checkpoint in the database and defaults to the directory name,
+    so give every till its own directory.
+    """
+
+    def __init__(self, directory, name=None, segment_size=JOURNAL_SEGMENT_SIZE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.name = name or self.directory.name
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._syncing = False
+
+        segments = self._segments()
+        if segments:
+            first_seq, path = segments[-1]
+            self._next_seq = self._recover(first_seq, path)
+            self._file = open(path, "ab")
+        else:
+            self._next_seq = 1
+            self._file = self._create_segment(1)
+        self._synced_seq = self._next_seq - 1
+
+    @property
+    def last_seq(self):
+        """Sequence number of the newest durable record (0 for a new journal)."""
+        with self._lock:
+            return self._synced_seq
+
+    def _segments(self):
+        segments = []
+        for path in self.directory.glob(f"*{_SEGMENT_SUFFIX}"):
+            if path.stem.isdigit():
+                segments.append((int(path.stem), path))
+        return sorted(segments)
+
+    def _create_segment(self, first_seq):
+        f = open(self.directory / f"{first_seq:020d}{_SEGMENT_SUFFIX}", "ab")
+        _fsync_directory(self.directory)
+        return f
+
+    def _recover(self, first_seq, path):
+        """Drops a torn last line left by a crash mid-write; returns the next sequence number."""
+        next_seq = first_seq
+        good_size = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    next_seq = json.loads(line)["seq"] + 1
+                except (ValueError, KeyError):
+                    break
+                good_size += len(line)
+        if good_size < path.stat().st_size:
+            logger.warning("Truncating torn record at byte %d of %s", good_size, path)
+            with open(path, "r+b") as f:
+                f.truncate(good_size)
+                os.fsync(f.fileno())
+        return next_seq
+
+    def _roll(self):
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._synced_seq = self._next_seq - 1
+        self._file = self._create_segment(self._next_seq)
+
+    def append(self, record):
+        """
+        Appends `record` (a JSON-serialisable dict) and returns its sequence
+        number once the record has been fsync'd.
+        """
+        with self._lock:
+            if self._file.tell() >= self.segment_size:
+                while self._syncing:
+                    self._synced.wait()
+                if self._file.tell() >= self.segment_size:
+                    self._roll()
+
+            seq = self._next_seq
+            self._next_seq += 1
+            line = json.dumps({"seq": seq, **record}, separators=(",", ":")) + "\n"
+            self._file.write(line.encode("utf-8"))
+            self._file.flush()
+
+            while self._synced_seq < seq:
+                if self._syncing:
+                    self._synced.wait()
+                    continue
+                # Become the leader: sync everything written so far, outside the
+                # lock so other tills can keep appending to the next group.
+                self._syncing = True
+                target = self._next_seq - 1
+                fd = self._file.fileno()
+                self._lock.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._lock.acquire()
+                    self._syncing = False
+                    self._synced.notify_all()
+                self._synced_seq = target
+        return seq
+
+    def records(self, after_seq=0):
+        """Yields durable records with seq > `after_seq`, oldest first."""
+        last_seq = self.last_seq
+        segments = self._segments()
+        for index, (first_seq, path) in enumerate(segments):
+            if index + 1 < len(segments) and segments[index + 1][0] <= after_seq + 1:
+                continue
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    record = json.loads(line)
+                    if record["seq"] > last_seq:
+                        return
+                    if record["seq"] > after_seq:
+                        yield record
+
+    def prune(self, upto_seq):
+        """Deletes segments whose records are all at or below `upto_seq`, keeping the newest."""
+        with self._lock:
+            segments = self._segments()
+            for (first_seq, path), (next_first, _) in zip(segments, segments[1:]):
+                if next_first <= upto_seq + 1:
+                    path.unlink()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def record_sale(journal, customer_id, sale_items_data, timestamp=None, idempotency_key=None):
+    """
+    Offline counterpart of sales_service.create_sale: validates the items,
+    journals the sale and returns its record (seq, customer_id, items,
+    timestamp, total_amount). Customer, product and stock checks happen when
+    the flusher writes the sale to the database; an idempotency_key is stored
+    with the sale there, and a key that is already recorded is not sold twice.
+    """
+    if not isinstance(customer_id, int) or customer_id <= 0:
+        raise SaleServiceError("customer_id must be a positive integer")
+    validate_sale_data(sale_items_data, idempotency_key)
+
+    timestamp = timestamp or datetime.now(timezone.utc)
+    record = {
+        "customer_id": customer_id,
+        "items": sale_items_data,
+        "timestamp": timestamp.isoformat(),
+        "total_amount": sum(item["price_at_sale"] * item["quantity"] for item in sale_items_data),
+    }
+    if idempotency_key:
+        record["idempotency_key"] = idempotency_key
+    record["seq"] = journal.append(record)
+    return record
+
+
+class JournalFlusher:
+    """
+    Writes a journal's records to the database `batch_size` at a time, every
+    `interval` seconds on a background thread (start/stop), or on demand with
+    flush(). Run one flusher per journal.
+    """
+
+    def __init__(self, journal, session_factory=SessionLocal, batch_size=BULK_BATCH_SIZE,
+                 interval=JOURNAL_FLUSH_INTERVAL):
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        self.journal = journal
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.flushed = 0
+        self.rejected = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _checkpoint(self, session):
+        last_seq = session.execute(
+            select(JournalCheckpoint.last_seq).where(JournalCheckpoint.journal == self.journal.name)
+        ).scalar()
+        if last_seq is None:
+            table = JournalCheckpoint.__table__
+            session.execute(
+                dialect_insert(session, table)
+                .values(journal=self.journal.name, last_seq=0)
+                .on_conflict_do_nothing(index_elements=[table.c.journal])
+            )
+            session.commit()
+            return self._checkpoint(session)
+        return last_seq
+
+    def _advance(self, session, from_seq, to_seq):
+        result = session.execute(
+            update(JournalCheckpoint)
+            .where(JournalCheckpoint.journal == self.journal.name, JournalCheckpoint.last_seq == from_seq)
+            .values(last_seq=to_seq, updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise JournalError(
+                f"Checkpoint of journal {self.journal.name!r} moved past {from_seq}; "
+                f"is another flusher draining it?"
+            )
+
+    def _write(self, session, records, from_seq):
+        insert_sales_batch(session, records, update_stock=True, allow_negative_stock=True)
+        self._advance(session, from_seq, records[-1]["seq"])
+        session.commit()
+
+    def _reject(self, record, error):
+        _append_rejected(self.journal.directory, self.journal.name, record, error)
+        logger.warning("Rejected journal record %d of %s: %s", record["seq"], self.journal.name, error)
+
+    def flush_once(self):
+        """Writes the next batch of records; returns how many were processed (0 when drained)."""
+        with self.session_factory() as session:
+            from_seq = self._checkpoint(session)
+            if from_seq > self.journal.last_seq:
+                raise JournalError(
+                    f"Journal {self.journal.name!r} ends at {self.journal.last_seq} but its checkpoint "
+                    f"is {from_seq}; it was reset or belongs to another till"
+                )
+            records = list(islice(self.journal.records(from_seq), self.batch_size))
+            if not records:
+                return 0
+
+            try:
+                self._write(session, records, from_seq)
+            except (SaleServiceError, IntegrityError):
+                # Find the offending sales one by one; the rest still go in.
+                session.rollback()
+                for record in records:
+                    try:
+                        self._write(session, [record], from_seq)
+                    except (SaleServiceError, IntegrityError) as e:
+                        session.rollback()
+                        self._reject(record, e)
+                        self._advance(session, from_seq, record["seq"])
+                        session.commit()
+                        self.rejected += 1
+                    else:
+                        self.flushed += 1
+                    from_seq = record["seq"]
+            else:
+                self.flushed += len(records)
+
+        self.journal.prune(records[-1]["seq"])
+        return len(records)
+
+    def flush(self):
+        """Drains the journal; returns the number of records processed."""
+        total = 0
+        while True:
+            count = self.flush_once()
+            if not count:
+                return total
+            total += count
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                # The database may be locked or down; the journal keeps the sales.
+                logger.exception("Flushing journal %s failed; retrying in %ss", self.journal.name, self.interval)
+
+    def start(self):
+        """Replays what an earlier run left in the journal, then flushes in the background."""
+        if self._thread is not None:
+            return
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Replaying journal %s failed; the background flusher will retry", self.journal.name)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"journal-flusher-{self.journal.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """Stops the background thread and, by default, drains what is left."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+
+
+def _append_rejected(directory, journal_name, record, error):
+    with open(Path(directory) / REJECTED_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"error": str(error), "journal": journal_name, "record": record}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_rejected(path):
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.endswith("\n")]
+
+
+def rejected_sales(directory):
+    """
+    The sales set aside in a journal directory, oldest first, as dicts with
+    `error`, `journal` and the journaled `record`. Includes those a re-drive
+    that was interrupted has yet to retry.
+    """
+    directory = Path(directory)
+    return _read_rejected(directory / _REDRIVE_FILE) + _read_rejected(directory / REJECTED_FILE)
+
+
+def _redrive_key(journal_name, record):
+    """
+    The key a re-driven sale is stored under, so an interrupted re-drive that
+    is run again does not record the sale twice.
+    """
+    if record.get("idempotency_key"):
+        return record["idempotency_key"]
+    key = f"journal:{journal_name}:{record['seq']}"
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        key = "journal:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return key
+
+
+def redrive_rejected(directory, session_factory=SessionLocal):
+    """
+    Retries the sales in a journal directory's rejected.jsonl, e.g. after a
+    deleted customer or product has been restored. Each sale commits on its
+    own, with stock allowed below zero as when flushing; sales that still fail
+    go back to rejected.jsonl with their new error. Safe to run while the
+    journal is being flushed, and to run again after an interruption.
+    Returns (written, still_rejected).
+    """
+    directory = Path(directory)
+    pending = directory / _REDRIVE_FILE
+    if not pending.exists():
+        if not (directory / REJECTED_FILE).exists():
+            return 0, 0
+        # The flusher keeps appending to a fresh rejected.jsonl meanwhile.
+        os.replace(directory / REJECTED_FILE, pending)
+
+    written = failed = 0
+    with session_factory() as session:
+        for entry in _read_rejected(pending):
+            record = entry["record"]
+            journal_name = entry.get("journal", directory.name)
+            sale = {**record, "idempotency_key": _redrive_key(journal_name, record)}
+            try:
+                insert_sales_batch(session, [sale], update_stock=True, allow_negative_stock=True)
+                session.commit()
+            except (SaleServiceError, IntegrityError) as e:
+                session.rollback()
+                _append_rejected(directory, journal_name, record, e)
+                failed += 1
+            else:
+                written += 1
+    pending.unlink()
+    return written, failed
@@ -1,7 +1,10 @@
+from sqlalchemy import Float, Integer, select, text
 from sqlalchemy.exc import IntegrityError
-from app.models.customer import Customer
+from app.models.customer import Customer, normalize_customer_name
 from app.models.sale import Sale
 from app.db.engine import SessionLocal
+from app.db.fts import has_customer_search, match_expression
+from app.services.report_cache import bump_generation
 
 def create_customer(db, name, email, phone=None, customer_type="individual", company_name=None, discount_rate=0):
     customer = Customer(
@@ -14,6 +17,8 @@ def create_customer(db, name, email, phone=None, customer_type="individual", com
     )
     try:
         db.add(customer)
+        # Reports list customers by name, including ones with no sales yet.
+        bump_generation(db)
         db.commit()
         db.refresh(customer)
         return customer
@@ -34,8 +39,62 @@ def get_customer_by_email(db, email):
             raise ValueError(f"Customer with email '{email}' not found.")
         return customer
     
-def get_customer_by_name(db, name):
-    return db.query(Customer).filter(Customer.name.ilike(f"%{name}%")).all()
+def _prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def search_customers(db, query, limit=20):
+    """
+    Customer lookup for the till, best matches first:
+    1. names starting with `query` (case-insensitive), via the indexed
+       search_name column as a range scan;
+    2. if there is room left, names with a word starting with each typed word
+       (e.g. a surname), via the customers_fts index on SQLite.
+    Soft-deleted customers are excluded.
+    """
+    prefix = normalize_customer_name(query)
+    if not prefix:
+        return []
+
+    matches = (
+        db.query(Customer)
+        .filter(
+            Customer.search_name >= prefix,
+            Customer.search_name < _prefix_upper_bound(prefix),
+            Customer.is_deleted == False,
+        )
+        .order_by(Customer.search_name, Customer.id)
+        .limit(limit)
+        .all()
+    )
+
+    match = match_expression(query)
+    remaining = limit - len(matches)
+    if remaining <= 0 or match is None or not has_customer_search(db.get_bind().engine):
+        return matches
+
+    seen = [c.id for c in matches] or [0]
+    hits = (
+        text(
+            "SELECT rowid AS id, rank AS score FROM customers_fts "
+            "WHERE customers_fts MATCH :match ORDER BY rank LIMIT :limit"
+        )
+        .bindparams(match=match, limit=limit)
+        .columns(id=Integer, score=Float)
+        .subquery("hits")
+    )
+    stmt = (
+        select(Customer)
+        .join(hits, Customer.id == hits.c.id)
+        .where(Customer.is_deleted == False, Customer.id.notin_(seen))
+        .order_by(hits.c.score, Customer.id)
+        .limit(remaining)
+    )
+    return matches + db.execute(stmt).scalars().all()
+
+
+def get_customer_by_name(db, name, limit=20):
+    return search_customers(db, name, limit=limit)
 
 def get_all_customers(db):
     return db.query(Customer).order_by(Customer.name).filter(Customer.is_deleted == False).all()
@@ -55,6 +114,8 @@ def update_customer(db, customer_id, **kwargs):
             if hasattr(customer, key):
                 setattr(customer, key, value)
 
+        if "name" in kwargs:
+            bump_generation(db)
         db.commit()
         db.refresh(customer)
         return customer
@@ -0,0 +1,182 @@
+"""
+Streaming export of sale lines to CSV or JSON Lines.
+
+One row per sale item, joined with its sale, customer and product. Rows are
+fetched in batches from a server-side cursor (stream_results / yield_per) and
+written as they arrive, so a full year of sales never sits in memory. Ranges
+that reach archived years read the archives too (see archive_service).
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.services.archive_service import sale_lines_source
+from app.utils.time_utils import parse_bound, store_day_start, to_utc
+
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = (
+    "sale_id", "timestamp", "customer_id", "customer_name", "sale_total",
+    "product_id", "barcode", "item_name", "quantity", "price_at_sale", "line_total",
+)
+
+
+def _utc_bounds(start_date, end_date):
+    """
+    (start, end, end_inclusive) as naive UTC. Dates cover whole store-local
+    days, so a bare end date becomes the exclusive start of the next day.
+    """
+    start = end = None
+    end_inclusive = True
+    if start_date:
+        start = parse_bound(start_date)
+        start = to_utc(start).replace(tzinfo=None) if isinstance(start, datetime) else store_day_start(start)
+    if end_date:
+        end = parse_bound(end_date)
+        if isinstance(end, datetime):
+            end = to_utc(end).replace(tzinfo=None)
+        else:
+            end, end_inclusive = store_day_start(end + timedelta(days=1)), False
+    return start, end, end_inclusive
+
+
+def _in_range(stmt, timestamp, start_date, end_date):
+    start, end, end_inclusive = _utc_bounds(start_date, end_date)
+    if start:
+        stmt = stmt.where(timestamp >= start)
+    if end:
+        stmt = stmt.where(timestamp <= end if end_inclusive else timestamp < end)
+    return stmt
+
+
+def _lines_query(lines):
+    return (
+        select(
+            lines.c.sale_id,
+            lines.c.timestamp,
+            lines.c.customer_id,
+            Customer.name.label("customer_name"),
+            lines.c.total_amount.label("sale_total"),
+            lines.c.product_id,
+            Product.barcode,
+            lines.c.name.label("item_name"),
+            lines.c.quantity,
+            lines.c.price_at_sale,
+            (lines.c.quantity * lines.c.price_at_sale).label("line_total"),
+        )
+        .select_from(lines)
+        .outerjoin(Customer, Customer.id == lines.c.customer_id)
+        .outerjoin(Product, Product.id == lines.c.product_id)
+        .order_by(lines.c.timestamp, lines.c.sale_id, lines.c.item_id)
+    )
+
+
+def sale_lines_query(start_date=None, end_date=None):
+    """Export rows from the hot sales tables only; see archived_sale_lines_query for archived years."""
+    stmt = (
+        select(
+            Sale.id.label("sale_id"),
+            Sale.timestamp,
+            Sale.customer_id,
+            Customer.name.label("customer_name"),
+            Sale.total_amount.label("sale_total"),
+            SaleItem.product_id,
+            Product.barcode,
+            SaleItem.name.label("item_name"),
+            SaleItem.quantity,
+            SaleItem.price_at_sale,
+            (SaleItem.quantity * SaleItem.price_at_sale).label("line_total"),
+        )
+        .select_from(Sale)
+        .join(SaleItem, SaleItem.sale_id == Sale.id)
+        .outerjoin(Customer, Customer.id == Sale.customer_id)
+        .outerjoin(Product, Product.id == SaleItem.product_id)
+        .order_by(Sale.timestamp, Sale.id, SaleItem.id)
+    )
+    return _in_range(stmt, Sale.timestamp, start_date, end_date)
+
+
+def archived_sale_lines_query(db, start_date=None, end_date=None):
+    """
+    sale_lines_query across the hot tables and the archives the range reaches,
+    which are attached to the session's connection. Run the statement on the
+    same session.
+    """
+    start, end, _ = _utc_bounds(start_date, end_date)
+    lines = sale_lines_source(db, start, end)
+    if lines is None:
+        return sale_lines_query(start_date, end_date)
+    return _in_range(_lines_query(lines), lines.c.timestamp, start_date, end_date)
+
+
+def sale_line(row):
+    """Export dict for one sale_lines_query row, with the timestamp as an ISO string in UTC."""
+    line = row._asdict()
+    line["timestamp"] = to_utc(line["timestamp"]).isoformat() if line["timestamp"] else None
+    return line
+
+
+def iter_sale_lines(db, start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields one dict per sale item in (timestamp, sale id) order. Bounds are
+    datetimes (naive = UTC) or dates / YYYY-MM-DD strings, which cover whole
+    store-local days. Timestamps are returned as ISO strings in UTC. Archived
+    years in the range are included.
+    """
+    stmt = archived_sale_lines_query(db, start_date, end_date).execution_options(
+        stream_results=True, yield_per=batch_size,
+    )
+    result = db.execute(stmt)
+    try:
+        for partition in result.partitions():
+            for row in partition:
+                yield sale_line(row)
+    finally:
+        result.close()
+
+
+def _open_output(path, compress):
+    if compress:
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def export_sales(db, path, file_format=None, start_date=None, end_date=None, compress=None,
+                 batch_size=EXPORT_BATCH_SIZE):
+    """
+    Writes sale lines to `path` as 'csv' or 'jsonl'. The format and gzip
+    compression default from the file name (e.g. sales-2025.csv.gz). Returns
+    the number of lines written.
+    """
+    name = str(path).lower()
+    if compress is None:
+        compress = name.endswith(".gz")
+    if file_format is None:
+        stem = name[:-3] if name.endswith(".gz") else name
+        file_format = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(os.path.splitext(stem)[1])
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format: {file_format!r} (use 'csv' or 'jsonl')")
+
+    lines = iter_sale_lines(db, start_date, end_date, batch_size)
+    count = 0
+    with _open_output(path, compress) as f:
+        if file_format == "csv":
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for line in lines:
+                writer.writerow(line)
+                count += 1
+        else:
+            for line in lines:
+                f.write(json.dumps(line))
+                f.write("\n")
+                count += 1
+    return count
@@ -0,0 +1,218 @@
+"""
+Streaming product catalogue import from CSV or JSON Lines.
+
+Rows are read lazily and written in chunks, so memory use does not grow with
+the file. Each chunk is one transaction:
+- unknown category names are created with one bulk insert
+- products are upserted by barcode with INSERT ... ON CONFLICT DO UPDATE
+
+Stock is never imported. New products start at 0 and receive stock through
+purchase_product / receive_stock_bulk, so the stock ledger stays complete.
+"""
+import csv
+import json
+import os
+
+from sqlalchemy import func, select
+
+from app.db.dialect import dialect_insert
+from app.models.category import Category
+from app.models.product import Product
+from app.services.catalog_cache import CATALOG_SCOPE, catalog_cache
+from app.services.report_cache import SALES_SCOPE, bump_generation
+
+IMPORT_CHUNK_SIZE = 1000
+# Upper bound on the bind parameters of one IN (...) lookup, as in the other services.
+_IN_CHUNK_SIZE = 500
+# How many rejects are kept in the returned summary; use on_reject for all of them.
+MAX_REPORTED_REJECTS = 100
+
+REQUIRED_FIELDS = ("barcode", "name", "brand", "purchase_price", "selling_price")
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def _read_csv(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _read_jsonl(f):
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, ImportRowError(f"invalid JSON: {e.msg}")
+            continue
+        yield line_no, row if isinstance(row, dict) else ImportRowError("line is not a JSON object")
+
+
+def _text(row, field):
+    value = row.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _price(row, field):
+    value = row.get(field)
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"{field} must be a number")
+    if price < 0:
+        raise ImportRowError(f"{field} must not be negative")
+    return price
+
+
+def _parse_row(row):
+    if isinstance(row, ImportRowError):
+        raise row
+    for field in REQUIRED_FIELDS:
+        if _text(row, field) is None:
+            raise ImportRowError(f"missing {field}")
+    return {
+        "barcode": _text(row, "barcode"),
+        "name": _text(row, "name"),
+        "brand": _text(row, "brand"),
+        "purchase_price": _price(row, "purchase_price"),
+        "selling_price": _price(row, "selling_price"),
+        "category": _text(row, "category"),
+        "unit": _text(row, "unit"),
+        "image": _text(row, "image"),
+    }
+
+
+def _ensure_categories(db, category_ids, names):
+    """Creates the categories in `names` missing from `category_ids` and records their ids."""
+    missing = sorted(name for name in names if name not in category_ids)
+    if not missing:
+        return 0
+    db.execute(
+        dialect_insert(db, Category.__table__).on_conflict_do_nothing(index_elements=["name"]),
+        [{"name": name} for name in missing],
+    )
+    for start in range(0, len(missing), _IN_CHUNK_SIZE):
+        names_chunk = missing[start:start + _IN_CHUNK_SIZE]
+        category_ids.update(db.execute(select(Category.name, Category.id).where(Category.name.in_(names_chunk))).all())
+    return len(missing)
+
+
+def _upsert_chunk(db, rows, category_ids):
+    """Writes one chunk ({barcode: parsed row}) and returns (inserted, updated, categories created)."""
+    created = _ensure_categories(db, category_ids, {r["category"] for r in rows.values() if r["category"]})
+    barcodes = list(rows)
+    existing = 0
+    for start in range(0, len(barcodes), _IN_CHUNK_SIZE):
+        barcode_chunk = barcodes[start:start + _IN_CHUNK_SIZE]
+        existing += db.execute(select(func.count()).where(Product.barcode.in_(barcode_chunk))).scalar()
+
+    table = Product.__table__
+    stmt = dialect_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.barcode],
+        set_={
+            "name": stmt.excluded.name,
+            "brand": stmt.excluded.brand,
+            "purchase_price": stmt.excluded.purchase_price,
+            "selling_price": stmt.excluded.selling_price,
+            # Optional columns left blank in the file keep their current value.
+            "category_id": func.coalesce(stmt.excluded.category_id, table.c.category_id),
+            "unit": func.coalesce(stmt.excluded.unit, table.c.unit),
+            "image": func.coalesce(stmt.excluded.image, table.c.image),
+        },
+    )
+    db.execute(stmt, [
+        {
+            "barcode": r["barcode"],
+            "name": r["name"],
+            "brand": r["brand"],
+            "purchase_price": r["purchase_price"],
+            "selling_price": r["selling_price"],
+            "category_id": category_ids.get(r["category"]),
+            "unit": r["unit"],
+            "image": r["image"],
+            "stock": 0,
+        }
+        for r in rows.values()
+    ])
+    bump_generation(db, SALES_SCOPE, CATALOG_SCOPE)
+    return len(rows) - existing, existing, created
+
+
+def import_products(db, source, file_format=None, chunk_size=IMPORT_CHUNK_SIZE, on_reject=None):
+    """
+    Imports products from `source` (a path, or an open text file with
+    file_format given) in 'csv' or 'jsonl' format. Columns: barcode, name,
+    brand, purchase_price, selling_price, and optional category (name), unit
+    and image. Existing products are matched by barcode and updated; if a
+    barcode appears twice in one chunk the later row wins.
+
+    Rows that fail validation are skipped and passed to
+    on_reject(line_no, error, row). Chunks are committed as they go, so a
+    failure part-way keeps the chunks already written.
+
+    Returns {"inserted", "updated", "rejected", "categories_created", "rejects"}
+    where "rejects" holds the first MAX_REPORTED_REJECTS as
+    {"line": ..., "error": ...}.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    if isinstance(source, (str, os.PathLike)):
+        if file_format is None:
+            extension = os.path.splitext(str(source))[1].lower()
+            file_format = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(extension)
+        with open(source, newline="", encoding="utf-8") as f:
+            return import_products(db, f, file_format, chunk_size, on_reject)
+
+    readers = {"csv": _read_csv, "jsonl": _read_jsonl}
+    if file_format not in readers:
+        raise ValueError(f"Unsupported import format: {file_format!r} (use 'csv' or 'jsonl')")
+
+    summary = {"inserted": 0, "updated": 0, "rejected": 0, "categories_created": 0, "rejects": []}
+    category_ids = dict(db.execute(select(Category.name, Category.id)).all())
+
+    def flush(chunk):
+        try:
+            inserted, updated, created = _upsert_chunk(db, chunk, category_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        summary["inserted"] += inserted
+        summary["updated"] += updated
+        summary["categories_created"] += created
+
+    chunk = {}
+    try:
+        for line_no, row in readers[file_format](source):
+            try:
+                parsed = _parse_row(row)
+            except ImportRowError as e:
+                summary["rejected"] += 1
+                if len(summary["rejects"]) < MAX_REPORTED_REJECTS:
+                    summary["rejects"].append({"line": line_no, "error": str(e)})
+                if on_reject:
+                    on_reject(line_no, str(e), row if isinstance(row, dict) else None)
+                continue
+            if parsed["barcode"] in chunk:
+                # Counted once; the later row wins.
+                del chunk[parsed["barcode"]]
+            chunk[parsed["barcode"]] = parsed
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = {}
+        if chunk:
+            flush(chunk)
+    finally:
+        # Prices and names may have changed for any product.
+        catalog_cache.clear()
+
+    return summary
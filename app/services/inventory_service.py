@@ -1,6 +1,13 @@
+from sqlalchemy import Float, Integer, bindparam, func, or_, select, text, update
 from app.models.product import Product
 from app.models.category import Category
 from app.db.engine import SessionLocal
+from app.db.fts import PRODUCT_SEARCH_WEIGHTS, has_product_search, match_expression
+from app.services.catalog_cache import CATALOG_SCOPE, catalog_cache
+from app.services.report_cache import SALES_SCOPE, bump_generation
+from app.services.stock_ledger_service import record_stock_movements
+from app.models.stock_movement import StockMovement
+from app.models.stock_snapshot import StockSnapshot
 
 
 def get_db():
@@ -29,8 +36,15 @@ def create_product(db, name, brand, purchase_price, selling_price, stock, barcod
         unit=unit
     )
     db.add(new_product)
+    if stock:
+        db.flush()
+        record_stock_movements(db, [{
+            "product_id": new_product.id, "movement_type": "receipt", "quantity": stock, "note": "opening stock",
+        }])
+    bump_generation(db, CATALOG_SCOPE)
     db.commit()
     db.refresh(new_product)
+    catalog_cache.invalidate(product_id=new_product.id, barcode=new_product.barcode)
     return new_product
 
 
@@ -48,6 +62,10 @@ def update_product(db, product_id, name=None, brand=None, purchase_price=None, s
     if selling_price:
         product.selling_price = selling_price
     if stock is not None:
+        record_stock_movements(db, [{
+            "product_id": product.id, "movement_type": "adjustment",
+            "quantity": stock - (product.stock or 0), "note": "stock set by update_product",
+        }])
         product.stock = stock
     if image:
         product.image = image
@@ -61,8 +79,14 @@ def update_product(db, product_id, name=None, brand=None, purchase_price=None, s
     if unit:
         product.unit = unit
 
+    if name or brand or category_id:
+        # Product reports show these.
+        bump_generation(db, SALES_SCOPE, CATALOG_SCOPE)
+    else:
+        bump_generation(db, CATALOG_SCOPE)
     db.commit()
     db.refresh(product)
+    catalog_cache.invalidate(product_id=product.id)
     return product
 
 
@@ -76,8 +100,43 @@ def get_products_by_category(db, category_id):
     return db.query(Product).filter(Product.category_id == category_id).all()
 
 
+def search_products(db, query, limit=20):
+    """
+    Ranked product search over name, brand, barcode and category name. Every
+    word typed is matched as a prefix, so 'coc 500' finds 'Coca-Cola 500ml'.
+    Uses the products_fts index on SQLite and falls back to a name ILIKE
+    elsewhere. Pass limit=None for all matches.
+    """
+    match = match_expression(query)
+    if match is None:
+        return []
+
+    if not has_product_search(db.get_bind().engine):
+        fallback = db.query(Product).filter(Product.name.ilike(f"%{query}%")).order_by(Product.name)
+        return fallback.limit(limit).all() if limit else fallback.all()
+
+    hits = (
+        text(
+            "SELECT rowid AS id, bm25(products_fts, :w_name, :w_brand, :w_barcode, :w_category) AS score "
+            "FROM products_fts WHERE products_fts MATCH :match ORDER BY score LIMIT :limit"
+        )
+        .bindparams(
+            match=match,
+            limit=limit if limit else -1,
+            w_name=PRODUCT_SEARCH_WEIGHTS[0],
+            w_brand=PRODUCT_SEARCH_WEIGHTS[1],
+            w_barcode=PRODUCT_SEARCH_WEIGHTS[2],
+            w_category=PRODUCT_SEARCH_WEIGHTS[3],
+        )
+        .columns(id=Integer, score=Float)
+        .subquery("hits")
+    )
+    stmt = select(Product).join(hits, Product.id == hits.c.id).order_by(hits.c.score, Product.id)
+    return db.execute(stmt).scalars().all()
+
+
 def search_products_by_name(db, name):
-    return db.query(Product).filter(Product.name.ilike(f"%{name}%")).all()
+    return search_products(db, name, limit=None)
 
 
 def get_products_in_stock(db):
@@ -103,6 +162,7 @@ def update_category(db, category_id, name=None, description=None):
     
     if name:
         category.name = name
+        bump_generation(db)
     if description:
         category.description = description
     
@@ -115,8 +175,14 @@ def delete_product(db, product_id):
     if not product:
         raise ValueError("Product not found")
     
+    # Products with sales cannot be deleted (sale_items reference them), so
+    # this only drops the ledger of a product that never sold.
+    db.query(StockMovement).filter(StockMovement.product_id == product_id).delete(synchronize_session=False)
+    db.query(StockSnapshot).filter(StockSnapshot.product_id == product_id).delete(synchronize_session=False)
     db.delete(product)
+    bump_generation(db, CATALOG_SCOPE)
     db.commit()
+    catalog_cache.invalidate(product_id=product_id)
     return product
 
 def get_or_create_category_by_name(db, name):
@@ -142,7 +208,132 @@ def purchase_product(db, product_id, new_purchase_price, new_selling_price, quan
     product.stock += quantity
     product.purchase_price = new_purchase_price
     product.selling_price = new_selling_price
+    record_stock_movements(db, [{"product_id": product.id, "movement_type": "receipt", "quantity": quantity}])
+    bump_generation(db, CATALOG_SCOPE)
 
     db.commit()
     db.refresh(product)
-    return product
\ No newline at end of file
+    catalog_cache.invalidate(product_id=product.id)
+    return product
+
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+_IN_CHUNK_SIZE = 500
+
+
+def _check_receipt_line(line):
+    if not isinstance(line, dict):
+        return "line must be a dict"
+    if line.get("product_id") is None and not line.get("barcode"):
+        return "needs a product_id or barcode"
+    quantity = line.get("quantity")
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+        return "quantity must be a positive integer"
+    for key in ("purchase_price", "selling_price"):
+        price = line.get(key)
+        if price is not None and (not isinstance(price, (int, float)) or isinstance(price, bool) or price <= 0):
+            return f"{key} must be a positive number"
+    return None
+
+
+def _resolve_products(db, ids, barcodes):
+    """{product_id: product_id} and {barcode: product_id} for the products that exist."""
+    by_id, by_barcode = {}, {}
+    ids, barcodes = sorted(ids), sorted(barcodes)
+    for start in range(0, max(len(ids), len(barcodes)), _IN_CHUNK_SIZE):
+        id_chunk = ids[start:start + _IN_CHUNK_SIZE]
+        barcode_chunk = barcodes[start:start + _IN_CHUNK_SIZE]
+        rows = db.execute(
+            select(Product.id, Product.barcode).where(or_(
+                Product.id.in_(id_chunk), Product.barcode.in_(barcode_chunk),
+            ))
+        )
+        for product_id, barcode in rows:
+            by_id[product_id] = product_id
+            if barcode is not None:
+                by_barcode[barcode] = product_id
+    return by_id, by_barcode
+
+
+def receive_stock_bulk(db, lines, all_or_nothing=False, note=None):
+    """
+    Books a supplier delivery. Each line is a dict with `product_id` or
+    `barcode`, a positive integer `quantity` and optional new `purchase_price`
+    and `selling_price`. Products are resolved in one query, stock and prices
+    are updated with one executemany UPDATE, receipts go to the stock ledger,
+    and everything is committed once.
+
+    Lines that fail validation or name an unknown product are reported, not
+    applied; with all_or_nothing=True any bad line stops the whole delivery.
+    Several lines for the same product add up, and the last price given wins.
+
+    Returns {"applied": lines booked, "units": units received,
+    "product_ids": [...], "errors": [{"line": index, "error": message}]}.
+    """
+    errors = []
+    valid = []
+    for index, line in enumerate(lines):
+        problem = _check_receipt_line(line)
+        if problem:
+            errors.append({"line": index, "error": problem})
+        else:
+            valid.append((index, line))
+
+    by_id, by_barcode = _resolve_products(
+        db,
+        {line["product_id"] for _, line in valid if line.get("product_id") is not None},
+        {line["barcode"] for _, line in valid if line.get("product_id") is None},
+    )
+
+    receipts = {}
+    applied = 0
+    for index, line in valid:
+        if line.get("product_id") is not None:
+            product_id = by_id.get(line["product_id"])
+            missing = f"product {line['product_id']} not found"
+        else:
+            product_id = by_barcode.get(line["barcode"])
+            missing = f"barcode {line['barcode']!r} not found"
+        if product_id is None:
+            errors.append({"line": index, "error": missing})
+            continue
+        receipt = receipts.setdefault(product_id, {"pid": product_id, "qty": 0, "cost": None, "price": None})
+        receipt["qty"] += line["quantity"]
+        receipt["cost"] = line.get("purchase_price", receipt["cost"])
+        receipt["price"] = line.get("selling_price", receipt["price"])
+        applied += 1
+
+    errors.sort(key=lambda e: e["line"])
+    result = {"applied": 0, "units": 0, "product_ids": [], "errors": errors}
+    if not receipts or (errors and all_or_nothing):
+        return result
+
+    table = Product.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("pid"))
+        .values(
+            stock=func.coalesce(table.c.stock, 0) + bindparam("qty"),
+            purchase_price=func.coalesce(bindparam("cost", type_=Float), table.c.purchase_price),
+            selling_price=func.coalesce(bindparam("price", type_=Float), table.c.selling_price),
+        )
+    )
+    rows = [receipts[product_id] for product_id in sorted(receipts)]
+    try:
+        db.execute(stmt, rows)
+        record_stock_movements(db, [
+            {"product_id": r["pid"], "movement_type": "receipt", "quantity": r["qty"], "note": note}
+            for r in rows
+        ])
+        bump_generation(db, CATALOG_SCOPE)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # Loaded Product objects still hold the old stock and prices.
+    db.expire_all()
+    for product_id in receipts:
+        catalog_cache.invalidate(product_id=product_id)
+
+    result.update(applied=applied, units=sum(r["qty"] for r in rows), product_ids=sorted(receipts))
+    return result
@@ -0,0 +1,131 @@
+"""
+Read models for list screens and reports.
+
+Each query selects only the columns a listing shows, joins related names
+explicitly, and returns immutable NamedTuples instead of ORM entities. The
+rows are not tracked by the session, have no lazy loaders, and cost a fraction
+of the memory of a mapped instance. Use the ORM services when you need to
+modify the objects. The *_query builders are shared with the async streaming
+functions in async_services.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func, select
+
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+
+
+class ProductRow(NamedTuple):
+    id: int
+    name: str
+    brand: str
+    purchase_price: float
+    selling_price: float
+    stock: Optional[int]
+    image: Optional[str]
+    barcode: Optional[str]
+    category_id: Optional[int]
+    category_name: Optional[str]
+    unit: Optional[str]
+
+    def to_dict(self):
+        """Same shape as Product.to_dict, without the lazy category load."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "brand": self.brand,
+            "purchase_price": self.purchase_price,
+            "selling_price": self.selling_price,
+            "stock": self.stock,
+            "image": self.image,
+            "barcode": self.barcode,
+            "category": self.category_name,
+            "unit": self.unit,
+        }
+
+
+class CustomerRow(NamedTuple):
+    id: int
+    name: str
+    email: str
+    phone: Optional[str]
+    customer_type: Optional[str]
+    company_name: Optional[str]
+    loyalty_points: Optional[int]
+    discount_rate: Optional[int]
+
+
+class SaleHeader(NamedTuple):
+    id: int
+    timestamp: datetime
+    customer_id: int
+    customer_name: Optional[str]
+    total_amount: float
+    item_count: int
+
+
+def product_rows_query(category_id=None):
+    stmt = (
+        select(
+            Product.id, Product.name, Product.brand, Product.purchase_price, Product.selling_price,
+            Product.stock, Product.image, Product.barcode, Product.category_id,
+            Category.name.label("category_name"), Product.unit,
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .order_by(Product.id)
+    )
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    return stmt
+
+
+def customer_rows_query():
+    return (
+        select(*(getattr(Customer, field) for field in CustomerRow._fields))
+        .where(Customer.is_deleted == False)
+        .order_by(Customer.name)
+    )
+
+
+def list_product_rows(db, category_id=None):
+    """Every product (or one category's) ordered by id, with its category name."""
+    return [ProductRow._make(row) for row in db.execute(product_rows_query(category_id))]
+
+
+def list_customer_rows(db):
+    """Active (not soft-deleted) customers ordered by name, like get_all_customers."""
+    return [CustomerRow._make(row) for row in db.execute(customer_rows_query())]
+
+
+def list_sale_headers(db, page=1, per_page=20, customer_id=None):
+    """
+    One page of sales, newest first, with customer name and item count in a
+    single statement. For deep paging use sales_service.list_sales_with_summary,
+    which is keyset-paginated.
+    """
+    if page < 1 or per_page < 1:
+        raise ValueError("page and per_page must be positive integers")
+
+    item_count = (
+        select(func.count(SaleItem.id))
+        .where(SaleItem.sale_id == Sale.id)
+        .correlate(Sale)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Sale.id, Sale.timestamp, Sale.customer_id, Customer.name, Sale.total_amount, item_count,
+        )
+        .outerjoin(Customer, Customer.id == Sale.customer_id)
+        .order_by(Sale.timestamp.desc(), Sale.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    if customer_id is not None:
+        stmt = stmt.where(Sale.customer_id == customer_id)
+    return [SaleHeader._make(row) for row in db.execute(stmt)]
@@ -0,0 +1,105 @@
+"""
+Result cache for reporting_service.
+
+Entries are keyed on (database, report, normalized date range, limit) and
+stamped with the database's 'sales' generation (see DataGeneration). Every
+sale write bumps that counter in its own transaction, so a cached report is
+served only while no sale has been written since it was computed, in this or
+any other process. Entries also expire after a TTL, which bounds staleness
+from writes that bypass the services (e.g. manual SQL), and the cache is an
+LRU bounded by size.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from app.db.dialect import dialect_insert
+from app.models.data_generation import DataGeneration
+
+REPORT_CACHE_SIZE = int(os.environ.get("POS_REPORT_CACHE_SIZE", "256"))
+REPORT_CACHE_TTL = float(os.environ.get("POS_REPORT_CACHE_TTL", "300"))
+
+SALES_SCOPE = "sales"
+
+
+def bump_generation(session, *scopes):
+    """
+    Increments the generation of each scope (default: sales) with one statement,
+    as part of the session's current transaction.
+    """
+    table = DataGeneration.__table__
+    stmt = dialect_insert(session, table).values([
+        {"scope": scope, "generation": 1} for scope in sorted(set(scopes or (SALES_SCOPE,)))
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.scope],
+        set_={"generation": table.c.generation + 1},
+    )
+    session.execute(stmt)
+
+
+def current_generation(session, scope=SALES_SCOPE):
+    generation = session.execute(
+        select(DataGeneration.generation).where(DataGeneration.scope == scope)
+    ).scalar()
+    return generation or 0
+
+
+class ReportCache:
+    """
+    Process-local LRU of report results with a TTL. A hit costs one primary key
+    read of the generation counter instead of the report's joins and aggregates.
+    Set max_size or ttl to 0 to disable caching.
+    """
+
+    def __init__(self, max_size=REPORT_CACHE_SIZE, ttl=REPORT_CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, db, key, compute, scope=SALES_SCOPE):
+        """
+        Returns the cached result for `key` if it was computed at the current
+        generation and has not expired, otherwise calls `compute()` and stores
+        the result. Results are lists of dicts; callers get their own copies.
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return compute()
+
+        key = (str(db.get_bind().url), scope) + tuple(key)
+        # Read before computing: if a write lands meanwhile, the result is
+        # stored under the old generation and the next call misses.
+        generation = current_generation(db, scope)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [dict(row) for row in entry[2]]
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = (generation, now + self.ttl, [dict(row) for row in result])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+report_cache = ReportCache()
@@ -1,7 +1,11 @@
-from sqlalchemy import func
-from app.db.engine import SessionLocal
+from sqlalchemy import func, select
+from app.models.category import Category
 from app.models.customer import Customer
+from app.models.product import Product
 from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.services.archive_service import sale_lines_source, sales_source
+from app.services.report_cache import report_cache
 from datetime import datetime, timezone
 
 def _normalize_date(date):
@@ -21,17 +25,23 @@ def _normalize_date(date):
 def total_sales_per_customer(db, start_date=None, end_date=None):
     start_date = _normalize_date(start_date)
     end_date = _normalize_date(end_date)
+    return report_cache.get_or_compute(
+        db, ("total_sales_per_customer", start_date, end_date),
+        lambda: _total_sales_per_customer(db, start_date, end_date),
+    )
 
+def _total_sales_per_customer(db, start_date, end_date):
+    sales = sales_source(db, start_date, end_date)
     query = db.query(
         Customer.id,
         Customer.name,
-        func.coalesce(func.sum(Sale.total_amount), 0).label("total_sales")
-    ).join(Sale, Sale.customer_id == Customer.id, isouter=True)
+        func.coalesce(func.sum(sales.c.total_amount), 0).label("total_sales")
+    ).join(sales, sales.c.customer_id == Customer.id, isouter=True)
 
     if start_date:
-        query = query.filter(Sale.timestamp >= start_date)
+        query = query.filter(sales.c.timestamp >= start_date)
     if end_date:
-        query = query.filter(Sale.timestamp <= end_date)
+        query = query.filter(sales.c.timestamp <= end_date)
 
     query = query.group_by(Customer.id, Customer.name).order_by(Customer.name)
 
@@ -43,27 +53,31 @@ def total_sales_per_customer(db, start_date=None, end_date=None):
     ]
 
 def top_customers_by_sales(db, limit=5, start_date=None, end_date=None):
-    
     start_date = _normalize_date(start_date)
     end_date = _normalize_date(end_date)
+    return report_cache.get_or_compute(
+        db, ("top_customers_by_sales", start_date, end_date, limit),
+        lambda: _top_customers_by_sales(db, limit, start_date, end_date),
+    )
 
-    with SessionLocal() as session:
-        query = session.query(
-            Customer.id,
-            Customer.name,
-            func.coalesce(func.sum(Sale.total_amount), 0).label("total_sales")
-        ).join(Sale, Sale.customer_id == Customer.id)
+def _top_customers_by_sales(db, limit, start_date, end_date):
+    sales = sales_source(db, start_date, end_date)
+    query = db.query(
+        Customer.id,
+        Customer.name,
+        func.coalesce(func.sum(sales.c.total_amount), 0).label("total_sales")
+    ).join(sales, sales.c.customer_id == Customer.id)
 
-        if start_date:
-            query = query.filter(Sale.timestamp >= start_date)
-        if end_date:
-            query = query.filter(Sale.timestamp <= end_date)
+    if start_date:
+        query = query.filter(sales.c.timestamp >= start_date)
+    if end_date:
+        query = query.filter(sales.c.timestamp <= end_date)
 
-        query = query.group_by(Customer.id, Customer.name)
-        query = query.order_by(func.sum(Sale.total_amount).desc())
-        query = query.limit(limit)
+    query = query.group_by(Customer.id, Customer.name)
+    query = query.order_by(func.sum(sales.c.total_amount).desc())
+    query = query.limit(limit)
 
-        results = query.all()
+    results = query.all()
 
     return [
         {"customer_id": r.id, "customer_name": r.name, "total_sales": r.total_sales}
@@ -73,24 +87,144 @@ def top_customers_by_sales(db, limit=5, start_date=None, end_date=None):
 def customer_purchase_frequency(db, start_date=None, end_date=None):
     start_date = _normalize_date(start_date)
     end_date = _normalize_date(end_date)
+    return report_cache.get_or_compute(
+        db, ("customer_purchase_frequency", start_date, end_date),
+        lambda: _customer_purchase_frequency(db, start_date, end_date),
+    )
 
+def _customer_purchase_frequency(db, start_date, end_date):
+    sales = sales_source(db, start_date, end_date)
     query = db.query(
         Customer.id,
         Customer.name,
-        func.count(Sale.id).label("purchase_count")
-        ).join(Sale, Sale.customer_id == Customer.id)
+        func.count(sales.c.id).label("purchase_count")
+        ).join(sales, sales.c.customer_id == Customer.id)
 
     if start_date:
-            query = query.filter(Sale.timestamp >= start_date)
+            query = query.filter(sales.c.timestamp >= start_date)
     if end_date:
-            query = query.filter(Sale.timestamp <= end_date)
+            query = query.filter(sales.c.timestamp <= end_date)
 
     query = query.group_by(Customer.id, Customer.name)
-    query = query.order_by(func.count(Sale.id).desc())
+    query = query.order_by(func.count(sales.c.id).desc())
 
     results = query.all()
 
     return [
         {"customer_id": r.id, "customer_name": r.name, "purchase_count": r.purchase_count}
         for r in results
-    ]
\ No newline at end of file
+    ]
+
+
+def _sale_item_totals(db, group_by, start_date, end_date):
+    """
+    units and revenue per `group_by` columns over one join of
+    sale_items -> sales -> products -> categories, or of the archived sale
+    lines -> products -> categories when the range reaches archived years.
+    """
+    lines = sale_lines_source(db, start_date, end_date)
+    if lines is None:
+        quantity, price, product_id, timestamp = (
+            SaleItem.quantity, SaleItem.price_at_sale, SaleItem.product_id, Sale.timestamp
+        )
+    else:
+        quantity, price, product_id, timestamp = (
+            lines.c.quantity, lines.c.price_at_sale, lines.c.product_id, lines.c.timestamp
+        )
+    units = func.sum(quantity)
+    revenue = func.sum(quantity * price)
+    stmt = select(*group_by, units.label("units"), revenue.label("revenue"))
+    if lines is None:
+        stmt = stmt.select_from(SaleItem).join(Sale, Sale.id == SaleItem.sale_id)
+    else:
+        stmt = stmt.select_from(lines)
+    stmt = (
+        stmt.join(Product, Product.id == product_id)
+        .outerjoin(Category, Category.id == Product.category_id)
+        .group_by(*group_by)
+    )
+    if start_date:
+        stmt = stmt.where(timestamp >= start_date)
+    if end_date:
+        stmt = stmt.where(timestamp <= end_date)
+    return stmt, units, revenue
+
+
+def _top_products(db, order_by, limit, start_date, end_date):
+    group_by = [Product.id, Product.name, Product.brand, Category.name.label("category_name")]
+    stmt, units, revenue = _sale_item_totals(db, group_by, start_date, end_date)
+    measure = revenue if order_by == "revenue" else units
+    # rank() gives tied products the same rank, so the limit never splits a tie.
+    ranked = stmt.add_columns(func.rank().over(order_by=measure.desc()).label("rank")).subquery()
+
+    query = select(ranked).order_by(ranked.c.rank, ranked.c.id)
+    if limit:
+        query = query.where(ranked.c.rank <= limit)
+
+    return [
+        {
+            "rank": r.rank,
+            "product_id": r.id,
+            "product_name": r.name,
+            "brand": r.brand,
+            "category_name": r.category_name,
+            "units": r.units,
+            "revenue": r.revenue,
+        }
+        for r in db.execute(query)
+    ]
+
+def top_products_by_revenue(db, limit=10, start_date=None, end_date=None):
+    """
+    Best-selling products by revenue (quantity x price at sale), highest first.
+    Products tied on the last place are all included, so more than `limit`
+    rows can come back. Pass limit=None for every product sold.
+    """
+    start_date = _normalize_date(start_date)
+    end_date = _normalize_date(end_date)
+    return report_cache.get_or_compute(
+        db, ("top_products_by_revenue", start_date, end_date, limit),
+        lambda: _top_products(db, "revenue", limit, start_date, end_date),
+    )
+
+def top_products_by_units(db, limit=10, start_date=None, end_date=None):
+    """Like top_products_by_revenue, ranked by units sold."""
+    start_date = _normalize_date(start_date)
+    end_date = _normalize_date(end_date)
+    return report_cache.get_or_compute(
+        db, ("top_products_by_units", start_date, end_date, limit),
+        lambda: _top_products(db, "units", limit, start_date, end_date),
+    )
+
+def revenue_by_category(db, start_date=None, end_date=None):
+    """
+    Units, revenue and share of total revenue per category, highest revenue
+    first. Products without a category are grouped under category_id None.
+    """
+    start_date = _normalize_date(start_date)
+    end_date = _normalize_date(end_date)
+    return report_cache.get_or_compute(
+        db, ("revenue_by_category", start_date, end_date),
+        lambda: _revenue_by_category(db, start_date, end_date),
+    )
+
+def _revenue_by_category(db, start_date, end_date):
+    stmt, units, revenue = _sale_item_totals(
+        db, [Category.id.label("category_id"), Category.name.label("category_name")], start_date, end_date
+    )
+    stmt = stmt.add_columns(
+        func.rank().over(order_by=revenue.desc()).label("rank"),
+        func.sum(revenue).over().label("total_revenue"),
+    ).order_by(revenue.desc(), Category.name)
+
+    return [
+        {
+            "rank": r.rank,
+            "category_id": r.category_id,
+            "category_name": r.category_name or "Uncategorized",
+            "units": r.units,
+            "revenue": r.revenue,
+            "share": r.revenue / r.total_revenue if r.total_revenue else 0.0,
+        }
+        for r in db.execute(stmt)
+    ]
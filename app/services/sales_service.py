@@ -1,10 +1,19 @@
-from datetime import datetime, timezone
+import base64
+import binascii
+import json
+from datetime import date, datetime, timezone
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-from ..db.engine import session as global_session
+from sqlalchemy import and_, delete, func, insert, or_, select, update
 from ..models.sale import Sale
 from ..models.sale_item import SaleItem
 from ..models.customer import Customer
+from ..models.product import Product
+from ..models.daily_sales import DailySales
+from ..db.dialect import dialect_insert, store_day, supports_insert_returning
+from .archive_service import sales_source
+from .report_cache import bump_generation
+from .stock_ledger_service import record_stock_movements
+from ..utils.time_utils import store_local_date, to_utc
 
 
 class SaleServiceError(Exception):
@@ -12,6 +21,17 @@ class SaleServiceError(Exception):
     pass
 
 
+BULK_BATCH_SIZE = 500
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+_IN_CHUNK_SIZE = 500
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+
+# Ledger note on sale movements that took a product's stock below zero.
+OVERSOLD_NOTE = "oversold"
+
+
 def _parse_date(input_date):
     if not input_date:
         return None
@@ -30,6 +50,24 @@ def _parse_date(input_date):
     raise SaleServiceError(f"Invalid date type: {type(input_date)}")
 
 
+def _day_bound(input_date):
+    """Naive bounds are read as store-local wall time; aware ones are converted."""
+    if not input_date:
+        return None
+    if isinstance(input_date, str):
+        try:
+            input_date = datetime.fromisoformat(input_date)
+        except ValueError:
+            raise SaleServiceError(f"Invalid date format: {input_date}")
+    if isinstance(input_date, datetime):
+        if input_date.tzinfo is None:
+            return input_date.date()
+        return store_local_date(input_date)
+    if isinstance(input_date, date):
+        return input_date
+    raise SaleServiceError(f"Invalid date type: {type(input_date)}")
+
+
 def _validate_sale_items(sale_items_data):
     if not isinstance(sale_items_data, list) or len(sale_items_data) == 0:
         raise SaleServiceError("sale_items_data must be a non-empty list")
@@ -52,12 +90,122 @@ def _validate_sale_items(sale_items_data):
             raise SaleServiceError(f"Invalid price_at_sale at index {idx}, must be non-negative number")
 
 
-def create_sale(session, customer_id, sale_items_data):
+def _validate_idempotency_key(key):
+    if key is None:
+        return
+    if not isinstance(key, str) or not key.strip() or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise SaleServiceError(
+            f"idempotency_key must be a non-empty string of at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+
+
+def _sale_by_idempotency_key(session, key):
+    return session.execute(select(Sale).where(Sale.idempotency_key == key)).scalar_one_or_none()
+
+
+def _quantities_by_product(sale_items_data):
+    quantities = {}
+    for item in sale_items_data:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+    return quantities
+
+
+def _decrement_stock(session, quantities, allow_negative=False):
+    """
+    Takes `quantities` ({product_id: quantity}) off Product.stock using one
+    conditional UPDATE per product, so concurrent tills cannot both sell the
+    last unit. Products are updated in id order to keep lock order consistent.
+    Raises SaleServiceError on the first product that is short or missing; the
+    caller is responsible for rolling back. With `allow_negative`, a short product is
+    taken below zero instead; returns {product_id: stock before} for those.
+    """
+    oversold = {}
+    for product_id in sorted(quantities):
+        quantity = quantities[product_id]
+        result = session.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            continue
+        if allow_negative:
+            result = session.execute(
+                update(Product)
+                .where(Product.id == product_id)
+                .values(stock=func.coalesce(Product.stock, 0) - quantity)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                stock = session.execute(select(Product.stock).where(Product.id == product_id)).scalar()
+                oversold[product_id] = stock + quantity
+                continue
+            raise SaleServiceError(f"Product {product_id} not found")
+        # The conditional UPDATE matches nothing for an unknown id either.
+        if session.execute(select(Product.id).where(Product.id == product_id)).first() is None:
+            raise SaleServiceError(f"Product {product_id} not found")
+        raise SaleServiceError(
+            f"Insufficient stock for product {product_id} (requested {quantity})"
+        )
+    return oversold
+
+
+def _sale_movements(sale_id, quantities):
+    # Dated when the stock changes (now), not at the sale's business time: a
+    # backdated sale must still land after the latest stock snapshot.
+    return [
+        {"product_id": product_id, "movement_type": "sale", "quantity": -quantity, "sale_id": sale_id}
+        for product_id, quantity in quantities.items()
+    ]
+
+
+def _add_to_rollup(deltas, timestamp, sale_count, revenue, item_units):
+    day = store_local_date(timestamp)
+    count, total, units = deltas.get(day, (0, 0, 0))
+    deltas[day] = (count + sale_count, total + revenue, units + item_units)
+
+
+def _apply_daily_rollup(session, deltas):
+    """
+    Adds `deltas` ({day: (sale_count, revenue, item_units)}) to daily_sales with
+    a single upsert. Negative deltas are used when sales are removed.
+    """
+    if not deltas:
+        return
+    table = DailySales.__table__
+    stmt = dialect_insert(session, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day],
+        set_={
+            "sale_count": table.c.sale_count + stmt.excluded.sale_count,
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+            "item_units": table.c.item_units + stmt.excluded.item_units,
+        },
+    )
+    session.execute(stmt, [
+        {"day": day, "sale_count": count, "revenue": revenue, "item_units": units}
+        for day, (count, revenue, units) in deltas.items()
+    ])
+
+
+def create_sale(session, customer_id, sale_items_data, idempotency_key=None):
+    """
+    Records a sale, takes its items off stock and commits.
+
+    `idempotency_key` is an optional client-generated key (e.g. a UUID made
+    once per checkout). If a sale with that key already exists, nothing is
+    written and the original sale is returned, so a till can safely retry a
+    call that timed out. The key is enforced by a unique index: the first
+    attempt pays no extra query, a retry costs one rolled-back INSERT and a
+    lookup.
+    """
     customer = session.get(Customer, customer_id)
     if not customer:
         raise SaleServiceError(f"Customer with id {customer_id} does not exist")
 
     _validate_sale_items(sale_items_data)
+    _validate_idempotency_key(idempotency_key)
 
     total = 0
     sale_items = []
@@ -76,15 +224,248 @@ def create_sale(session, customer_id, sale_items_data):
         total_amount=total,
         items=sale_items,
         timestamp=datetime.now(timezone.utc),
+        idempotency_key=idempotency_key,
     )
+    quantities = _quantities_by_product(sale_items_data)
+    rollup = {}
+    _add_to_rollup(rollup, new_sale.timestamp, 1, total, sum(quantities.values()))
 
     try:
+        _decrement_stock(session, quantities)
+        _apply_daily_rollup(session, rollup)
+        bump_generation(session)
         session.add(new_sale)
+        session.flush()
+        record_stock_movements(session, _sale_movements(new_sale.id, quantities))
         session.commit()
         return new_sale
-    except IntegrityError as e:
+    except (SaleServiceError, IntegrityError) as e:
         session.rollback()
-        raise SaleServiceError(f"Failed to create sale: {e}")
+        # A retry of a sale that went through fails here too: on the key's
+        # unique index, or on stock the first attempt already took.
+        original = _sale_by_idempotency_key(session, idempotency_key) if idempotency_key else None
+        if original is None:
+            if isinstance(e, SaleServiceError):
+                raise
+            raise SaleServiceError(f"Failed to create sale: {e}")
+        if original.customer_id != customer_id or original.total_amount != total:
+            raise SaleServiceError(f"Idempotency key {idempotency_key!r} was already used for sale {original.id}")
+        return original
+
+
+def _existing_ids(session, column, ids):
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), _IN_CHUNK_SIZE):
+        chunk = ids[start:start + _IN_CHUNK_SIZE]
+        found.update(session.execute(select(column).where(column.in_(chunk))).scalars())
+    return found
+
+
+def _validate_bulk_sales(session, sales):
+    """
+    Validates every sale up front: shape, items and timestamp per sale, then one
+    pass over the database for all referenced customers and products.
+    """
+    if not isinstance(sales, list) or len(sales) == 0:
+        raise SaleServiceError("sales must be a non-empty list")
+
+    customer_ids = set()
+    product_ids = set()
+    for idx, sale in enumerate(sales):
+        if not isinstance(sale, dict) or "customer_id" not in sale or "items" not in sale:
+            raise SaleServiceError(f"Sale at index {idx} must be a dict with customer_id and items")
+        try:
+            _validate_sale_items(sale["items"])
+            _validate_idempotency_key(sale.get("idempotency_key"))
+            _parse_date(sale.get("timestamp"))
+        except SaleServiceError as e:
+            raise SaleServiceError(f"Sale at index {idx}: {e}")
+        customer_ids.add(sale["customer_id"])
+        product_ids.update(item["product_id"] for item in sale["items"])
+
+    missing_customers = customer_ids - _existing_ids(session, Customer.id, customer_ids)
+    if missing_customers:
+        raise SaleServiceError(f"Customers do not exist: {sorted(missing_customers)}")
+
+    missing_products = product_ids - _existing_ids(session, Product.id, product_ids)
+    if missing_products:
+        raise SaleServiceError(f"Products do not exist: {sorted(missing_products)}")
+
+
+def _sale_header(customer_id, total_amount, timestamp, idempotency_key):
+    return customer_id, float(total_amount), timestamp, idempotency_key
+
+
+def _insert_sales(session, sale_rows):
+    """
+    Inserts sale header rows and returns their ids in input order. Where the
+    backend supports it this is one multi-row INSERT ... RETURNING. RETURNING
+    is not guaranteed to follow VALUES order, so each id is matched back to its
+    row by the header columns returned with it; rows with identical headers
+    are interchangeable, so any match among them is correct. Elsewhere
+    (SQLAlchemy 1.4 on SQLite) it falls back to one INSERT per header, a round
+    trip per sale.
+    """
+    if supports_insert_returning(session):
+        result = session.execute(
+            insert(Sale).values(sale_rows)
+            .returning(Sale.id, Sale.customer_id, Sale.total_amount, Sale.timestamp, Sale.idempotency_key)
+        )
+        ids_by_header = {}
+        for sale_id, *header in sorted(result, reverse=True):
+            ids_by_header.setdefault(_sale_header(*header), []).append(sale_id)
+        return [
+            ids_by_header[_sale_header(
+                row["customer_id"], row["total_amount"], row["timestamp"], row["idempotency_key"],
+            )].pop()
+            for row in sale_rows
+        ]
+    return [session.execute(insert(Sale).values(**row)).inserted_primary_key[0] for row in sale_rows]
+
+
+def _sale_ids_by_key(session, keys):
+    keys = list(keys)
+    found = {}
+    for start in range(0, len(keys), _IN_CHUNK_SIZE):
+        chunk = keys[start:start + _IN_CHUNK_SIZE]
+        found.update(session.execute(
+            select(Sale.idempotency_key, Sale.id).where(Sale.idempotency_key.in_(chunk))
+        ).all())
+    return found
+
+
+def _insert_sale_batch(session, batch, update_stock, allow_negative_stock=False):
+    """
+    Inserts `batch` and returns the sale ids in input order. Sales whose
+    idempotency_key is already recorded (or repeated within the batch) are not
+    inserted again; the id of the sale holding the key is returned instead.
+    """
+    keys = {sale["idempotency_key"] for sale in batch if sale.get("idempotency_key")}
+    ids_by_key = _sale_ids_by_key(session, keys) if keys else {}
+
+    now = datetime.now(timezone.utc)
+    positions = []
+    new_sales = []
+    sale_rows = []
+    for position, sale in enumerate(batch):
+        key = sale.get("idempotency_key")
+        if key:
+            if key in ids_by_key:
+                continue
+            ids_by_key[key] = None
+        positions.append(position)
+        new_sales.append(sale)
+        sale_rows.append({
+            "customer_id": sale["customer_id"],
+            "total_amount": sum(item["price_at_sale"] * item["quantity"] for item in sale["items"]),
+            # Stored as naive UTC, the way RETURNING gives it back.
+            "timestamp": to_utc(_parse_date(sale.get("timestamp")) or now).replace(tzinfo=None),
+            "idempotency_key": key,
+        })
+    new_ids = _insert_sales(session, sale_rows) if new_sales else []
+
+    item_rows = []
+    quantities = {}
+    movements = []
+    rollup = {}
+    for sale, row, sale_id in zip(new_sales, sale_rows, new_ids):
+        items = sale["items"]
+        if row["idempotency_key"]:
+            ids_by_key[row["idempotency_key"]] = sale_id
+        for item in items:
+            item_rows.append({
+                "sale_id": sale_id,
+                "product_id": item["product_id"],
+                "name": item["name"],
+                "quantity": item["quantity"],
+                "price_at_sale": item["price_at_sale"],
+            })
+            quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+        _add_to_rollup(rollup, row["timestamp"], 1, row["total_amount"], sum(item["quantity"] for item in items))
+        movements.extend(_sale_movements(sale_id, _quantities_by_product(items)))
+
+    sale_ids = [ids_by_key.get(sale.get("idempotency_key")) for sale in batch]
+    for position, sale_id in zip(positions, new_ids):
+        sale_ids[position] = sale_id
+    if not new_sales:
+        return sale_ids
+
+    if update_stock:
+        available = _decrement_stock(session, quantities, allow_negative_stock)
+        # Flag the sales that went past the stock there was, in input order.
+        for movement in movements:
+            product_id = movement["product_id"]
+            if product_id in available:
+                available[product_id] += movement["quantity"]
+                if available[product_id] < 0:
+                    movement["note"] = OVERSOLD_NOTE
+        record_stock_movements(session, movements)
+    session.execute(insert(SaleItem), item_rows)
+    _apply_daily_rollup(session, rollup)
+    bump_generation(session)
+    return sale_ids
+
+
+def validate_sale_data(sale_items_data, idempotency_key=None):
+    """
+    The checks create_sale makes on its input before touching the database:
+    item shape and values, and the idempotency key. Raises SaleServiceError.
+    """
+    _validate_sale_items(sale_items_data)
+    _validate_idempotency_key(idempotency_key)
+
+
+def insert_sales_batch(session, sales, update_stock=True, allow_negative_stock=False):
+    """
+    Validates and writes `sales` (same shape as create_sales_bulk) in the
+    session's current transaction and returns their ids in input order. Does
+    not commit: callers that write more in the same transaction (e.g. a
+    journal checkpoint) commit or roll back themselves.
+
+    With `allow_negative_stock`, a stock shortfall takes the product below zero
+    instead of raising, and the sale's ledger rows for it are noted
+    OVERSOLD_NOTE so a stock-take can reconcile them. Use it for sales that
+    already happened, e.g. ones a till recorded while offline.
+    """
+    _validate_bulk_sales(session, sales)
+    return _insert_sale_batch(session, sales, update_stock, allow_negative_stock)
+
+
+def create_sales_bulk(session, sales, batch_size=BULK_BATCH_SIZE, update_stock=True):
+    """
+    Records many sales at once, e.g. when replaying an offline till or importing
+    history. Each sale is a dict with `customer_id`, `items` (same shape as
+    create_sale) and an optional `timestamp` and `idempotency_key`. Sales
+    whose key is already recorded are skipped and their existing id returned,
+    so a failed import or replay can simply be run again.
+
+    All sales are validated before anything is written. Rows are then inserted
+    with Core statements and committed every `batch_size` sales. If a batch
+    fails (e.g. insufficient stock) it is rolled back and SaleServiceError is
+    raised; batches committed before it stay committed.
+
+    Returns the sale ids in input order.
+    """
+    if batch_size < 1:
+        raise SaleServiceError("batch_size must be a positive integer")
+
+    _validate_bulk_sales(session, sales)
+
+    sale_ids = []
+    for start in range(0, len(sales), batch_size):
+        batch = sales[start:start + batch_size]
+        try:
+            sale_ids.extend(_insert_sale_batch(session, batch, update_stock))
+            session.commit()
+        except (SaleServiceError, IntegrityError) as e:
+            session.rollback()
+            raise SaleServiceError(
+                f"Bulk sale batch starting at index {start} failed "
+                f"({len(sale_ids)} sales already committed): {e}"
+            )
+
+    return sale_ids
 
 
 def get_sale_by_id(session, sale_id):
@@ -122,6 +503,88 @@ def get_all_sales(session, page=1, per_page=20):
 
     return query.all()
 
+def _encode_cursor(sale):
+    payload = json.dumps({"t": sale.timestamp.isoformat(), "i": sale.id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+        raise SaleServiceError(f"Invalid page cursor: {cursor!r}")
+
+
+def _keyset_page(query, per_page, cursor):
+    """
+    Returns one page of `query` ordered newest first by (timestamp, id), plus the
+    cursor for the next page (None on the last page). The filter is written as
+    `timestamp <= t AND (timestamp < t OR id < i)` so the index range seek works
+    on every backend, not just those that optimise row-value comparisons.
+    """
+    if per_page < 1:
+        raise SaleServiceError("per_page must be a positive integer")
+
+    if cursor:
+        timestamp, sale_id = _decode_cursor(cursor)
+        query = query.filter(
+            Sale.timestamp <= timestamp,
+            or_(Sale.timestamp < timestamp, and_(Sale.timestamp == timestamp, Sale.id < sale_id)),
+        )
+
+    sales = query.order_by(Sale.timestamp.desc(), Sale.id.desc()).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(sales) > per_page:
+        sales = sales[:per_page]
+        next_cursor = _encode_cursor(sales[-1])
+    return sales, next_cursor
+
+
+def get_all_sales_keyset(session, cursor=None, per_page=20):
+    """
+    Cursor-paginated variant of get_all_sales. Pass the returned cursor back in
+    to get the next page; cost per page does not grow with page depth and pages
+    do not shift when new sales are recorded.
+    """
+    return _keyset_page(session.query(Sale), per_page, cursor)
+
+
+def get_sales_by_customer_keyset(session, customer_id, cursor=None, per_page=20):
+    """Cursor-paginated variant of get_sales_by_customer."""
+    query = session.query(Sale).filter(Sale.customer_id == customer_id)
+    return _keyset_page(query, per_page, cursor)
+
+
+def list_sales_with_summary(session, cursor=None, per_page=20, customer_id=None):
+    """
+    Lightweight sales listing for tables and API responses: one SQL statement
+    returning rows with id, timestamp, total_amount, customer_name and
+    item_count, newest first. Paginates like get_all_sales_keyset and returns
+    (rows, next_cursor).
+    """
+    item_count = (
+        select(func.count(SaleItem.id))
+        .where(SaleItem.sale_id == Sale.id)
+        .correlate(Sale)
+        .scalar_subquery()
+        .label("item_count")
+    )
+    query = session.query(
+        Sale.id,
+        Sale.timestamp,
+        Sale.total_amount,
+        Customer.name.label("customer_name"),
+        item_count,
+    ).outerjoin(Customer, Customer.id == Sale.customer_id)
+
+    if customer_id is not None:
+        query = query.filter(Sale.customer_id == customer_id)
+
+    return _keyset_page(query, per_page, cursor)
+
+
 def get_recent_sales(session, limit=7):
     """
     Returns the most recent sales, including customer name and timestamp.
@@ -141,6 +604,11 @@ def delete_sale(session, sale_id):
     """
     try:
         sale = get_sale_by_id(session, sale_id)
+        rollup = {}
+        _add_to_rollup(rollup, sale.timestamp, -1, -sale.total_amount,
+                       -sum(item.quantity for item in sale.items))
+        _apply_daily_rollup(session, rollup)
+        bump_generation(session)
         session.delete(sale)
         session.commit()
         return True
@@ -149,27 +617,92 @@ def delete_sale(session, sale_id):
         raise SaleServiceError(f"Failed to delete sale: {e}")
 
 
+def fill_daily_sales(session):
+    """
+    Replaces the daily_sales rows with totals recomputed from the sales tables,
+    in the session's current transaction, and returns the number of days
+    written. Where the backend can compute the store-local day (PostgreSQL, or
+    SQLite with a UTC store) sales are grouped in SQL; otherwise they are
+    streamed and bucketed with the same function the write path uses. Does not
+    commit or touch the report cache, so migrations can run it too.
+    """
+    units_per_sale = (
+        select(SaleItem.sale_id, func.sum(SaleItem.quantity).label("units"))
+        .group_by(SaleItem.sale_id)
+        .subquery()
+    )
+    units = func.coalesce(units_per_sale.c.units, 0)
+    day = store_day(session, Sale.timestamp)
+
+    rollup = {}
+    if day is not None:
+        # Grouping on a subquery column keeps the day expression (and its bound
+        # time zone names) out of GROUP BY, which PostgreSQL would not match.
+        per_sale = (
+            select(day.label("day"), Sale.total_amount, units.label("units"))
+            .outerjoin(units_per_sale, units_per_sale.c.sale_id == Sale.id)
+            .subquery()
+        )
+        stmt = (
+            select(per_sale.c.day, func.count(), func.sum(per_sale.c.total_amount), func.sum(per_sale.c.units))
+            .group_by(per_sale.c.day)
+        )
+        for sale_day, count, revenue, item_units in session.execute(stmt):
+            rollup[sale_day] = (count, revenue, item_units)
+    else:
+        stmt = (
+            select(Sale.timestamp, Sale.total_amount, units)
+            .outerjoin(units_per_sale, units_per_sale.c.sale_id == Sale.id)
+            .execution_options(stream_results=True, yield_per=BULK_BATCH_SIZE)
+        )
+        for timestamp, total, item_units in session.execute(stmt):
+            _add_to_rollup(rollup, timestamp, 1, total, item_units)
+
+    session.execute(delete(DailySales))
+    _apply_daily_rollup(session, rollup)
+    return len(rollup)
+
+
+def rebuild_daily_sales(session):
+    """
+    Recomputes the daily_sales rollup from the sales tables and commits, e.g.
+    after a manual data fix. Returns the number of days written.
+    """
+    try:
+        days = fill_daily_sales(session)
+        bump_generation(session)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return days
+
+
 def get_sales_summary_by_day(session, start_date=None, end_date=None):
-    start_date = _parse_date(start_date)
-    end_date = _parse_date(end_date)
+    """
+    Daily totals, newest first, read from the daily_sales rollup. Bounds are
+    applied at whole-day granularity in the store's timezone. Archiving sales
+    keeps their days in the rollup, so archived years are included without
+    attaching the archives.
+    """
+    start_day = _day_bound(start_date)
+    end_day = _day_bound(end_date)
 
-    query = session.query(
-        func.date(Sale.timestamp).label("date"),
-        func.sum(Sale.total_amount).label("total")
-    )
+    query = session.query(DailySales).filter(DailySales.sale_count > 0)
 
-    if start_date:
-        query = query.filter(Sale.timestamp >= start_date)
-    if end_date:
-        query = query.filter(Sale.timestamp <= end_date)
+    if start_day:
+        query = query.filter(DailySales.day >= start_day)
+    if end_day:
+        query = query.filter(DailySales.day <= end_day)
 
-    query = query.group_by(func.date(Sale.timestamp)).order_by(func.date(Sale.timestamp).desc())
-    results = query.all()
+    results = query.order_by(DailySales.day.desc()).all()
 
     return [
         {
-            "date": row.date.isoformat() if hasattr(row.date, "isoformat") else str(row.date),
-            "total": row.total
+            "date": row.day.isoformat(),
+            "total": row.revenue,
+            "sale_count": row.sale_count,
+            "item_units": row.item_units,
         }
         for row in results
     ]
@@ -178,19 +711,20 @@ def get_sales_summary_by_day(session, start_date=None, end_date=None):
 def get_sales_summary_by_customer(session, start_date=None, end_date=None):
     start_date = _parse_date(start_date)
     end_date = _parse_date(end_date)
+    sales = sales_source(session, start_date, end_date)
 
     query = session.query(
         Customer.id.label("customer_id"),
         Customer.name.label("customer_name"),
-        func.sum(Sale.total_amount).label("total")
-    ).join(Sale, Sale.customer_id == Customer.id)
+        func.sum(sales.c.total_amount).label("total")
+    ).join(sales, sales.c.customer_id == Customer.id)
 
     if start_date:
-        query = query.filter(Sale.timestamp >= start_date)
+        query = query.filter(sales.c.timestamp >= start_date)
     if end_date:
-        query = query.filter(Sale.timestamp <= end_date)
+        query = query.filter(sales.c.timestamp <= end_date)
 
-    query = query.group_by(Customer.id, Customer.name).order_by(func.sum(Sale.total_amount).desc())
+    query = query.group_by(Customer.id, Customer.name).order_by(func.sum(sales.c.total_amount).desc())
     results = query.all()
 
     return [
@@ -0,0 +1,175 @@
+"""
+Stock movement ledger and snapshots.
+
+Every change to Product.stock writes a stock_movements row in the same
+transaction. `take_stock_snapshot` records every product's stock at one
+moment (run it periodically, e.g. nightly or at month end), so stock at any
+point in time is the latest snapshot before it plus a bounded scan of the
+movements in between.
+"""
+from datetime import date, datetime, time, timezone
+
+from sqlalchemy import and_, func, insert, literal, or_, select, update
+
+from app.models.product import Product
+from app.models.stock_movement import MOVEMENT_TYPES, StockMovement
+from app.models.stock_snapshot import StockSnapshot
+from app.utils.time_utils import to_utc
+
+
+def _utc_naive(value):
+    """Ledger times are stored as naive UTC, like sale timestamps."""
+    if value is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid date format: {value}")
+    if isinstance(value, date) and not isinstance(value, datetime):
+        # A bare date means the end of that day.
+        value = datetime.combine(value, time.max)
+    return to_utc(value).replace(tzinfo=None)
+
+
+def record_stock_movements(session, movements, occurred_at=None):
+    """
+    Appends ledger rows with one executemany. `movements` is an iterable of
+    dicts with product_id, movement_type and signed quantity, plus optional
+    sale_id, note and occurred_at (defaults to `occurred_at`, then now). Does
+    not touch Product.stock or commit.
+    """
+    occurred_at = _utc_naive(occurred_at)
+    rows = []
+    for movement in movements:
+        if movement["movement_type"] not in MOVEMENT_TYPES:
+            raise ValueError(f"Unknown stock movement type: {movement['movement_type']}")
+        if movement["quantity"] == 0:
+            continue
+        rows.append({
+            "product_id": movement["product_id"],
+            "movement_type": movement["movement_type"],
+            "quantity": movement["quantity"],
+            "occurred_at": _utc_naive(movement["occurred_at"]) if movement.get("occurred_at") else occurred_at,
+            "sale_id": movement.get("sale_id"),
+            "note": movement.get("note"),
+        })
+    if rows:
+        session.execute(insert(StockMovement), rows)
+    return len(rows)
+
+
+def adjust_stock(db, product_id, quantity, movement_type="adjustment", note=None):
+    """
+    Applies a signed stock change that is not a sale or purchase, e.g. a
+    customer return (+), breakage or a stock-take correction (+/-). Refuses to
+    take stock below zero.
+    """
+    if movement_type not in ("adjustment", "return"):
+        raise ValueError("movement_type must be 'adjustment' or 'return'")
+    if quantity == 0:
+        raise ValueError("Quantity must not be zero.")
+    if movement_type == "return" and quantity < 0:
+        raise ValueError("Returns must add stock.")
+
+    result = db.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.stock + quantity >= 0)
+        .values(stock=Product.stock + quantity)
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        if db.get(Product, product_id) is None:
+            raise ValueError("Product not found")
+        raise ValueError(f"Adjustment would take stock for product {product_id} below zero")
+
+    record_stock_movements(db, [{
+        "product_id": product_id, "movement_type": movement_type, "quantity": quantity, "note": note,
+    }])
+    db.commit()
+    return db.get(Product, product_id)
+
+
+def take_stock_snapshot(db, taken_at=None):
+    """
+    Records every product's stock at `taken_at` (default now) with one
+    INSERT ... SELECT and commits. Returns the number of products captured.
+    A past `taken_at` captures the stock as of that moment (stock_as_of), not
+    today's; future times are refused. Run it when the tills are idle (e.g.
+    after close): a sale committing while the snapshot is taken may be counted
+    both in the snapshot and as a later movement.
+    """
+    now = _utc_naive(None)
+    taken_at = _utc_naive(taken_at) if taken_at is not None else now
+    if taken_at > now:
+        raise ValueError("Stock snapshots cannot be taken in the future")
+    if taken_at < now:
+        levels = _stock_as_of_query(taken_at).subquery()
+        source = select(levels.c.id, literal(taken_at, StockSnapshot.taken_at.type), levels.c.stock)
+    else:
+        source = select(Product.id, literal(taken_at, StockSnapshot.taken_at.type), func.coalesce(Product.stock, 0))
+    stmt = insert(StockSnapshot).from_select(["product_id", "taken_at", "stock"], source)
+    try:
+        count = db.execute(stmt).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return count
+
+
+def _stock_as_of_query(at, product_ids=None):
+    # Snapshots always cover every product, so the latest snapshot time before
+    # `at` is one index seek. Products created after it have no snapshot row
+    # and are replayed from their opening receipt.
+    snapshot_time = (
+        select(func.max(StockSnapshot.taken_at)).where(StockSnapshot.taken_at <= at).scalar_subquery()
+    )
+    base = (
+        select(StockSnapshot.product_id, StockSnapshot.taken_at, StockSnapshot.stock)
+        .where(StockSnapshot.taken_at == snapshot_time)
+        .subquery("base")
+    )
+    movements = and_(
+        StockMovement.product_id == Product.id,
+        StockMovement.occurred_at <= at,
+        or_(base.c.taken_at.is_(None), StockMovement.occurred_at > base.c.taken_at),
+    )
+    stmt = (
+        select(
+            Product.id,
+            (func.coalesce(base.c.stock, 0) + func.coalesce(func.sum(StockMovement.quantity), 0)).label("stock"),
+        )
+        .select_from(Product)
+        .outerjoin(base, base.c.product_id == Product.id)
+        .outerjoin(StockMovement, movements)
+        .group_by(Product.id, base.c.stock)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(Product.id.in_(product_ids))
+    return stmt
+
+
+def stock_as_of(db, product_id, at):
+    """
+    Stock of one product at `at` (datetime, date = end of that day, or ISO
+    string; naive values are UTC). Products with no snapshot before `at` are
+    replayed from their first movement. Returns None for unknown products.
+    """
+    row = db.execute(_stock_as_of_query(_utc_naive(at), [product_id])).first()
+    return row.stock if row else None
+
+
+def stock_levels_as_of(db, at):
+    """{product_id: stock} for every product at `at`, in one query, e.g. for month-end valuation."""
+    return {row.id: row.stock for row in db.execute(_stock_as_of_query(_utc_naive(at)))}
+
+
+def get_stock_movements(db, product_id, start_date=None, end_date=None):
+    query = db.query(StockMovement).filter(StockMovement.product_id == product_id)
+    if start_date:
+        query = query.filter(StockMovement.occurred_at >= _utc_naive(start_date))
+    if end_date:
+        query = query.filter(StockMovement.occurred_at <= _utc_naive(end_date))
+    return query.order_by(StockMovement.occurred_at, StockMovement.id).all()
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+# The suite runs on in-memory SQLite by default. Point it at another backend with
+# e.g. POS_TEST_DATABASE_URL=postgresql://pos@localhost/pos_test (an empty
+# database the tests may create and drop tables in).
+TEST_DATABASE_URL = os.environ.get("POS_TEST_DATABASE_URL", "sqlite:///:memory:")
+
+sqlite_only = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("sqlite"), reason="checks SQLite-specific behaviour"
+)
+
+
+class StatementCounter:
+    """Record the SQL statements ``engine`` sends to the database inside a ``with`` block."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self)
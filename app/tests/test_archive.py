@@ -0,0 +1,117 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sales_archive import SalesArchive
+from app.services import reporting_service
+from app.services.archive_service import archive_sales, attach_archives
+from app.services.export_service import iter_sale_lines
+from app.services.sales_service import (
+    create_sales_bulk,
+    get_sales_summary_by_customer,
+    get_sales_summary_by_day,
+)
+from app.tests import TEST_DATABASE_URL, sqlite_only
+
+pytestmark = sqlite_only
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+TIMESTAMPS = [
+    datetime(2023, 3, 1, 9), datetime(2023, 11, 30, 18),
+    datetime(2024, 1, 2, 10), datetime(2024, 6, 1, 12), datetime(2024, 12, 31, 20),
+    datetime(2025, 2, 14, 11), datetime(2025, 8, 8, 8),
+]
+
+
+@pytest.fixture(scope="module")
+def archive_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("archive")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    alice = Customer(name="Alice", email="alice@archive.example")
+    bob = Customer(name="Bob", email="bob@archive.example")
+    tea = Product(name="Tea", brand="Ketepa", purchase_price=80, selling_price=100, stock=1000,
+                  barcode="ARC-1", unit="pcs")
+    db.add_all([alice, bob, tea])
+    db.commit()
+    create_sales_bulk(db, [
+        {"customer_id": (alice if i % 2 else bob).id, "timestamp": timestamp,
+         "items": [{"product_id": tea.id, "name": "Tea", "quantity": i + 1, "price_at_sale": 100}]}
+        for i, timestamp in enumerate(TIMESTAMPS)
+    ])
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _reports(db):
+    return {
+        "per_customer": reporting_service.total_sales_per_customer(db),
+        "frequency": reporting_service.customer_purchase_frequency(db),
+        "top_products": reporting_service.top_products_by_units(db),
+        "by_category": reporting_service.revenue_by_category(db),
+        "2024": reporting_service.top_customers_by_sales(db, start_date="2024-01-01", end_date="2024-12-31T23:59"),
+        "summary": get_sales_summary_by_customer(db, "2023-06-01", "2025-03-01"),
+        "by_day": get_sales_summary_by_day(db),
+        "export": list(iter_sale_lines(db)),
+        "export_2024": list(iter_sale_lines(db, "2024-01-01", "2024-12-31", batch_size=2)),
+    }
+
+
+def test_archived_years_stay_in_reports(session, archive_dir):
+    before = _reports(session)
+    assert len(before["export"]) == len(TIMESTAMPS) and len(before["export_2024"]) == 3
+
+    moved = archive_sales(session, "2025-01-01", archive_dir, chunk_size=2)
+
+    assert moved == {2023: 2, 2024: 3}
+    assert sorted(p.name for p in archive_dir.iterdir()) == ["sales-2023.db", "sales-2024.db"]
+    assert session.execute(select(func.count()).select_from(Sale)).scalar() == 2
+    archive = session.get(SalesArchive, 2024)
+    assert (archive.sale_count, archive.first_sale_at, archive.last_sale_at) == (3, TIMESTAMPS[2], TIMESTAMPS[4])
+    assert _reports(session) == before
+    assert archive_sales(session, "2025-01-01", archive_dir) == {}
+
+
+def test_hot_ranges_do_not_attach_archives(session):
+    assert attach_archives(session, datetime(2025, 1, 1)) == []
+    assert attach_archives(session, datetime(2024, 7, 1), datetime(2025, 1, 1)) == ["archive_2024"]
+
+    lines = reporting_service.top_products_by_units(session, start_date="2025-01-01")
+    assert lines[0]["units"] == 6 + 7
+
+
+def test_newest_sale_is_never_archived(session, archive_dir):
+    assert archive_sales(session, datetime(2030, 1, 1), archive_dir) == {2025: 1}
+    assert session.execute(select(Sale.timestamp)).scalars().all() == [TIMESTAMPS[-1]]
+
+
+def test_missing_archive_file_is_reported(session, archive_dir):
+    archive = session.get(SalesArchive, 2023)
+    archive.path = str(archive_dir / "moved-away.db")
+    session.flush()
+
+    with pytest.raises(ValueError, match="missing"):
+        reporting_service.customer_purchase_frequency(session, start_date="2023-01-01")
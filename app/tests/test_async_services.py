@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from app.db.async_engine import async_session_factory, async_url, build_async_engine  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.services import async_services  # noqa: E402
+from app.services.catalog_cache import catalog_cache  # noqa: E402
+from app.services.report_cache import report_cache  # noqa: E402
+from app.services.sales_service import SaleServiceError  # noqa: E402
+
+
+@pytest.fixture
+def run(tmp_path):
+    """Runs `scenario(session_factory)` on a fresh file database in its own event loop."""
+    catalog_cache.clear()
+    report_cache.clear()
+
+    def runner(scenario):
+        async def main():
+            engine = build_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                return await scenario(async_session_factory(engine))
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+
+    return runner
+
+
+async def _catalog(db, stock=10):
+    """(product line factory, customer id); ORM objects expire on the next commit, so keep plain values."""
+    category = await async_services.create_category(db, "Async")
+    product = await async_services.create_product(db, "Milk", "KCC", 40, 60, stock, "ASYNC-1", category.id, "pcs")
+    product_id = product.id
+    customer = await async_services.create_customer(db, "Till", "till@example.com")
+
+    def line(quantity=1):
+        return {"product_id": product_id, "name": "Milk", "quantity": quantity, "price_at_sale": 60}
+    return line, customer.id
+
+
+def test_async_url_swaps_the_driver():
+    assert str(async_url("sqlite:///pos.db")) == "sqlite+aiosqlite:///pos.db"
+    assert async_url("postgresql://u@h/pos").drivername == "postgresql+asyncpg"
+    assert async_url("sqlite+aiosqlite:///pos.db").drivername == "sqlite+aiosqlite"
+    with pytest.raises(ValueError):
+        async_url("mssql+pyodbc://h/pos")
+
+
+def test_checkout_and_reports_share_the_sync_services(run):
+    async def scenario(Session):
+        async with Session() as db:
+            line, customer_id = await _catalog(db)
+            sale = await async_services.create_sale(db, customer_id, [line(3)])
+            total, items = sale.total_amount, len(sale.items)
+            stock = (await async_services.get_product_by_id(db, line()["product_id"])).stock
+            top = await async_services.top_products_by_revenue(db)
+            rows = await async_services.list_product_rows(db)
+            with pytest.raises(SaleServiceError):
+                await async_services.create_sale(db, customer_id, [line(100)])
+            return (total, items), stock, top, rows
+
+    total, stock, top, rows = run(scenario)
+
+    assert (total, stock) == ((180, 1), 7)
+    assert (top[0]["product_name"], top[0]["units"]) == ("Milk", 3)
+    assert rows[0].category_name == "Async"
+
+
+def test_concurrent_checkouts_never_oversell(run):
+    async def scenario(Session):
+        async with Session() as db:
+            line, customer_id = await _catalog(db, stock=5)
+
+        async def checkout():
+            async with Session() as db:
+                try:
+                    await async_services.create_sale(db, customer_id, [line()])
+                    return True
+                except SaleServiceError:
+                    return False
+
+        results = await asyncio.gather(*(checkout() for _ in range(8)))
+        async with Session() as db:
+            return results, (await async_services.get_product_by_id(db, line()["product_id"])).stock
+
+    results, stock = run(scenario)
+
+    assert results.count(True) == 5 and stock == 0
+
+
+def test_streaming_yields_rows_batch_by_batch(run):
+    async def scenario(Session):
+        async with Session() as db:
+            line, customer_id = await _catalog(db, stock=50)
+            await async_services.create_sales_bulk(db, [
+                {"customer_id": customer_id, "timestamp": datetime(2025, 1, day), "items": [line()]}
+                for day in range(1, 11)
+            ])
+            lines = [line async for line in async_services.stream_sale_lines(
+                db, "2025-01-03", "2025-01-07", batch_size=2)]
+            products = [row async for row in async_services.stream_product_rows(db, batch_size=1)]
+            return lines, products
+
+    lines, products = run(scenario)
+
+    assert [line["timestamp"][:10] for line in lines] == [f"2025-01-0{d}" for d in range(3, 8)]
+    assert [p.barcode for p in products] == ["ASYNC-1"]
@@ -0,0 +1,129 @@
+import pytest
+import uuid
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.services.catalog_cache import ProductCatalogCache, catalog_cache
+from app.services.inventory_service import (
+    create_product,
+    delete_product,
+    purchase_product,
+    update_product,
+)
+from app.tests import TEST_DATABASE_URL, StatementCounter
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    catalog_cache.clear()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def product(session):
+    category = Category(name=f"Cache {uuid.uuid4()}")
+    session.add(category)
+    session.commit()
+    return create_product(
+        session, name="Royco", brand="Unilever", purchase_price=40, selling_price=55,
+        stock=20, barcode=str(uuid.uuid4().int)[:13], category_id=category.id, unit="g",
+    )
+
+
+def test_repeat_scans_are_served_from_cache(session, product):
+    product_id, barcode = product.id, product.barcode
+    first = catalog_cache.get_by_barcode(session, barcode)
+
+    with StatementCounter(engine) as counter:
+        by_barcode = catalog_cache.get_by_barcode(session, barcode)
+        by_id = catalog_cache.get(session, product_id)
+
+    assert counter.count == 0
+    assert by_barcode is first and by_id is first
+    assert first.selling_price == 55
+    with pytest.raises(AttributeError):
+        first.selling_price = 1
+
+
+def test_price_changes_invalidate_cache(session, product):
+    product_id = product.id
+    assert catalog_cache.get(session, product_id).selling_price == 55
+
+    update_product(session, product_id, selling_price=60)
+    assert catalog_cache.get(session, product_id).selling_price == 60
+
+    purchase_product(session, product_id, 45, 65, 10)
+    assert catalog_cache.get(session, product_id).selling_price == 65
+
+    delete_product(session, product_id)
+    assert catalog_cache.get(session, product_id) is None
+
+
+def test_barcode_change_drops_old_barcode(session, product):
+    product_id, old_barcode = product.id, product.barcode
+    catalog_cache.get(session, product_id)
+
+    update_product(session, product_id, barcode="NEW-" + old_barcode)
+
+    assert catalog_cache.get_by_barcode(session, old_barcode) is None
+    assert catalog_cache.get_by_barcode(session, "NEW-" + old_barcode).id == product_id
+
+
+def test_lru_evicts_least_recently_used(session, product):
+    cache = ProductCatalogCache(max_size=1)
+    product_id = product.id
+    other = create_product(
+        session, name="Kimbo", brand="Bidco", purchase_price=300, selling_price=350,
+        stock=5, barcode=str(uuid.uuid4()), category_id=product.category_id, unit="g",
+    )
+
+    cache.get(session, product_id)
+    cache.get(session, other.id)
+
+    assert len(cache) == 1
+    assert cache.get_by_barcode(session, product.barcode).id == product_id
+    assert cache.misses == 3
+
+
+def test_snapshot_loaded_during_invalidation_is_not_stored(session, product):
+    cache = ProductCatalogCache()
+    product_id = product.id
+    generation = cache._generation
+    cache.invalidate(product_id=product_id)
+
+    cache._load(session, type(product).id == product_id, generation)
+
+    assert len(cache) == 0
+
+
+def test_writes_from_other_processes_are_seen_after_the_check_interval(session, product):
+    now = [0.0]
+    cache = ProductCatalogCache(check_interval=5, clock=lambda: now[0])
+    product_id = product.id
+    assert cache.get(session, product_id).selling_price == 55
+
+    # Another process: its own session, and its own cache that this one never hears from.
+    with TestSessionLocal() as other:
+        update_product(other, product_id, selling_price=70)
+
+    now[0] = 4.9
+    assert cache.get(session, product_id).selling_price == 55
+    now[0] = 5.0
+    assert cache.get(session, product_id).selling_price == 70
@@ -0,0 +1,229 @@
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.customer import Customer
+from app.models.journal_checkpoint import JournalCheckpoint
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.stock_movement import StockMovement
+from app.services.checkout_journal import (
+    CheckoutJournal,
+    JournalError,
+    JournalFlusher,
+    record_sale,
+    redrive_rejected,
+    rejected_sales,
+)
+from app.services.sales_service import OVERSOLD_NOTE, SaleServiceError, create_sale
+from app.tests import TEST_DATABASE_URL
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = CheckoutJournal(tmp_path / f"till-{uuid.uuid4().hex[:8]}")
+    yield journal
+    journal.close()
+
+
+@pytest.fixture
+def catalog(session):
+    customer = Customer(name="Journal", email=f"{uuid.uuid4()}@example.com")
+    product = Product(name="Bread", brand="Festive", purchase_price=40, selling_price=55, stock=5,
+                      barcode=f"JRN-{uuid.uuid4()}", unit="pcs")
+    session.add_all([customer, product])
+    session.commit()
+
+    def line(quantity=1):
+        return [{"product_id": product.id, "name": "Bread", "quantity": quantity, "price_at_sale": 55}]
+    return customer.id, product, line
+
+
+def _sale_count(session, customer_id):
+    return session.execute(select(func.count()).where(Sale.customer_id == customer_id)).scalar()
+
+
+def test_checkout_is_journaled_then_flushed_once(session, journal, catalog):
+    customer_id, product, line = catalog
+
+    receipts = [record_sale(journal, customer_id, line()) for _ in range(3)]
+    assert [r["seq"] for r in receipts] == [1, 2, 3] and receipts[0]["total_amount"] == 55
+    assert _sale_count(session, customer_id) == 0
+
+    flusher = JournalFlusher(journal, TestSessionLocal, batch_size=2)
+    assert flusher.flush() == 3
+    assert flusher.flush() == 0
+
+    session.expire_all()
+    assert _sale_count(session, customer_id) == 3
+    assert product.stock == 2
+    assert session.get(JournalCheckpoint, journal.name).last_seq == 3
+
+
+def test_restart_replays_from_the_checkpoint(session, journal, catalog):
+    customer_id, product, line = catalog
+    record_sale(journal, customer_id, line())
+    JournalFlusher(journal, TestSessionLocal).flush()
+    record_sale(journal, customer_id, line())
+    journal.close()
+    segment = sorted(journal.directory.glob("0*.jsonl"))[-1]
+    with open(segment, "ab") as f:
+        f.write(b'{"seq":3,"customer_id"')  # torn write from a crash
+
+    reopened = CheckoutJournal(journal.directory)
+    assert reopened.last_seq == 2
+    assert record_sale(reopened, customer_id, line())["seq"] == 3
+    assert JournalFlusher(reopened, TestSessionLocal).flush() == 2
+    reopened.close()
+
+    session.expire_all()
+    assert _sale_count(session, customer_id) == 3 and product.stock == 2
+
+
+def test_oversold_sales_are_written_and_flagged(session, journal, catalog):
+    customer_id, product, line = catalog
+    record_sale(journal, customer_id, line(2))
+    record_sale(journal, customer_id, line(10))
+
+    flusher = JournalFlusher(journal, TestSessionLocal)
+    assert flusher.flush() == 2 and flusher.rejected == 0
+
+    session.expire_all()
+    assert _sale_count(session, customer_id) == 2 and product.stock == -7
+    notes = session.execute(
+        select(StockMovement.note).where(StockMovement.product_id == product.id).order_by(StockMovement.id)
+    ).scalars().all()
+    assert notes == [None, OVERSOLD_NOTE]
+
+
+def test_unwritable_sales_are_set_aside_and_redriven(session, journal, catalog):
+    customer_id, product, line = catalog
+    missing_customer_id = customer_id + 1000
+    record_sale(journal, customer_id, line(1))
+    record_sale(journal, missing_customer_id, line(1))
+    record_sale(journal, customer_id, line(1))
+
+    flusher = JournalFlusher(journal, TestSessionLocal)
+    assert flusher.flush() == 3
+    assert (flusher.flushed, flusher.rejected) == (2, 1)
+    rejected = rejected_sales(journal.directory)
+    assert [r["record"]["seq"] for r in rejected] == [2]
+    assert "Customers do not exist" in rejected[0]["error"]
+    assert session.get(JournalCheckpoint, journal.name).last_seq == 3
+
+    assert redrive_rejected(journal.directory, TestSessionLocal) == (0, 1)
+    session.add(Customer(id=missing_customer_id, name="Restored", email=f"{uuid.uuid4()}@example.com"))
+    session.commit()
+    assert redrive_rejected(journal.directory, TestSessionLocal) == (1, 0)
+    assert rejected_sales(journal.directory) == []
+    assert redrive_rejected(journal.directory, TestSessionLocal) == (0, 0)
+
+    session.expire_all()
+    assert _sale_count(session, missing_customer_id) == 1 and product.stock == 2
+
+
+def test_sale_already_recorded_online_is_not_sold_twice(session, journal, catalog):
+    customer_id, product, line = catalog
+    sale = create_sale(session, customer_id, line(), idempotency_key="till-1:0042")
+    record_sale(journal, customer_id, line(), idempotency_key="till-1:0042")
+    record_sale(journal, customer_id, line())
+
+    flusher = JournalFlusher(journal, TestSessionLocal)
+    assert flusher.flush() == 2 and flusher.rejected == 0
+
+    session.expire_all()
+    assert _sale_count(session, customer_id) == 2 and product.stock == 3
+    assert session.get(Sale, sale.id).idempotency_key == "till-1:0042"
+
+
+def test_invalid_items_are_refused_at_the_till(journal):
+    with pytest.raises(SaleServiceError):
+        record_sale(journal, 1, [])
+    assert journal.last_seq == 0
+
+
+def test_concurrent_appends_roll_and_prune_segments(session, journal, catalog):
+    customer_id, product, line = catalog
+    journal.segment_size = 512
+
+    threads = [threading.Thread(target=record_sale, args=(journal, customer_id, line()))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [r["seq"] for r in journal.records()] == [1, 2, 3, 4, 5]
+    assert len(list(journal.directory.glob("0*.jsonl"))) > 1
+
+    JournalFlusher(journal, TestSessionLocal).flush()
+    assert len(list(journal.directory.glob("0*.jsonl"))) == 1
+    assert record_sale(journal, customer_id, line())["seq"] == 6
+
+
+def test_a_reset_journal_is_not_silently_skipped(session, tmp_path, catalog):
+    customer_id, product, line = catalog
+    directory = tmp_path / "till-reset"
+    journal = CheckoutJournal(directory)
+    record_sale(journal, customer_id, line())
+    JournalFlusher(journal, TestSessionLocal).flush()
+    journal.close()
+    for path in directory.iterdir():
+        path.unlink()
+
+    fresh = CheckoutJournal(directory)
+    with pytest.raises(JournalError):
+        JournalFlusher(fresh, TestSessionLocal).flush()
+    fresh.close()
+
+
+def test_background_flusher_drains_while_tills_sell(tmp_path):
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'pos.db'}")
+    Base.metadata.create_all(bind=file_engine)
+    Session = sessionmaker(bind=file_engine)
+    with Session() as db:
+        customer = Customer(name="Background", email="bg@example.com")
+        product = Product(name="Milk", brand="KCC", purchase_price=40, selling_price=60, stock=50,
+                          barcode="JRN-BG", unit="pcs")
+        db.add_all([customer, product])
+        db.commit()
+        customer_id, product_id = customer.id, product.id
+    items = [{"product_id": product_id, "name": "Milk", "quantity": 1, "price_at_sale": 60}]
+
+    journal = CheckoutJournal(tmp_path / "till-bg")
+    record_sale(journal, customer_id, items)
+    flusher = JournalFlusher(journal, Session, interval=0.01)
+    flusher.start()
+    for _ in range(9):
+        record_sale(journal, customer_id, items)
+    flusher.stop()
+    journal.close()
+
+    with Session() as db:
+        assert _sale_count(db, customer_id) == 10
+        assert db.get(Product, product_id).stock == 40
+    file_engine.dispose()
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.customer import Customer
+from app.services.customer_service import (
+    get_customer_by_name,
+    search_customers,
+    soft_delete_customer,
+    update_customer,
+)
+from app.tests import TEST_DATABASE_URL, sqlite_only
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    db.add_all([
+        Customer(name="Alice Wanjiru", email="alice@example.com"),
+        Customer(name="alicia  Keys", email="alicia@example.com"),
+        Customer(name="Mary Alison", email="mary@example.com"),
+        Customer(name="Bob Otieno", email="bob@example.com"),
+    ])
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _names(customers):
+    return [c.name for c in customers]
+
+
+def test_search_name_is_normalised_on_write(session):
+    customer = session.query(Customer).filter_by(email="alicia@example.com").one()
+    assert customer.search_name == "alicia keys"
+
+
+@sqlite_only
+def test_prefix_matches_come_before_word_matches(session):
+    assert _names(search_customers(session, "ALI")) == ["Alice Wanjiru", "alicia  Keys", "Mary Alison"]
+
+
+@sqlite_only
+def test_word_matches_inside_names(session):
+    assert _names(search_customers(session, "otie")) == ["Bob Otieno"]
+    assert _names(get_customer_by_name(session, "keys")) == ["alicia  Keys"]
+
+
+def test_limit_and_deleted_customers(session):
+    assert len(search_customers(session, "ali", limit=1)) == 1
+
+    mary = session.query(Customer).filter_by(email="mary@example.com").one()
+    soft_delete_customer(session, mary.id)
+    assert "Mary Alison" not in _names(search_customers(session, "ali"))
+
+
+def test_renames_update_both_indexes(session):
+    bob = session.query(Customer).filter_by(email="bob@example.com").one()
+    update_customer(session, bob.id, name="Robert Otieno")
+
+    assert _names(search_customers(session, "rob")) == ["Robert Otieno"]
+    assert _names(search_customers(session, "otieno")) == ["Robert Otieno"]
+    assert search_customers(session, "bob") == []
+
+
+@sqlite_only
+def test_prefix_lookup_uses_search_name_index(session):
+    plan = session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM customers "
+        "WHERE search_name >= :lo AND search_name < :hi"
+    ), {"lo": "ali", "hi": "alj"}).fetchall()
+
+    assert "idx_customer_search_name" in " ".join(row[-1] for row in plan)
@@ -4,9 +4,9 @@ from sqlalchemy.orm import sessionmaker
 
 from app.models.customer import Customer
 from app.models import Base
+from app.tests import TEST_DATABASE_URL
 
 # In-memory SQLite for isolated testing
-TEST_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(TEST_DATABASE_URL, echo=False)
 TestSessionLocal = sessionmaker(bind=engine)
 
@@ -0,0 +1,41 @@
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.db.engine import build_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_file_sqlite_uses_wal_and_tuned_pragmas(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'pos.db'}")
+    try:
+        assert isinstance(engine.pool, QueuePool)
+        assert _pragma(engine, "journal_mode") == "wal"
+        assert _pragma(engine, "synchronous") == 1  # NORMAL
+        assert _pragma(engine, "cache_size") == -64000
+        assert _pragma(engine, "temp_store") == 2  # MEMORY
+        assert _pragma(engine, "busy_timeout") == 5000
+    finally:
+        engine.dispose()
+
+
+def test_memory_sqlite_shares_one_connection():
+    engine = build_engine("sqlite:///:memory:")
+    assert isinstance(engine.pool, StaticPool)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+
+def test_pragmas_can_be_overridden_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("POS_SQLITE_SYNCHRONOUS", "FULL")
+    engine = build_engine(f"sqlite:///{tmp_path / 'pos.db'}")
+    try:
+        assert _pragma(engine, "synchronous") == 2  # FULL
+    finally:
+        engine.dispose()
@@ -0,0 +1,109 @@
+import csv
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.customer import Customer
+from app.models.product import Product
+from app.services.export_service import EXPORT_COLUMNS, export_sales, iter_sale_lines
+from app.services.sales_service import create_sales_bulk
+from app.tests import TEST_DATABASE_URL
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+NEW_YEAR = datetime(2025, 1, 1, 0, 30)
+MID_YEAR = datetime(2025, 6, 15, 12, 0)
+LAST_DAY = datetime(2025, 12, 31, 23, 59)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    customer = Customer(name="Accountant", email="books@example.com")
+    tea = Product(name="Tea", brand="Ketepa", purchase_price=80, selling_price=100, stock=100,
+                  barcode="EXP-1", unit="pcs")
+    sugar = Product(name="Sugar", brand="Mumias", purchase_price=100, selling_price=150, stock=100,
+                    barcode="EXP-2", unit="kg")
+    db.add_all([customer, tea, sugar])
+    db.commit()
+
+    def line(product, quantity):
+        return {"product_id": product.id, "name": product.name, "quantity": quantity,
+                "price_at_sale": product.selling_price}
+
+    create_sales_bulk(db, [
+        {"customer_id": customer.id, "timestamp": MID_YEAR, "items": [line(tea, 2), line(sugar, 1)]},
+        {"customer_id": customer.id, "timestamp": NEW_YEAR, "items": [line(tea, 1)]},
+        {"customer_id": customer.id, "timestamp": LAST_DAY, "items": [line(sugar, 3)]},
+        {"customer_id": customer.id, "timestamp": datetime(2026, 1, 1, 0, 1), "items": [line(tea, 1)]},
+    ])
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_lines_stream_in_time_order_with_joined_columns(session):
+    lines = list(iter_sale_lines(session, batch_size=1))
+
+    assert [(l["timestamp"][:10], l["item_name"]) for l in lines] == [
+        ("2025-01-01", "Tea"), ("2025-06-15", "Tea"), ("2025-06-15", "Sugar"),
+        ("2025-12-31", "Sugar"), ("2026-01-01", "Tea"),
+    ]
+    first = lines[1]
+    assert (first["customer_name"], first["barcode"], first["quantity"]) == ("Accountant", "EXP-1", 2)
+    assert (first["sale_total"], first["line_total"]) == (350, 200)
+    assert first["timestamp"] == "2025-06-15T12:00:00+00:00"
+
+
+def test_date_bounds_cover_whole_days(session):
+    year = list(iter_sale_lines(session, "2025-01-01", date(2025, 12, 31)))
+    assert len(year) == 4
+
+    window = list(iter_sale_lines(session, datetime(2025, 6, 1), datetime(2025, 12, 31, 23, 0)))
+    assert [l["item_name"] for l in window] == ["Tea", "Sugar"]
+
+
+def test_export_csv_gzip(session, tmp_path):
+    path = tmp_path / "sales-2025.csv.gz"
+
+    count = export_sales(session, path, start_date="2025-01-01", end_date="2025-12-31")
+
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert count == len(rows) == 4
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert rows[-1]["item_name"] == "Sugar" and rows[-1]["quantity"] == "3"
+
+
+def test_export_jsonl(session, tmp_path):
+    path = tmp_path / "sales.jsonl"
+
+    count = export_sales(session, path)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert count == len(lines) == 5
+    assert lines[0]["sale_id"] and lines[0]["price_at_sale"] == 100
+
+
+def test_export_rejects_unknown_format(session, tmp_path):
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        export_sales(session, tmp_path / "sales.xlsx")
+    with pytest.raises(ValueError, match="Invalid date format"):
+        list(iter_sale_lines(session, "last year"))
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.generate import generate_dataset, zipf_cum_weights
+from app.models.daily_sales import DailySales
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.services.stock_ledger_service import stock_levels_as_of
+
+SIZES = dict(customers=50, products=40, categories=4, sales=300, days=30)
+
+
+def _fingerprint(url):
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        result = (
+            conn.execute(select(func.count(), func.sum(Sale.total_amount), func.max(Sale.timestamp))).one(),
+            conn.execute(select(func.count(), func.sum(SaleItem.quantity)).select_from(SaleItem)).one(),
+            conn.execute(select(func.sum(DailySales.sale_count))).scalar(),
+        )
+    engine.dispose()
+    return result
+
+
+def test_same_seed_gives_same_dataset(tmp_path):
+    first = f"sqlite:///{tmp_path / 'a.db'}"
+    second = f"sqlite:///{tmp_path / 'b.db'}"
+
+    counts = generate_dataset(first, seed=3, **SIZES)
+    generate_dataset(second, seed=3, **SIZES)
+
+    assert counts["sales"] == 300 and counts["customers"] == 50
+    assert _fingerprint(first) == _fingerprint(second)
+    assert _fingerprint(first)[2] == 300
+
+
+def test_refuses_non_empty_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    generate_dataset(url, **SIZES)
+
+    with pytest.raises(ValueError, match="not empty"):
+        generate_dataset(url, **SIZES)
+
+
+def test_stock_snapshot_is_the_ledger_baseline(tmp_path):
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    generate_dataset(url, end_date=date(2025, 12, 31), **SIZES)
+
+    engine = create_engine(url)
+    with Session(engine) as db:
+        stock = dict(db.execute(select(Product.id, Product.stock)).all())
+        assert stock_levels_as_of(db, date(2025, 12, 15)) == stock
+        assert stock_levels_as_of(db, "2026-01-01") == stock
+    engine.dispose()
+
+
+def test_zipf_weights_favour_low_ranks():
+    weights = zipf_cum_weights(1000, 1.1)
+
+    assert len(weights) == 1000
+    assert weights[9] / weights[-1] > 0.4
@@ -0,0 +1,96 @@
+import pytest
+import uuid
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.instrumentation import QueryInstrumentation
+from app.models import Base
+from app.models.customer import Customer
+from app.services.customer_service import get_customer_by_id
+from app.tests import TEST_DATABASE_URL
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    db.add_all([Customer(name=f"Customer {i}", email=f"{uuid.uuid4()}@example.com") for i in range(8)])
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def stats():
+    instrumentation = QueryInstrumentation(n_plus_one_threshold=5)
+    instrumentation.attach(engine)
+    yield instrumentation
+    instrumentation.detach(engine)
+
+
+def _entry(stats, name):
+    return next(e for e in stats.report() if e["operation"] == name)
+
+
+def test_statements_are_attributed_to_the_calling_service(stats):
+    db = TestSessionLocal()
+    try:
+        ids = [c.id for c in db.query(Customer).all()]
+        for customer_id in ids[:2]:
+            db.expunge_all()
+            get_customer_by_id(db, customer_id)
+    finally:
+        db.close()
+
+    entry = _entry(stats, "customer_service.get_customer_by_id")
+    assert entry["statements"] == 2
+    assert entry["total_ms"] >= 0
+    assert entry["suspected_n_plus_one"] == {}
+    assert _entry(stats, "other")["statements"] >= 1
+
+
+def test_repeated_statements_in_one_unit_of_work_are_flagged(stats):
+    db = TestSessionLocal()
+    try:
+        ids = [c.id for c in db.query(Customer).all()]
+        with stats.operation("list_customers_naively"):
+            for customer_id in ids:
+                db.expunge_all()
+                get_customer_by_id(db, customer_id)
+    finally:
+        db.close()
+
+    entry = _entry(stats, "list_customers_naively")
+    assert entry["statements"] == len(ids)
+    [(statement, count)] = entry["suspected_n_plus_one"].items()
+    assert "FROM customers" in statement
+    assert count == len(ids)
+    assert "Suspected N+1" in stats.format_report()
+
+
+def test_rows_count_affected_rows_and_reset(stats):
+    with engine.begin() as conn:
+        with stats.operation("bulk_loyalty"):
+            conn.exec_driver_sql("UPDATE customers SET loyalty_points = loyalty_points + 1")
+
+    assert _entry(stats, "bulk_loyalty")["rows"] == 8
+    stats.reset()
+    assert stats.report() == []
+
+
+def test_failed_statements_leave_nothing_on_the_connection(stats):
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        with stats.operation("after"):
+            conn.execute(text("SELECT 1"))
+        leftover = conn.info.get("pos_sql_started")
+
+    assert not leftover
+    assert _entry(stats, "after")["statements"] == 1
@@ -5,8 +5,8 @@ from sqlalchemy.orm import sessionmaker
 from app.models import Base
 from app.models.product import Product
 from app.models.category import Category 
+from app.tests import TEST_DATABASE_URL
 
-TEST_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(TEST_DATABASE_URL)
 TestSessionLocal = sessionmaker(bind=engine)
 
@@ -0,0 +1,164 @@
+import io
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.services.catalog_cache import catalog_cache
+from app.services.import_service import import_products
+from app.services.inventory_service import create_product
+from app.tests import TEST_DATABASE_URL, StatementCounter
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    catalog_cache.clear()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _csv(rows):
+    header = "barcode,name,brand,purchase_price,selling_price,category,unit\n"
+    return io.StringIO(header + "".join(",".join(str(v) for v in row) + "\n" for row in rows))
+
+
+def _by_barcode(session, barcode):
+    return session.query(Product).filter_by(barcode=barcode).one()
+
+
+def test_csv_import_inserts_updates_and_creates_categories(session):
+    tag = uuid.uuid4().hex[:8]
+    existing_category = Category(name=f"Dairy {tag}")
+    session.add(existing_category)
+    session.commit()
+    existing = create_product(session, "Old milk", "Brookside", 40, 55, 7, f"IMP-{tag}-0",
+                              existing_category.id, "pcs")
+
+    source = _csv([
+        (f"IMP-{tag}-0", "Fresh milk 500ml", "Brookside", 42, 58, "", ""),
+        (f"IMP-{tag}-1", "Bread", "Supaloaf", 50, 65, f"Bakery {tag}", "pcs"),
+        (f"IMP-{tag}-2", "Yoghurt", "Daima", 60, 80, f"Dairy {tag}", "cup"),
+    ])
+    result = import_products(session, source, "csv")
+
+    assert (result["inserted"], result["updated"], result["rejected"]) == (2, 1, 0)
+    assert result["categories_created"] == 1
+    updated = session.get(Product, existing.id)
+    assert (updated.name, updated.purchase_price, updated.selling_price) == ("Fresh milk 500ml", 42, 58)
+    # Blank optional columns and stock are left alone on update.
+    assert (updated.category_id, updated.unit, updated.stock) == (existing_category.id, "pcs", 7)
+    bread = _by_barcode(session, f"IMP-{tag}-1")
+    assert bread.category.name == f"Bakery {tag}" and bread.stock == 0
+    assert _by_barcode(session, f"IMP-{tag}-2").category_id == existing_category.id
+
+
+def test_rejects_are_reported_with_line_numbers(session):
+    tag = uuid.uuid4().hex[:8]
+    source = _csv([
+        (f"REJ-{tag}-1", "Good", "Brand", 1, 2, "", ""),
+        ("", "No barcode", "Brand", 1, 2, "", ""),
+        (f"REJ-{tag}-3", "Bad price", "Brand", "abc", 2, "", ""),
+        (f"REJ-{tag}-4", "Negative", "Brand", 1, -2, "", ""),
+    ])
+    seen = []
+
+    result = import_products(session, source, "csv", on_reject=lambda line, error, row: seen.append(line))
+
+    assert result["inserted"] == 1 and result["rejected"] == 3
+    assert [r["line"] for r in result["rejects"]] == seen == [3, 4, 5]
+    assert result["rejects"][0]["error"] == "missing barcode"
+
+
+def test_jsonl_import_and_bad_lines(session):
+    tag = uuid.uuid4().hex[:8]
+    lines = [
+        json.dumps({"barcode": f"JSN-{tag}", "name": "Tea", "brand": "Ketepa",
+                    "purchase_price": 100, "selling_price": 130}),
+        "",
+        "{not json",
+        "[1, 2]",
+    ]
+
+    result = import_products(session, io.StringIO("\n".join(lines)), "jsonl")
+
+    assert result["inserted"] == 1
+    assert [r["line"] for r in result["rejects"]] == [3, 4]
+    assert _by_barcode(session, f"JSN-{tag}").selling_price == 130
+
+
+def test_import_runs_a_fixed_number_of_statements_per_chunk(session):
+    tag = uuid.uuid4().hex[:8]
+    rows = [(f"CHK-{tag}-{i}", f"Item {i}", "Brand", 1, 2, f"Chunked {tag}", "pcs") for i in range(250)]
+
+    with StatementCounter(engine) as counter:
+        result = import_products(session, _csv(rows), "csv", chunk_size=100)
+
+    assert result["inserted"] == 250 and result["categories_created"] == 1
+    # Category preload, then per chunk: existing-barcode count, upsert, generation bump,
+    # plus a category insert and re-select in the first chunk.
+    assert counter.count == 1 + 3 * 3 + 2
+
+
+def test_default_chunk_counts_existing_barcodes_in_pieces(session):
+    tag = uuid.uuid4().hex[:8]
+    rows = [(f"BIG-{tag}-{i}", f"Item {i}", "Brand", 1, 2, "", "") for i in range(700)]
+    import_products(session, _csv(rows[:600]), "csv")
+
+    with StatementCounter(engine) as counter:
+        result = import_products(session, _csv(rows), "csv")
+
+    assert (result["inserted"], result["updated"]) == (100, 600)
+    # The barcode lookup for the 700-row chunk is split into two IN (...) queries.
+    assert sum("count(*)" in statement for statement in counter.statements) == 2
+
+
+def test_duplicate_barcode_in_one_file_keeps_the_last_row(session):
+    tag = uuid.uuid4().hex[:8]
+    source = _csv([
+        (f"DUP-{tag}", "First", "Brand", 1, 2, "", ""),
+        (f"DUP-{tag}", "Second", "Brand", 1, 3, "", ""),
+    ])
+
+    result = import_products(session, source, "csv")
+
+    assert result["inserted"] == 1
+    assert _by_barcode(session, f"DUP-{tag}").name == "Second"
+
+
+def test_import_refreshes_the_catalog_cache(session):
+    tag = uuid.uuid4().hex[:8]
+    category = Category(name=f"Cache {tag}")
+    session.add(category)
+    session.commit()
+    product = create_product(session, "Cached", "Brand", 10, 15, 1, f"CCH-{tag}", category.id, "pcs")
+    assert catalog_cache.get(session, product.id).selling_price == 15
+
+    import_products(session, _csv([(f"CCH-{tag}", "Cached", "Brand", 10, 17, "", "")]), "csv")
+
+    assert catalog_cache.get(session, product.id).selling_price == 17
+
+
+def test_unknown_format_is_rejected(session, tmp_path):
+    path = tmp_path / "products.xlsx"
+    path.write_text("")
+    with pytest.raises(ValueError, match="Unsupported import format"):
+        import_products(session, path)
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.product import Product
+from app.services.inventory_service import update_category
+from app.services.report_cache import report_cache
+from app.services.reporting_service import (
+    revenue_by_category,
+    top_products_by_revenue,
+    top_products_by_units,
+)
+from app.services.sales_service import create_sales_bulk
+from app.tests import TEST_DATABASE_URL
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+LAST_WEEK = datetime(2025, 3, 1, 12, 0)
+THIS_WEEK = datetime(2025, 3, 10, 12, 0)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    drinks = Category(name="Drinks")
+    food = Category(name="Food")
+    customer = Customer(name="Buyer", email="buyer@example.com")
+    products = {
+        "juice": Product(name="Juice", brand="A", purchase_price=1, selling_price=100, stock=100,
+                         barcode="R-1", category=drinks, unit="ml"),
+        "soda": Product(name="Soda", brand="B", purchase_price=1, selling_price=50, stock=100,
+                        barcode="R-2", category=drinks, unit="ml"),
+        "bread": Product(name="Bread", brand="C", purchase_price=1, selling_price=200, stock=100,
+                         barcode="R-3", category=food, unit="pcs"),
+        "gum": Product(name="Gum", brand="D", purchase_price=1, selling_price=10, stock=100,
+                       barcode="R-4", category=None, unit="pcs"),
+    }
+    db.add_all([customer, *products.values()])
+    db.commit()
+
+    def line(key, quantity):
+        p = products[key]
+        return {"product_id": p.id, "name": p.name, "quantity": quantity, "price_at_sale": p.selling_price}
+
+    create_sales_bulk(db, [
+        # This week: juice 200 (2 units), bread 200 (1), soda 200 (4), gum 10 (1).
+        {"customer_id": customer.id, "timestamp": THIS_WEEK, "items": [line("juice", 2), line("bread", 1)]},
+        {"customer_id": customer.id, "timestamp": THIS_WEEK, "items": [line("soda", 4), line("gum", 1)]},
+        # Last week: bread 2000 (10 units).
+        {"customer_id": customer.id, "timestamp": LAST_WEEK, "items": [line("bread", 10)]},
+    ])
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    report_cache.clear()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _window():
+    return THIS_WEEK - timedelta(days=1), THIS_WEEK + timedelta(days=1)
+
+
+def test_top_products_by_revenue_over_all_time(session):
+    rows = top_products_by_revenue(session, limit=2)
+
+    assert [(r["rank"], r["product_name"], r["revenue"]) for r in rows] == [
+        (1, "Bread", 2200), (2, "Juice", 200), (2, "Soda", 200),
+    ]
+    assert rows[0]["units"] == 11 and rows[0]["category_name"] == "Food"
+
+
+def test_ties_on_the_limit_are_all_returned(session):
+    rows = top_products_by_revenue(session, 1, *_window())
+
+    assert {r["product_name"] for r in rows} == {"Juice", "Soda", "Bread"}
+    assert {r["rank"] for r in rows} == {1}
+
+
+def test_top_products_by_units_and_unlimited(session):
+    rows = top_products_by_units(session, None, *_window())
+
+    assert [(r["rank"], r["product_name"], r["units"]) for r in rows] == [
+        (1, "Soda", 4), (2, "Juice", 2), (3, "Bread", 1), (3, "Gum", 1),
+    ]
+
+
+def test_revenue_by_category_with_share(session):
+    rows = revenue_by_category(session, *_window())
+
+    assert [(r["category_name"], r["revenue"], r["units"]) for r in rows] == [
+        ("Drinks", 400, 6), ("Food", 200, 1), ("Uncategorized", 10, 1),
+    ]
+    assert rows[0]["share"] == pytest.approx(400 / 610)
+    assert sum(r["share"] for r in rows) == pytest.approx(1)
+    assert rows[2]["category_id"] is None
+
+
+def test_category_rename_shows_up_in_cached_report(session):
+    assert revenue_by_category(session)[0]["category_name"] == "Food"
+    food_id = session.query(Category.id).filter_by(name="Food").scalar()
+
+    update_category(session, food_id, name="Bakery")
+
+    assert revenue_by_category(session)[0]["category_name"] == "Bakery"
+    assert top_products_by_revenue(session, 1)[0]["category_name"] == "Bakery"
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.fts import DROP_PRODUCT_SEARCH_DDL, has_product_search, install_product_search
+from app.models import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.services.inventory_service import (
+    delete_product,
+    search_products,
+    search_products_by_name,
+    update_category,
+)
+from app.tests import TEST_DATABASE_URL, sqlite_only
+
+pytestmark = sqlite_only
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    beverages = Category(name="Beverages")
+    snacks = Category(name="Snacks")
+    db.add_all([
+        Product(name="Coca-Cola 500ml", brand="Coca-Cola", purchase_price=50, selling_price=70,
+                stock=10, barcode="5449000000996", category=beverages, unit="ml"),
+        Product(name="Coke Zero", brand="Coca-Cola", purchase_price=50, selling_price=70,
+                stock=10, barcode="5449000131805", category=beverages, unit="ml"),
+        Product(name="Chocolate Cookies", brand="Oreo", purchase_price=80, selling_price=100,
+                stock=10, barcode="7622210449283", category=snacks, unit="g"),
+    ])
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _names(products):
+    return [p.name for p in products]
+
+
+def test_prefix_search_ranks_name_matches_first(session):
+    results = search_products(session, "coc")
+
+    assert set(_names(results)) == {"Coca-Cola 500ml", "Coke Zero"}
+    assert _names(results)[0] == "Coca-Cola 500ml"
+
+
+def test_all_words_must_match(session):
+    assert _names(search_products(session, "coca 500")) == ["Coca-Cola 500ml"]
+    assert search_products(session, "coca cookies") == []
+
+
+def test_search_by_barcode_prefix_and_category(session):
+    assert _names(search_products(session, "762221")) == ["Chocolate Cookies"]
+    assert _names(search_products(session, "snack")) == ["Chocolate Cookies"]
+
+
+def test_limit_and_blank_queries(session):
+    assert len(search_products(session, "coca", limit=1)) == 1
+    assert search_products(session, "  -- ") == []
+    assert len(search_products_by_name(session, "coca")) == 2
+
+
+def test_index_follows_category_renames_and_deletes(session):
+    snacks = session.query(Category).filter_by(name="Snacks").one()
+    update_category(session, snacks.id, name="Biscuits")
+
+    assert _names(search_products(session, "biscuit")) == ["Chocolate Cookies"]
+    assert search_products(session, "snack") == []
+
+    cookies = session.query(Product).filter_by(name="Chocolate Cookies").one()
+    delete_product(session, cookies.id)
+    assert search_products(session, "biscuit") == []
+
+
+def test_search_index_presence_is_rechecked_after_install_and_drop(tmp_path):
+    file_engine = create_engine(f"sqlite:///{tmp_path / 'fts.db'}")
+    Base.metadata.create_all(bind=file_engine)
+    with file_engine.begin() as conn:
+        for statement in DROP_PRODUCT_SEARCH_DDL:
+            conn.exec_driver_sql(statement)
+    assert not has_product_search(file_engine)
+
+    with file_engine.begin() as conn:
+        install_product_search(conn)
+    assert has_product_search(file_engine)
+
+    Base.metadata.drop_all(bind=file_engine)
+    assert not has_product_search(file_engine)
+    file_engine.dispose()
@@ -0,0 +1,157 @@
+"""
+Checks, via SQLite EXPLAIN QUERY PLAN, that the statements issued by the
+service functions are served by the intended indexes rather than table scans.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.product import Product
+from app.services import reporting_service
+from app.services.inventory_service import delete_product, get_products_by_category
+from app.services.sales_service import (
+    create_sale,
+    get_all_sales_keyset,
+    get_sale_by_id,
+    get_sales_by_customer_keyset,
+    get_sales_summary_by_customer,
+)
+from app.tests import TEST_DATABASE_URL, sqlite_only
+
+pytestmark = sqlite_only
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    category = Category(name="Plans")
+    customer = Customer(name="Plan Customer", email="plans@example.com")
+    products = [
+        Product(name=f"Plan Product {i}", brand="Plan", purchase_price=1, selling_price=2,
+                stock=100, barcode=f"PLAN-{i}", category=category, unit="pcs")
+        for i in range(3)
+    ]
+    db.add_all([category, customer, *products])
+    db.commit()
+    for product in products[:2]:
+        create_sale(db, customer.id, [
+            {"product_id": product.id, "name": product.name, "quantity": 1, "price_at_sale": 2},
+        ])
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _plans(fn, *args, **kwargs):
+    """Runs fn and returns {statement: query plan text} for the SELECTs it issued."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn(*args, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = {}
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            plans[statement] = " | ".join(row[-1] for row in rows)
+    return plans
+
+
+def _plan_for(plans, fragment):
+    matches = [plan for statement, plan in plans.items() if fragment in statement]
+    assert matches, f"no statement containing {fragment!r} in {list(plans)}"
+    return matches[0]
+
+
+def test_sale_items_selectin_load_uses_sale_id_index(session):
+    sale_id = get_sales_by_customer_keyset(session, 1)[0][0].id
+    session.expunge_all()
+
+    plans = _plans(get_sale_by_id, session, sale_id)
+
+    assert "idx_sale_items_sale_product" in _plan_for(plans, "FROM sale_items")
+
+
+def test_products_by_category_uses_category_index(session):
+    category_id = session.query(Category.id).filter_by(name="Plans").scalar()
+
+    plans = _plans(get_products_by_category, session, category_id)
+
+    assert "idx_products_category_id" in _plan_for(plans, "FROM products")
+
+
+def test_product_delete_checks_sale_items_by_index(session):
+    unsold = session.query(Product).filter_by(barcode="PLAN-2").one()
+
+    plans = _plans(delete_product, session, unsold.id)
+
+    assert "idx_sale_items_product_sale" in _plan_for(plans, "FROM sale_items")
+
+
+def test_product_name_lookup_uses_name_index(session):
+    plans = _plans(lambda: session.query(Product).filter_by(name="Plan Product 1").first())
+
+    assert "idx_products_name" in _plan_for(plans, "FROM products")
+
+
+def test_customer_history_uses_customer_timestamp_index(session):
+    plans = _plans(get_sales_by_customer_keyset, session, 1)
+
+    assert "idx_sales_customer_timestamp_id_amount" in _plan_for(plans, "FROM sales")
+
+
+def test_all_sales_keyset_uses_timestamp_index(session):
+    plans = _plans(get_all_sales_keyset, session)
+
+    plan = _plan_for(plans, "FROM sales")
+    assert "idx_sales_timestamp_id_customer_amount" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_date_range_totals_read_sales_from_covering_index(session):
+    end = datetime.now()
+    start = end - timedelta(days=7)
+
+    for report in (
+        get_sales_summary_by_customer,
+        reporting_service.total_sales_per_customer,
+        reporting_service.top_customers_by_sales,
+        reporting_service.customer_purchase_frequency,
+    ):
+        plan = _plan_for(_plans(report, session, start_date=start, end_date=end), "FROM customers")
+        assert "USING COVERING INDEX idx_sales_" in plan, (report.__name__, plan)
+
+
+def test_product_reports_read_sale_items_from_covering_indexes(session):
+    end = datetime.now()
+    start = end - timedelta(days=7)
+
+    for args in ((start, end), (None, None)):
+        plan = _plan_for(_plans(reporting_service.top_products_by_revenue, session, 10, *args), "FROM sale_items")
+        assert "sale_items USING COVERING INDEX idx_sale_items_" in plan, plan
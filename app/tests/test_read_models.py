@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.product import Product
+from app.services.read_models import (
+    CustomerRow,
+    ProductRow,
+    SaleHeader,
+    list_customer_rows,
+    list_product_rows,
+    list_sale_headers,
+)
+from app.services.sales_service import create_sales_bulk
+from app.tests import TEST_DATABASE_URL, StatementCounter
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    snacks = Category(name="Snacks")
+    alice = Customer(name="Alice", email="alice@example.com", customer_type="individual")
+    bob = Customer(name="Bob", email="bob@example.com", customer_type="business", company_name="Bob Ltd")
+    gone = Customer(name="Gone", email="gone@example.com", is_deleted=True)
+    products = [
+        Product(name=f"Crisps {i}", brand="Tropical", purchase_price=20, selling_price=30, stock=50,
+                barcode=f"RM-{i}", category=snacks if i % 2 else None, unit="pcs")
+        for i in range(20)
+    ]
+    db.add_all([alice, bob, gone, *products])
+    db.commit()
+
+    def line(product, quantity):
+        return {"product_id": product.id, "name": product.name, "quantity": quantity,
+                "price_at_sale": product.selling_price}
+
+    create_sales_bulk(db, [
+        {"customer_id": alice.id, "timestamp": datetime(2025, 5, 1, 10), "items": [line(products[0], 1)]},
+        {"customer_id": bob.id, "timestamp": datetime(2025, 5, 2, 10),
+         "items": [line(products[1], 2), line(products[2], 1)]},
+    ])
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_product_rows_are_one_query_and_untracked(session):
+    with StatementCounter(engine) as counter:
+        rows = list_product_rows(session)
+        dicts = [row.to_dict() for row in rows]
+
+    assert counter.count == 1
+    assert len(rows) == 20 and all(isinstance(row, ProductRow) for row in rows)
+    assert not hasattr(rows[0], "__dict__")
+    assert len(session.identity_map) == 0
+    assert [d["category"] for d in dicts[:2]] == [None, "Snacks"]
+
+
+def test_product_row_to_dict_matches_the_entity(session):
+    row = list_product_rows(session)[1]
+    assert row.to_dict() == session.get(Product, row.id).to_dict()
+
+
+def test_product_rows_filter_by_category(session):
+    snacks = session.query(Category).filter_by(name="Snacks").one()
+    rows = list_product_rows(session, category_id=snacks.id)
+    assert len(rows) == 10 and {row.category_name for row in rows} == {"Snacks"}
+
+
+def test_customer_rows_skip_soft_deleted(session):
+    rows = list_customer_rows(session)
+    assert [row.name for row in rows] == ["Alice", "Bob"]
+    assert isinstance(rows[1], CustomerRow) and rows[1].company_name == "Bob Ltd"
+
+
+def test_sale_headers_newest_first_with_item_counts(session):
+    with StatementCounter(engine) as counter:
+        headers = list_sale_headers(session)
+
+    assert counter.count == 1
+    assert all(isinstance(h, SaleHeader) for h in headers)
+    assert [(h.customer_name, h.item_count, h.total_amount) for h in headers] == [("Bob", 2, 90), ("Alice", 1, 30)]
+    assert list_sale_headers(session, page=2, per_page=1)[0].customer_name == "Alice"
+    with pytest.raises(ValueError):
+        list_sale_headers(session, page=0)
@@ -0,0 +1,107 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.services.catalog_cache import catalog_cache
+from app.services.inventory_service import create_product, receive_stock_bulk
+from app.services.stock_ledger_service import get_stock_movements
+from app.tests import TEST_DATABASE_URL, StatementCounter
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    catalog_cache.clear()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def products(session):
+    category = Category(name=f"Delivery {uuid.uuid4()}")
+    session.add(category)
+    session.commit()
+    return [
+        create_product(session, f"Delivered {i}", "Supplier", 10, 15, 2, f"DLV-{uuid.uuid4()}", category.id, "pcs")
+        for i in range(3)
+    ]
+
+
+def test_delivery_is_booked_with_set_based_statements(session, products):
+    first, second, third = products
+    lines = [
+        {"product_id": first.id, "quantity": 5, "purchase_price": 11, "selling_price": 16},
+        {"barcode": second.barcode, "quantity": 3},
+        {"barcode": first.barcode, "quantity": 1, "purchase_price": 12},
+    ] + [{"product_id": third.id, "quantity": 1} for _ in range(50)]
+
+    with StatementCounter(engine) as counter:
+        result = receive_stock_bulk(session, lines, note="DN-001")
+
+    # Product lookup, stock update, ledger insert, catalog generation bump.
+    assert counter.count == 4
+    assert result["applied"] == 53 and result["units"] == 59 and result["errors"] == []
+    assert result["product_ids"] == sorted(p.id for p in products)
+    assert (first.stock, first.purchase_price, first.selling_price) == (8, 12, 16)
+    assert (second.stock, second.purchase_price, second.selling_price) == (5, 10, 15)
+    assert third.stock == 52
+    receipt = get_stock_movements(session, first.id)[-1]
+    assert (receipt.movement_type, receipt.quantity, receipt.note) == ("receipt", 6, "DN-001")
+
+
+def test_bad_lines_are_reported_and_skipped(session, products):
+    first = products[0]
+    lines = [
+        {"barcode": "NO-SUCH-BARCODE", "quantity": 1},
+        {"product_id": first.id, "quantity": 4},
+        {"product_id": first.id, "quantity": 0},
+        {"product_id": 987654, "quantity": 1},
+        {"quantity": 1},
+        {"product_id": first.id, "quantity": 1, "selling_price": -5},
+    ]
+
+    result = receive_stock_bulk(session, lines)
+
+    assert result["applied"] == 1 and result["units"] == 4
+    assert [e["line"] for e in result["errors"]] == [0, 2, 3, 4, 5]
+    assert "not found" in result["errors"][0]["error"]
+    assert first.stock == 6
+
+
+def test_all_or_nothing_applies_nothing_on_error(session, products):
+    first = products[0]
+
+    result = receive_stock_bulk(
+        session, [{"product_id": first.id, "quantity": 4}, {"barcode": "MISSING", "quantity": 1}],
+        all_or_nothing=True,
+    )
+
+    assert result["applied"] == 0 and len(result["errors"]) == 1
+    assert session.get(Product, first.id).stock == 2
+
+
+def test_price_changes_reach_the_catalog_cache(session, products):
+    first = products[0]
+    assert catalog_cache.get(session, first.id).selling_price == 15
+
+    receive_stock_bulk(session, [{"product_id": first.id, "quantity": 1, "selling_price": 18}])
+
+    assert catalog_cache.get(session, first.id).selling_price == 18
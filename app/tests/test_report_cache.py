@@ -0,0 +1,142 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.services.customer_service import create_customer, update_customer
+from app.services.report_cache import ReportCache, current_generation, report_cache
+from app.services.reporting_service import (
+    customer_purchase_frequency,
+    top_customers_by_sales,
+    total_sales_per_customer,
+)
+from app.services.sales_service import create_sale
+from app.tests import TEST_DATABASE_URL, StatementCounter
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    db.add(Product(name="Report Soda", brand="Fizz", purchase_price=40, selling_price=50,
+                   stock=1000, barcode="REPORT-1", category=Category(name="Reports"), unit="ml"))
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    report_cache.clear()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def customer(session):
+    return create_customer(session, "Report Customer", f"{uuid.uuid4()}@example.com")
+
+
+def _sell(session, customer_id, quantity=1):
+    product = session.query(Product).filter_by(barcode="REPORT-1").one()
+    create_sale(session, customer_id, [
+        {"product_id": product.id, "name": product.name, "quantity": quantity, "price_at_sale": 50},
+    ])
+
+
+def _totals(rows, customer_id):
+    return next(r["total_sales"] for r in rows if r["customer_id"] == customer_id)
+
+
+def test_repeat_report_costs_one_generation_read(session, customer):
+    customer_id = customer.id
+    _sell(session, customer_id)
+    first = total_sales_per_customer(session)
+
+    with StatementCounter(engine) as counter:
+        second = total_sales_per_customer(session)
+
+    assert counter.count == 1
+    assert second == first
+    assert _totals(second, customer_id) == 50
+
+
+def test_sale_writes_invalidate_reports(session, customer):
+    customer_id = customer.id
+    _sell(session, customer_id)
+    before = current_generation(session)
+    assert _totals(total_sales_per_customer(session), customer_id) == 50
+
+    _sell(session, customer_id, quantity=2)
+
+    assert current_generation(session) == before + 1
+    assert _totals(total_sales_per_customer(session), customer_id) == 150
+    assert top_customers_by_sales(session, limit=1)[0]["customer_id"] == customer_id
+
+
+def test_customer_rename_invalidates_reports(session, customer):
+    customer_id = customer.id
+    _sell(session, customer_id)
+    customer_purchase_frequency(session)
+
+    update_customer(session, customer_id, name="Renamed Customer")
+
+    rows = customer_purchase_frequency(session)
+    assert next(r for r in rows if r["customer_id"] == customer_id)["customer_name"] == "Renamed Customer"
+
+
+def test_keys_include_range_and_limit(session, customer):
+    _sell(session, customer.id)
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+
+    assert len(top_customers_by_sales(session, limit=1)) == 1
+    assert top_customers_by_sales(session, limit=1, start_date=future) == []
+    # Naive and aware spellings of the same instant share an entry.
+    naive = future.replace(tzinfo=None)
+    misses = report_cache.misses
+    assert top_customers_by_sales(session, limit=1, start_date=naive.isoformat()) == []
+    assert report_cache.misses == misses
+
+
+def test_callers_cannot_mutate_cached_rows(session, customer):
+    _sell(session, customer.id)
+    rows = total_sales_per_customer(session)
+    rows[0]["total_sales"] = -1
+
+    assert total_sales_per_customer(session)[0]["total_sales"] != -1
+
+
+def test_ttl_and_size_bound(session):
+    now = [0.0]
+    cache = ReportCache(max_size=2, ttl=10, clock=lambda: now[0])
+    calls = []
+
+    def compute(name):
+        return lambda: calls.append(name) or [{"report": name}]
+
+    cache.get_or_compute(session, ("a",), compute("a"))
+    cache.get_or_compute(session, ("a",), compute("a"))
+    assert calls == ["a"]
+
+    now[0] = 11
+    cache.get_or_compute(session, ("a",), compute("a"))
+    assert calls == ["a", "a"]
+
+    cache.get_or_compute(session, ("b",), compute("b"))
+    cache.get_or_compute(session, ("c",), compute("c"))
+    assert len(cache) == 2
+    cache.get_or_compute(session, ("a",), compute("a"))
+    assert calls == ["a", "a", "b", "c", "a"]
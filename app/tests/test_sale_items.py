@@ -9,8 +9,8 @@ from app.models.customer import Customer
 from app.models.product import Product
 from app.models.category import Category
 from app.models import Base
+from app.tests import TEST_DATABASE_URL
 
-TEST_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(TEST_DATABASE_URL, echo=False)
 TestSessionLocal = sessionmaker(bind=engine)
 
@@ -8,8 +8,8 @@ from sqlalchemy.orm import sessionmaker
 from app.models import Base
 from app.models.customer import Customer
 from app.models.sale import Sale
+from app.tests import TEST_DATABASE_URL
 
-TEST_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(TEST_DATABASE_URL)
 TestSessionLocal = sessionmaker(bind=engine)
 
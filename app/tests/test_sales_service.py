@@ -0,0 +1,333 @@
+import pytest
+import uuid
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.daily_sales import DailySales
+from app.models.product import Product
+from app.models.sale import Sale
+from app.services.sales_service import (
+    SaleServiceError,
+    create_sale,
+    create_sales_bulk,
+    delete_sale,
+    get_all_sales_keyset,
+    get_sales_by_customer_keyset,
+    get_sales_summary_by_day,
+    list_sales_with_summary,
+    rebuild_daily_sales,
+)
+from app.tests import TEST_DATABASE_URL, StatementCounter, sqlite_only
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def customer(session):
+    customer = Customer(name="Checkout Customer", email=f"checkout-{uuid.uuid4()}@example.com")
+    session.add(customer)
+    session.commit()
+    return customer
+
+
+@pytest.fixture
+def products(session):
+    category = session.query(Category).filter_by(name="Checkout").first()
+    if not category:
+        category = Category(name="Checkout")
+    products = [
+        Product(name="Bread", brand="Supaloaf", purchase_price=50, selling_price=65,
+                stock=5, barcode=str(uuid.uuid4()), category=category, unit="pcs"),
+        Product(name="Sugar", brand="Mumias", purchase_price=150, selling_price=180,
+                stock=1, barcode=str(uuid.uuid4()), category=category, unit="kg"),
+    ]
+    session.add_all(products)
+    session.commit()
+    return products
+
+
+def _line(product, quantity):
+    return {
+        "product_id": product.id,
+        "name": product.name,
+        "quantity": quantity,
+        "price_at_sale": product.selling_price,
+    }
+
+
+def test_create_sale_decrements_stock(session, customer, products):
+    bread, sugar = products
+
+    sale = create_sale(session, customer.id, [_line(bread, 2), _line(sugar, 1)])
+
+    assert sale.total_amount == 2 * 65 + 180
+    assert session.get(Product, bread.id).stock == 3
+    assert session.get(Product, sugar.id).stock == 0
+
+
+def test_create_sale_sums_repeated_lines_for_stock_check(session, customer, products):
+    bread, _ = products
+
+    with pytest.raises(SaleServiceError, match="Insufficient stock"):
+        create_sale(session, customer.id, [_line(bread, 3), _line(bread, 3)])
+
+    assert session.get(Product, bread.id).stock == 5
+
+
+def test_create_sale_shortfall_rolls_back_everything(session, customer, products):
+    bread, sugar = products
+
+    with pytest.raises(SaleServiceError, match=f"product {sugar.id}"):
+        create_sale(session, customer.id, [_line(bread, 1), _line(sugar, 2)])
+
+    assert session.get(Product, bread.id).stock == 5
+    assert session.get(Product, sugar.id).stock == 1
+    assert session.query(Sale).filter_by(customer_id=customer.id).count() == 0
+
+
+def test_create_sale_with_unknown_product_says_not_found(session, customer, products):
+    bread, _ = products
+    ghost = {**_line(bread, 1), "product_id": 999999}
+
+    with pytest.raises(SaleServiceError, match="Product 999999 not found"):
+        create_sale(session, customer.id, [_line(bread, 1), ghost])
+
+    assert session.get(Product, bread.id).stock == 5
+
+
+def test_create_sales_bulk_commits_in_batches(session, customer, products):
+    bread, sugar = products
+    sales = [
+        {"customer_id": customer.id, "items": [_line(bread, 1)]},
+        {"customer_id": customer.id, "items": [_line(bread, 2), _line(sugar, 1)]},
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "timestamp": "2025-01-15T10:30:00+03:00"},
+    ]
+
+    sale_ids = create_sales_bulk(session, sales, batch_size=2)
+
+    assert len(sale_ids) == 3
+    stored = {s.id: s for s in session.query(Sale).filter(Sale.id.in_(sale_ids))}
+    assert stored[sale_ids[1]].total_amount == 2 * 65 + 180
+    assert len(stored[sale_ids[1]].items) == 2
+    assert stored[sale_ids[2]].timestamp == datetime(2025, 1, 15, 7, 30)
+    assert session.get(Product, bread.id).stock == 1
+    assert session.get(Product, sugar.id).stock == 0
+
+
+def test_create_sales_bulk_validates_before_writing(session, customer, products):
+    bread, _ = products
+    sales = [
+        {"customer_id": customer.id, "items": [_line(bread, 1)]},
+        {"customer_id": 999999, "items": [_line(bread, 1)]},
+    ]
+
+    with pytest.raises(SaleServiceError, match="Customers do not exist"):
+        create_sales_bulk(session, sales)
+
+    assert session.query(Sale).filter_by(customer_id=customer.id).count() == 0
+    assert session.get(Product, bread.id).stock == 5
+
+
+def test_create_sales_bulk_checks_timestamps_before_writing(session, customer, products):
+    bread, _ = products
+    sales = [
+        {"customer_id": customer.id, "items": [_line(bread, 1)]},
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "timestamp": "yesterday"},
+    ]
+
+    with pytest.raises(SaleServiceError, match="index 1: Invalid date format"):
+        create_sales_bulk(session, sales, batch_size=1)
+
+    assert session.query(Sale).filter_by(customer_id=customer.id).count() == 0
+    assert session.get(Product, bread.id).stock == 5
+
+
+def test_create_sales_bulk_keeps_earlier_batches_on_shortfall(session, customer, products):
+    bread, sugar = products
+    sales = [
+        {"customer_id": customer.id, "items": [_line(sugar, 1)]},
+        {"customer_id": customer.id, "items": [_line(sugar, 1)]},
+    ]
+
+    with pytest.raises(SaleServiceError, match="1 sales already committed"):
+        create_sales_bulk(session, sales, batch_size=1)
+
+    assert session.query(Sale).filter_by(customer_id=customer.id).count() == 1
+    assert session.get(Product, sugar.id).stock == 0
+
+
+def test_create_sale_retry_with_same_key_returns_original(session, customer, products):
+    bread, sugar = products
+    key = uuid.uuid4().hex
+    with StatementCounter(engine) as counter:
+        first = create_sale(session, customer.id, [_line(bread, 1), _line(sugar, 1)], idempotency_key=key)
+    # Sugar is now out of stock, so the retry also trips the stock check.
+    retry = create_sale(session, customer.id, [_line(bread, 1), _line(sugar, 1)], idempotency_key=key)
+
+    assert not any("idempotency_key = " in statement for statement in counter.statements)
+    assert retry.id == first.id
+    assert session.query(Sale).filter_by(customer_id=customer.id).count() == 1
+    assert session.get(Product, bread.id).stock == 4
+
+
+def test_create_sale_key_is_checked_by_the_unique_index(session, customer, products):
+    bread, _ = products
+    key = uuid.uuid4().hex
+    first = create_sale(session, customer.id, [_line(bread, 1)], idempotency_key=key)
+
+    assert create_sale(session, customer.id, [_line(bread, 1)], idempotency_key=key).id == first.id
+    assert session.get(Product, bread.id).stock == 4
+    with pytest.raises(SaleServiceError, match="already used"):
+        create_sale(session, customer.id, [_line(bread, 2)], idempotency_key=key)
+    with pytest.raises(SaleServiceError, match="idempotency_key"):
+        create_sale(session, customer.id, [_line(bread, 1)], idempotency_key="x" * 65)
+
+
+def test_create_sales_bulk_skips_recorded_keys(session, customer, products):
+    bread, _ = products
+    keys = [uuid.uuid4().hex for _ in range(2)]
+    sales = [
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "idempotency_key": keys[0]},
+        {"customer_id": customer.id, "items": [_line(bread, 1)]},
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "idempotency_key": keys[1]},
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "idempotency_key": keys[0]},
+    ]
+
+    first_ids = create_sales_bulk(session, sales[:1])
+    sale_ids = create_sales_bulk(session, sales, batch_size=2)
+
+    assert sale_ids[0] == sale_ids[3] == first_ids[0]
+    assert len(set(sale_ids)) == 3
+    assert session.query(Sale).filter_by(customer_id=customer.id).count() == 3
+    assert session.get(Product, bread.id).stock == 2
+    assert create_sales_bulk(session, [sales[0], sales[2]]) == [sale_ids[0], sale_ids[2]]
+
+
+def test_keyset_pages_are_stable_and_exhaustive(session, customer):
+    moment = datetime(2025, 3, 1, 12, 0, 0)
+    # Two sales share a timestamp to exercise the id tie-breaker.
+    for offset in (0, 0, 1, 2, 3):
+        session.add(Sale(customer_id=customer.id, total_amount=10,
+                         timestamp=moment + timedelta(minutes=offset)))
+    session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = get_sales_by_customer_keyset(session, customer.id, cursor=cursor, per_page=2)
+        seen.extend(page)
+        if cursor is None:
+            break
+        # A sale recorded mid-scroll must not shift later pages.
+        session.add(Sale(customer_id=customer.id, total_amount=10, timestamp=moment + timedelta(days=1)))
+        session.commit()
+
+    assert len(seen) == 5
+    keys = [(s.timestamp, s.id) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_keyset_rejects_garbage_cursor(session):
+    with pytest.raises(SaleServiceError, match="Invalid page cursor"):
+        get_all_sales_keyset(session, cursor="not-a-cursor")
+
+
+@sqlite_only
+def test_keyset_query_seeks_composite_index(session):
+    plan = session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM sales "
+        "WHERE timestamp <= :t AND (timestamp < :t OR id < :i) "
+        "ORDER BY timestamp DESC, id DESC LIMIT 21"
+    ), {"t": datetime(2025, 1, 1), "i": 1}).fetchall()
+
+    assert "idx_sales_timestamp_id_customer_amount" in " ".join(row[-1] for row in plan)
+
+
+def test_list_sales_with_summary_is_a_single_statement(session, customer, products):
+    bread, sugar = products
+    create_sale(session, customer.id, [_line(bread, 1), _line(sugar, 1)])
+    create_sale(session, customer.id, [_line(bread, 2)])
+    customer_id = customer.id
+
+    with StatementCounter(engine) as counter:
+        rows, cursor = list_sales_with_summary(session, customer_id=customer_id)
+
+    assert counter.count == 1
+    assert cursor is None
+    assert [row.item_count for row in rows] == [1, 2]
+    assert {row.customer_name for row in rows} == {"Checkout Customer"}
+
+
+def _rollup(session):
+    return {
+        row.day: (row.sale_count, round(row.revenue, 2), row.item_units)
+        for row in session.query(DailySales)
+    }
+
+
+def test_daily_rollup_tracks_sale_writes(session, customer, products):
+    bread, sugar = products
+    before = _rollup(session)
+
+    sale = create_sale(session, customer.id, [_line(bread, 2), _line(sugar, 1)])
+    create_sales_bulk(session, [
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "timestamp": "2024-12-31T22:00:00"},
+    ])
+    today = sale.timestamp.date()
+
+    after = _rollup(session)
+    count, revenue, units = before.get(today, (0, 0, 0))
+    assert after[today] == (count + 1, round(revenue + 310, 2), units + 3)
+    assert after[date(2024, 12, 31)][0] == before.get(date(2024, 12, 31), (0,))[0] + 1
+
+    delete_sale(session, sale.id)
+    assert _rollup(session)[today] == before.get(today, (0, 0, 0))
+
+
+def test_rebuild_daily_sales_matches_incremental_rollup(session, customer, products):
+    bread, _ = products
+    create_sale(session, customer.id, [_line(bread, 1)])
+    incremental = {day: row for day, row in _rollup(session).items() if row[0] > 0}
+
+    rebuild_daily_sales(session)
+
+    # The rebuild also picks up sales inserted directly through the ORM by other
+    # tests; every day the write path maintained must come out identical.
+    rebuilt = _rollup(session)
+    for day, row in incremental.items():
+        assert rebuilt[day] == row
+
+
+def test_sales_summary_by_day_reads_whole_days(session, customer, products):
+    bread, _ = products
+    create_sales_bulk(session, [
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "timestamp": "2023-06-01T08:00:00"},
+        {"customer_id": customer.id, "items": [_line(bread, 2)], "timestamp": "2023-06-01T18:00:00"},
+        {"customer_id": customer.id, "items": [_line(bread, 1)], "timestamp": "2023-06-02T09:00:00"},
+    ])
+
+    summary = get_sales_summary_by_day(session, "2023-06-01", "2023-06-01")
+
+    assert summary == [{"date": "2023-06-01", "total": 195, "sale_count": 2, "item_units": 3}]
@@ -0,0 +1,156 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.models.category import Category
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.stock_movement import StockMovement
+from app.services.inventory_service import (
+    create_product,
+    delete_product,
+    purchase_product,
+    update_product,
+)
+from app.services.sales_service import create_sale, create_sales_bulk
+from app.services.stock_ledger_service import (
+    adjust_stock,
+    get_stock_movements,
+    stock_as_of,
+    stock_levels_as_of,
+    take_stock_snapshot,
+)
+from app.tests import TEST_DATABASE_URL, StatementCounter
+
+engine = create_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = TestSessionLocal()
+    db.add_all([Category(name="Ledger"), Customer(name="Ledger Buyer", email="ledger@example.com")])
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def session():
+    db = TestSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def product(session):
+    category_id = session.query(Category.id).filter_by(name="Ledger").scalar()
+    return create_product(session, "Ledger Tea", "Ketepa", 80, 100, 10, str(uuid.uuid4()), category_id, "g")
+
+
+def _customer_id(session):
+    return session.query(Customer.id).filter_by(email="ledger@example.com").scalar()
+
+
+def _sell(session, product, quantity):
+    return create_sale(session, _customer_id(session), [
+        {"product_id": product.id, "name": product.name, "quantity": quantity, "price_at_sale": 100},
+    ])
+
+
+def _ledger(session, product_id):
+    return [(m.movement_type, m.quantity) for m in get_stock_movements(session, product_id)]
+
+
+def test_every_stock_change_is_recorded(session, product):
+    product_id = product.id
+    purchase_product(session, product_id, 80, 100, 5)
+    sale = _sell(session, product, 3)
+    update_product(session, product_id, stock=20)
+    adjust_stock(session, product_id, 2, movement_type="return", note="customer return")
+    adjust_stock(session, product_id, -1, note="breakage")
+
+    assert _ledger(session, product_id) == [
+        ("receipt", 10), ("receipt", 5), ("sale", -3), ("adjustment", 8), ("return", 2), ("adjustment", -1),
+    ]
+    sale_movement = get_stock_movements(session, product_id)[2]
+    assert sale_movement.sale_id == sale.id
+    assert sum(q for _, q in _ledger(session, product_id)) == session.get(Product, product_id).stock == 21
+
+
+def test_adjustments_cannot_go_negative(session, product):
+    with pytest.raises(ValueError, match="below zero"):
+        adjust_stock(session, product.id, -11)
+    with pytest.raises(ValueError, match="Product not found"):
+        adjust_stock(session, 999999, 1)
+    assert session.get(Product, product.id).stock == 10
+
+
+def test_stock_as_of_uses_snapshot_plus_later_movements(session, product):
+    product_id = product.id
+    before_sale = datetime.utcnow()
+    _sell(session, product, 4)
+    take_stock_snapshot(session)
+    after_snapshot = datetime.utcnow()
+    purchase_product(session, product_id, 80, 100, 7)
+
+    assert stock_as_of(session, product_id, before_sale) == 10
+    assert stock_as_of(session, product_id, after_snapshot) == 6
+    assert stock_as_of(session, product_id, datetime.utcnow()) == 13
+    assert stock_as_of(session, product_id, datetime.utcnow().date() - timedelta(days=1)) == 0
+    assert stock_as_of(session, product_id, datetime.utcnow().date().isoformat()) == 13
+
+
+def test_backdated_bulk_sale_after_snapshot_is_replayed(session, product):
+    product_id = product.id
+    take_stock_snapshot(session)
+    create_sales_bulk(session, [{
+        "customer_id": _customer_id(session),
+        "timestamp": datetime.utcnow() - timedelta(hours=2),
+        "items": [{"product_id": product_id, "name": "Ledger Tea", "quantity": 2, "price_at_sale": 100}],
+    }])
+
+    assert session.get(Product, product_id).stock == 8
+    assert stock_as_of(session, product_id, datetime.utcnow()) == 8
+
+
+def test_past_snapshot_captures_stock_as_of_then(session, product):
+    product_id = product.id
+    before_sale = datetime.utcnow()
+    _sell(session, product, 3)
+
+    take_stock_snapshot(session, taken_at=before_sale)
+
+    assert stock_as_of(session, product_id, before_sale) == 10
+    assert stock_as_of(session, product_id, datetime.utcnow()) == 7
+    with pytest.raises(ValueError, match="future"):
+        take_stock_snapshot(session, taken_at=datetime.utcnow() + timedelta(hours=1))
+
+
+def test_stock_levels_as_of_is_one_query_for_the_catalogue(session, product):
+    take_stock_snapshot(session)
+    _sell(session, product, 1)
+    with StatementCounter(engine) as counter:
+        levels = stock_levels_as_of(session, datetime.utcnow())
+
+    assert counter.count == 1
+    assert levels == dict(session.query(Product.id, Product.stock))
+
+
+def test_deleting_unsold_product_drops_its_ledger(session, product):
+    product_id = product.id
+    take_stock_snapshot(session)
+
+    delete_product(session, product_id)
+
+    assert session.query(StockMovement).filter_by(product_id=product_id).count() == 0
+    assert stock_as_of(session, product_id, datetime.utcnow()) is None
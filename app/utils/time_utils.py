@@ -0,0 +1,49 @@
+import os
+from datetime import date, datetime, time, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+STORE_TIMEZONE_NAME = os.environ.get("POS_STORE_TIMEZONE", "UTC")
+
+
+def _load_store_timezone(name):
+    if name.upper() == "UTC":
+        return timezone.utc
+    if ZoneInfo is None:
+        raise RuntimeError(f"POS_STORE_TIMEZONE={name!r} needs Python 3.9+ (zoneinfo)")
+    return ZoneInfo(name)
+
+
+STORE_TIMEZONE = _load_store_timezone(STORE_TIMEZONE_NAME)
+
+
+def to_utc(value):
+    """Naive datetimes are treated as UTC, which is how sale timestamps are stored."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def store_local_date(value):
+    """Returns the store's business day for a timestamp."""
+    return to_utc(value).astimezone(STORE_TIMEZONE).date()
+
+
+def parse_bound(value):
+    """A date range bound: a date or datetime, or an ISO string of either (YYYY-MM-DD is a date)."""
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid date format: {value}")
+    if not isinstance(value, date):
+        raise ValueError(f"Invalid date type: {type(value)}")
+    return value
+
+
+def store_day_start(day):
+    """Start of a store-local day as naive UTC, the way sale timestamps are stored."""
+    return to_utc(datetime.combine(day, time.min, tzinfo=STORE_TIMEZONE)).replace(tzinfo=None)
@@ -0,0 +1,296 @@
+"""
+Benchmarks for the checkout, listing, search and reporting hot paths.
+
+    python -m scripts.benchmark run --scale small --scale medium -o before.json
+    python -m scripts.benchmark compare before.json after.json
+
+Each scale is a dataset built by app.db.generate and cached under --data-dir
+(generated on first use). Every run works on a fresh copy, so writes made by
+the checkout scenario never leak into the next run. Each scenario reports
+latency percentiles, throughput and SQL statements per call.
+"""
+import json
+import platform
+import random
+import shutil
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import click
+import sqlalchemy
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.engine import build_engine
+from app.db.generate import generate_dataset
+from app.db.instrumentation import QueryInstrumentation
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.sale import Sale
+from app.services import reporting_service
+from app.services.customer_service import get_customer_by_name
+from app.services.inventory_service import get_all_products, search_products_by_name
+from app.services.report_cache import report_cache
+from app.services.read_models import list_product_rows, list_sale_headers
+from app.services.sales_service import (
+    create_sale,
+    get_all_sales,
+    get_all_sales_keyset,
+    get_sales_summary_by_day,
+)
+
+SCALES = {
+    "small": dict(customers=2_000, products=500, sales=20_000),
+    "medium": dict(customers=20_000, products=5_000, sales=200_000),
+    "large": dict(customers=200_000, products=20_000, sales=2_000_000),
+    "xl": dict(customers=1_000_000, products=80_000, sales=5_000_000),
+}
+
+DEFAULT_ITERATIONS = 200
+WARMUP_ITERATIONS = 5
+# Sampled ids and names used to build scenario inputs.
+SAMPLE_SIZE = 2_000
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _context(session, rng):
+    """Inputs for the scenarios, sampled deterministically from the dataset."""
+    products = session.execute(
+        select(Product.id, Product.name, Product.selling_price).order_by(Product.id).limit(SAMPLE_SIZE)
+    ).all()
+    customers = session.execute(
+        select(Customer.id, Customer.name).order_by(Customer.id).limit(SAMPLE_SIZE)
+    ).all()
+    last_sale = session.execute(select(func.max(Sale.timestamp))).scalar() or datetime.now()
+
+    product_words = [word for p in products for word in p.name.split() if word.isalpha()]
+    return {
+        "products": products,
+        "customer_ids": [c.id for c in customers],
+        "product_terms": [w[:rng.randint(3, 5)] for w in rng.sample(product_words, min(200, len(product_words)))],
+        "customer_terms": [c.name[:rng.randint(2, 6)] for c in rng.sample(customers, min(200, len(customers)))],
+        "last_day": last_sale,
+    }
+
+
+def _checkout(session, rng, ctx):
+    lines = rng.sample(ctx["products"], min(rng.randint(1, 5), len(ctx["products"])))
+    create_sale(session, rng.choice(ctx["customer_ids"]), [
+        {"product_id": p.id, "name": p.name, "quantity": rng.randint(1, 3), "price_at_sale": p.selling_price}
+        for p in lines
+    ])
+
+
+def _window(ctx, days):
+    end = ctx["last_day"]
+    return end - timedelta(days=days), end
+
+
+SCENARIOS = {
+    "create_sale": _checkout,
+    "get_all_sales[page=1]": lambda s, rng, ctx: get_all_sales(s, page=1),
+    "get_all_sales[page=100]": lambda s, rng, ctx: get_all_sales(s, page=100),
+    "get_all_sales_keyset": lambda s, rng, ctx: get_all_sales_keyset(s),
+    "list_sale_headers[page=1]": lambda s, rng, ctx: list_sale_headers(s, page=1),
+    "get_all_products": lambda s, rng, ctx: get_all_products(s),
+    "list_product_rows": lambda s, rng, ctx: list_product_rows(s),
+    "search_products_by_name": lambda s, rng, ctx: search_products_by_name(s, rng.choice(ctx["product_terms"])),
+    "get_customer_by_name": lambda s, rng, ctx: get_customer_by_name(s, rng.choice(ctx["customer_terms"])),
+    "get_sales_summary_by_day[30d]": lambda s, rng, ctx: get_sales_summary_by_day(s, *_window(ctx, 30)),
+    "get_sales_summary_by_day[365d]": lambda s, rng, ctx: get_sales_summary_by_day(s, *_window(ctx, 365)),
+}
+
+
+def _cold(report):
+    """Clears the report cache first, so every call computes the report."""
+    def run(s, rng, ctx):
+        report_cache.clear()
+        return report(s, rng, ctx)
+    return run
+
+
+# Reports go through report_cache: the _warm variant measures a cache hit (the
+# generation check), the _cold variant the query itself.
+REPORTS = {
+    "total_sales_per_customer[30d]":
+        lambda s, rng, ctx: reporting_service.total_sales_per_customer(s, *_window(ctx, 30)),
+    "top_customers_by_sales[30d]":
+        lambda s, rng, ctx: reporting_service.top_customers_by_sales(s, 10, *_window(ctx, 30)),
+    "customer_purchase_frequency[30d]":
+        lambda s, rng, ctx: reporting_service.customer_purchase_frequency(s, *_window(ctx, 30)),
+}
+
+for name, report in REPORTS.items():
+    SCENARIOS[f"{name}_cold"] = _cold(report)
+    SCENARIOS[f"{name}_warm"] = report
+
+# Whole-table reports are much slower than till operations; fewer runs keep a scale affordable.
+ITERATION_DIVISOR = {
+    **{f"{name}_cold": 10 for name in REPORTS},
+    "get_sales_summary_by_day[365d]": 4,
+    "get_all_products": 10,
+    "list_product_rows": 10,
+}
+
+
+def run_scenario(session_factory, stats, name, fn, ctx, iterations, seed):
+    rng = random.Random(f"{seed}:{name}")
+    for _ in range(WARMUP_ITERATIONS):
+        with session_factory() as session:
+            fn(session, rng, ctx)
+
+    stats.reset()
+    timings = []
+    for _ in range(iterations):
+        with session_factory() as session, stats.operation(name):
+            started = time.perf_counter()
+            fn(session, rng, ctx)
+            timings.append(time.perf_counter() - started)
+
+    sql = next((entry for entry in stats.report() if entry["operation"] == name), None)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(total / iterations * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+        "ops_per_sec": round(iterations / total, 1) if total else None,
+        "statements_per_op": round(sql["statements"] / iterations, 2) if sql else 0,
+        "sql_ms_per_op": round(sql["total_ms"] / iterations, 3) if sql else 0,
+        "suspected_n_plus_one": sql["suspected_n_plus_one"] if sql else {},
+    }
+
+
+def run_benchmarks(url, iterations, seed, scenarios, log):
+    engine = build_engine(url)
+    stats = QueryInstrumentation()
+    stats.attach(engine)
+    session_factory = sessionmaker(bind=engine)
+    try:
+        with session_factory() as session:
+            ctx = _context(session, random.Random(seed))
+        results = {}
+        for name in scenarios:
+            count = max(1, iterations // ITERATION_DIVISOR.get(name, 1))
+            results[name] = run_scenario(session_factory, stats, name, SCENARIOS[name], ctx, count, seed)
+            log(f"  {name:<40} p50 {results[name]['p50_ms']:>9.3f} ms  "
+                f"p95 {results[name]['p95_ms']:>9.3f} ms  {results[name]['statements_per_op']:>6} stmts/op")
+        return results
+    finally:
+        stats.detach(engine)
+        engine.dispose()
+
+
+def _dataset(data_dir, scale, seed, log):
+    """Path to the pristine dataset for `scale`, generating it on first use."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"{scale}-seed{seed}.db"
+    if not path.exists():
+        log(f"Generating {scale} dataset at {path} ...")
+        partial = path.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        generate_dataset(f"sqlite:///{partial}", seed=seed, **SCALES[scale])
+        partial.rename(path)
+    return path
+
+
+def _working_copy(path):
+    copy = path.with_suffix(".run.db")
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{copy}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(path, copy)
+    return copy
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.group()
+def cli():
+    """POS performance benchmarks."""
+
+
+@cli.command()
+@click.option("--scale", "scales", multiple=True, type=click.Choice(list(SCALES)), default=["small"],
+              show_default=True, help="Dataset scale; repeat for several.")
+@click.option("--db", "url", default=None, help="Benchmark this database as-is instead of a generated dataset.")
+@click.option("--scenario", "scenarios", multiple=True, type=click.Choice(list(SCENARIOS)),
+              help="Run only these scenarios.")
+@click.option("--iterations", default=DEFAULT_ITERATIONS, show_default=True)
+@click.option("--seed", default=42, show_default=True)
+@click.option("--data-dir", default=".bench", show_default=True, type=click.Path(file_okay=False, path_type=Path))
+@click.option("-o", "--output", type=click.Path(dir_okay=False, path_type=Path), help="Write results as JSON.")
+def run(scales, url, scenarios, iterations, seed, data_dir, output):
+    """Run the benchmark scenarios."""
+    scenarios = list(scenarios) or list(SCENARIOS)
+    results = {}
+    if url:
+        click.echo(f"Benchmarking {url} (writes are NOT rolled back)")
+        results["custom"] = run_benchmarks(url, iterations, seed, scenarios, click.echo)
+    else:
+        for scale in scales:
+            working = _working_copy(_dataset(data_dir, scale, seed, click.echo))
+            click.echo(f"Scale {scale} ({', '.join(f'{k}={v}' for k, v in SCALES[scale].items())})")
+            try:
+                results[scale] = run_benchmarks(f"sqlite:///{working}", iterations, seed, scenarios, click.echo)
+            finally:
+                for suffix in ("", "-wal", "-shm"):
+                    Path(f"{working}{suffix}").unlink(missing_ok=True)
+
+    document = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "seed": seed,
+        },
+        "results": results,
+    }
+    if output:
+        output.write_text(json.dumps(document, indent=2))
+        click.echo(f"✅ Results written to {output}")
+
+
+@cli.command()
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("candidate", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--metric", default="p50_ms", show_default=True,
+              type=click.Choice(["p50_ms", "p95_ms", "p99_ms", "mean_ms"]))
+def compare(baseline, candidate, metric):
+    """Compare two result files; negative change means faster."""
+    before = json.loads(baseline.read_text())["results"]
+    after = json.loads(candidate.read_text())["results"]
+    click.echo(f"{'scale':<8} {'scenario':<40} {'before':>10} {'after':>10} {'change':>8} {'stmts':>12}")
+    for scale in before:
+        for name, old in before[scale].items():
+            new = after.get(scale, {}).get(name)
+            if new is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            statements = f"{old['statements_per_op']}->{new['statements_per_op']}"
+            click.echo(f"{scale:<8} {name:<40} {old[metric]:>10.3f} {new[metric]:>10.3f} "
+                       f"{change:>+7.1f}% {statements:>12}")
+
+
+if __name__ == "__main__":
+    cli()